@@ -5,18 +5,68 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import json
+import argparse
 import os
+import sys
 import time
-import queue
-import csv
+import struct
+import binascii
+import tempfile
+import io
+import gzip
+import lzma
+import re
+import operator
+import heapq
+import bisect
+import itertools
+import mmap
+from array import array
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
 
 # --- PROJECT SETTINGS ---
 BAUD = 115200
 DB_IDS = 'deciphered_ids.json'
 DB_FUNCTIONS = 'function_codes.json'
-MAX_ALL_ROWS = 100
+MAX_ALL_ROWS = 1000000       # Frames retained by the Stream view ring
+GROUPED_RENDERER = "widgets"  # Grouped view renderer: "widgets" (CTk labels) or "canvas" (single tk.Canvas)
+SERIAL_READ_MODE = "bulk"    # "bulk" = chunked read(in_waiting), "line" = legacy readline()
+SERIAL_CHUNK_SIZE = 4096     # Max bytes pulled from the port per read
+SESSION_LOG_MEMORY_FRAMES = 250000  # Frames kept in RAM before the capture spills to disk
+SESSION_LOG_READ_CHUNK = 65536      # Frames per chunk when reading the capture back
+JOURNAL_COMPACT_COMMITS = 500       # Database edits journaled before the JSON file is rewritten
+LOADED_STREAM_TAIL = 100000         # Frames of a loaded session shown in the Stream view
+SNAPSHOT_STRIDE = 65536             # Frames between per-ID state snapshots used for seeking
+PLAYBACK_SPIN_S = 0.002             # Playback sleeps until this close to a deadline, then spins
+PLAYBACK_MAX_GAP_S = 5.0            # Longer waits between replayed frames (after scaling) are shortened to this
+PLAYBACK_BATCH = 4096               # Most frames handed to the monitor in one playback batch
+PLAYBACK_PROGRESS_S = 0.25          # Minimum interval between playback progress updates
+PLAYBACK_JOIN_TIMEOUT_S = 2.0       # Longest wait for a stopped replay before its session is closed
+SCRUB_DEBOUNCE_MS = 150             # Timeline drag pause before the idle preview is rebuilt
+TX_SPIN_S = 0.001                   # Cyclic transmit sleeps until this close to a deadline, then spins
+TX_COALESCE_S = 0.0005              # Cyclic commands due within this window share one serial write
+TX_MIN_PERIOD_S = 0.001             # Shorter cyclic periods (including 0) are raised to this
+TX_MAX_WRITE = 4096                 # Most bytes of queued commands joined into one serial write
+TX_MAX_PENDING = 256                # Queued commands before submit() blocks until the port catches up
+TX_CACHE_SIZE = 4096                # Encoded commands kept by the TX path before the cache is reset
+SERIAL_PROTOCOL = "auto"     # "auto" = detect, "text" = FRAME: lines, "binary" = request binary framing
+DEVICE_CLOCK_RESYNC_S = 2.0  # Re-anchor device timestamps that fall this far behind host time
+FRAME_QUEUE_SIZE = 20000        # Max frames waiting for the GUI
+FRAME_QUEUE_POLICY = "coalesce"  # Overflow policy: "coalesce" (latest per ID) or "drop_oldest"
+QUEUE_DRAIN_MIN_BUDGET_MS = 4   # Per-repaint drain time budget bounds
+QUEUE_DRAIN_MAX_BUDGET_MS = 25
+RENDER_FPS = 30                 # Monitor repaint rate
+HIGHLIGHT_MS = 350              # Changed-byte highlight duration
+NEW_ROW_FADE_MS = 2000          # New grouped row highlight duration
+RECENT_CHANGE_S = 2.0           # "Show only changed" window
+HW_FILTER_BANKS = 6             # Acceptance filter/mask pairs the sniffer firmware holds
 
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
@@ -40,18 +90,3036 @@ class Colors:
     TEXT_MUTED = "#64748B"   # Slate 500
 
 
-class ModernCANApp(ctk.CTk):
+# --- FRAME RECORD ---
+HEX_BYTE = tuple(f"{i:02X}" for i in range(256))
+
+
+def format_data(data: bytes) -> str:
+    """Format payload bytes as '01 02 0A ...'"""
+    return data.hex(" ").upper()
+
+
+def format_clock_time(timestamp: float) -> str:
+    """Format an epoch timestamp as HH:MM:SS.mmm"""
+    return datetime.fromtimestamp(timestamp).strftime("%H:%M:%S.%f")[:-3]
+
+
+def parse_clock_time(text: str, base: float = 0.0) -> float:
+    """Parse HH:MM:SS.mmm into seconds after base (epoch of the capture day's midnight)"""
+    h, m, s = text.split(":")
+    return base + int(h) * 3600 + int(m) * 60 + float(s)
+
+
+class CANFrame:
+    """Compact CAN frame record: epoch timestamp, integer ID, flag bits, DLC and an 8-byte payload"""
+
+    __slots__ = ('timestamp', 'can_id', 'flags', 'dlc', 'data')
+
+    FLAG_RTR = 0x01
+    FLAG_IDE = 0x02
+
+    def __init__(self, timestamp: float, can_id: int, flags: int, dlc: int, data: bytes):
+        self.timestamp = timestamp
+        self.can_id = can_id
+        self.flags = flags
+        self.dlc = dlc
+        self.data = bytes(data[:8]).ljust(8, b"\x00")  # No copy for 8-byte bytes input
+
+    @property
+    def rtr(self) -> int:
+        return self.flags & self.FLAG_RTR
+
+    @property
+    def ide(self) -> int:
+        return (self.flags & self.FLAG_IDE) >> 1
+
+    @property
+    def id_str(self) -> str:
+        return f"{self.can_id:X}"
+
+    @property
+    def payload(self) -> bytes:
+        """Payload trimmed to DLC"""
+        return self.data[:self.dlc]
+
+    @property
+    def data_str(self) -> str:
+        """All 8 payload bytes as shown in the monitor"""
+        return format_data(self.data)
+
+
+def byte_change_mask(old: bytes, new: bytes) -> int:
+    """Bit i set when payload byte i differs"""
+    diff = int.from_bytes(old, 'little') ^ int.from_bytes(new, 'little')
+    mask = 0
+    bit = 1
+    while diff:
+        if diff & 0xFF:
+            mask |= bit
+        diff >>= 8
+        bit <<= 1
+    return mask
+
+
+# --- CAPTURE LOG ---
+class CaptureLog:
+    """Columnar capture buffer: a capped in-memory segment that spills fixed-size records to disk.
+
+    Frames are addressed by their global index, so readers see the same sequence
+    no matter how much of it has been flushed to the spill file meanwhile.
+    """
+
+    RECORD = struct.Struct("<dIBB8s")  # timestamp, id, flags, dlc, payload
+    INDEX_STRIDE = 4096  # Frames per time index block
+
+    def __init__(self, max_memory_frames: int = SESSION_LOG_MEMORY_FRAMES):
+        self.max_memory_frames = max_memory_frames
+        self.spilled = 0  # Frames already written to the spill file
+        self.block_times = array('d')  # Timestamp of every INDEX_STRIDE-th frame
+        self._spill_path: Optional[str] = None
+        self._spill_file = None
+        self._lock = threading.Lock()
+        self._reset_columns()
+
+    def _reset_columns(self):
+        self.timestamps = array('d')
+        self.ids = array('I')
+        self.flags = array('B')
+        self.dlcs = array('B')
+        self.payloads = bytearray()
+
+    def __len__(self) -> int:
+        return self.spilled + len(self.timestamps)
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def append(self, frame: CANFrame):
+        """Append one frame, flushing the memory segment when it reaches the cap"""
+        with self._lock:
+            if not (self.spilled + len(self.timestamps)) % self.INDEX_STRIDE:
+                self.block_times.append(frame.timestamp)
+            self.timestamps.append(frame.timestamp)
+            self.ids.append(frame.can_id)
+            self.flags.append(frame.flags)
+            self.dlcs.append(frame.dlc)
+            self.payloads += frame.data
+            if len(self.timestamps) >= self.max_memory_frames:
+                self._flush_locked()
+
+    def flush(self):
+        """Move the in-memory segment to the spill file"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        count = len(self.timestamps)
+        if not count:
+            return
+        if self._spill_file is None:
+            fd, self._spill_path = tempfile.mkstemp(prefix="can_capture_", suffix=".bin")
+            self._spill_file = os.fdopen(fd, 'wb')
+
+        self._spill_file.write(self._pack_records(count))
+        self._spill_file.flush()
+        self.spilled += count
+        self._reset_columns()
+
+    def _pack_records(self, count: int) -> bytes:
+        """Interleave the columns into RECORD layout with strided slice copies, one per byte lane"""
+        size = self.RECORD.size
+        out = bytearray(count * size)
+        offset = 0
+        for column in (self.timestamps, self.ids, self.flags, self.dlcs):
+            if column.itemsize > 1 and sys.byteorder != "little":
+                column = array(column.typecode, column)
+                column.byteswap()
+            raw = column.tobytes()
+            width = column.itemsize
+            for lane in range(width):
+                out[offset + lane::size] = raw[lane::width]
+            offset += width
+        for lane in range(8):
+            out[offset + lane::size] = self.payloads[lane::8]
+        return bytes(out)
+
+    def read_range(self, start: int, stop: int, spill_reader=None) -> List[CANFrame]:
+        """Return frames [start, stop) from the disk and memory segments"""
+        frames = []
+        with self._lock:
+            stop = min(stop, len(self))
+            if start < self.spilled:
+                disk_stop = min(stop, self.spilled)
+                size = self.RECORD.size
+                reader = spill_reader or open(self._spill_path, 'rb')
+                try:
+                    reader.seek(start * size)
+                    raw = reader.read((disk_stop - start) * size)
+                finally:
+                    if reader is not spill_reader:
+                        reader.close()
+                frames.extend(CANFrame(*rec) for rec in self.RECORD.iter_unpack(raw))
+                start = disk_stop
+            base = self.spilled
+            payloads = self.payloads
+            for k in range(start - base, stop - base):
+                frames.append(CANFrame(self.timestamps[k], self.ids[k], self.flags[k], self.dlcs[k],
+                                       bytes(payloads[k * 8:k * 8 + 8])))
+        return frames
+
+    def iter_chunks(self, start: int = 0, stop: Optional[int] = None, chunk_size: int = SESSION_LOG_READ_CHUNK):
+        """Yield lists of frames in order; stop defaults to the length at call time"""
+        if stop is None:
+            stop = len(self)
+        spill_reader = None
+        try:
+            pos = start
+            while pos < stop:
+                if spill_reader is None and self._spill_path:
+                    spill_reader = open(self._spill_path, 'rb')
+                chunk = self.read_range(pos, min(pos + chunk_size, stop), spill_reader)
+                if not chunk:
+                    break
+                pos += len(chunk)
+                yield chunk
+        finally:
+            if spill_reader:
+                spill_reader.close()
+
+    def time_span(self) -> float:
+        """Seconds between the first and last frame"""
+        count = len(self)
+        if not count:
+            return 0.0
+        first = self.read_range(0, 1)
+        last = self.read_range(count - 1, count)
+        return last[0].timestamp - first[0].timestamp if first and last else 0.0
+
+    def index_at_time(self, timestamp: float) -> int:
+        """Index of the first frame at or after `timestamp` (frames are in time order)"""
+        block = max(bisect.bisect_right(self.block_times, timestamp) - 1, 0)
+        chunk = self.read_range(block * self.INDEX_STRIDE, (block + 1) * self.INDEX_STRIDE)
+        return block * self.INDEX_STRIDE + bisect.bisect_left([fr.timestamp for fr in chunk], timestamp)
+
+    def clear(self):
+        """Drop all frames and delete the spill file"""
+        with self._lock:
+            self._reset_columns()
+            self.block_times = array('d')
+            self.spilled = 0
+            self._close_spill()
+
+    def close(self):
+        """Release the spill file"""
+        self.clear()
+
+    def _close_spill(self):
+        if self._spill_file:
+            try:
+                self._spill_file.close()
+            except:
+                pass
+            self._spill_file = None
+        if self._spill_path:
+            try:
+                os.remove(self._spill_path)
+            except OSError:
+                pass
+            self._spill_path = None
+
+
+class StateSnapshots:
+    """Last frame per ID at regular positions of a session, so a seek can rebuild state instantly.
+
+    Positions are wherever record() was called once at least `stride` frames
+    had passed; state_at() starts from the nearest one and reads the rest.
+    """
+
+    def __init__(self, session, stride: int = SNAPSHOT_STRIDE):
+        self.session = session
+        self.stride = stride
+        self.positions = array('Q', [0])
+        self.states: List[Dict[int, CANFrame]] = [{}]
+
+    def record(self, position: int, latest: Dict[int, CANFrame]):
+        """Snapshot `latest`, the state before frame `position`, if the last one is a stride behind"""
+        if position - self.positions[-1] >= self.stride:
+            self.positions.append(position)
+            self.states.append(dict(latest))
+
+    def state_at(self, index: int) -> Dict[int, CANFrame]:
+        """Last frame of every ID before frame `index`"""
+        k = bisect.bisect_right(self.positions, index) - 1
+        state = dict(self.states[k])
+        for chunk in self.session.iter_chunks(self.positions[k], index):
+            for frame in chunk:
+                state[frame.can_id] = frame
+        return state
+
+
+class FrameRing:
+    """Fixed-capacity columnar ring of the most recent frames.
+
+    Frames are also addressable by absolute sequence number (0 = first frame
+    ever appended), so views can stay anchored while old frames are evicted.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = array('d', [0.0]) * capacity
+        self.ids = array('I', [0]) * capacity
+        self.flags = bytearray(capacity)
+        self.dlcs = bytearray(capacity)
+        self.payloads = bytearray(8 * capacity)
+        self.start = 0  # Physical slot of the oldest frame
+        self.count = 0
+        self.total = 0  # Frames ever appended
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, frame: CANFrame):
+        if self.count < self.capacity:
+            slot = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.timestamps[slot] = frame.timestamp
+        self.ids[slot] = frame.can_id
+        self.flags[slot] = frame.flags
+        self.dlcs[slot] = frame.dlc
+        self.payloads[slot * 8:slot * 8 + 8] = frame.data
+        self.total += 1
+
+    def __getitem__(self, index: int) -> CANFrame:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        slot = (self.start + index) % self.capacity
+        return CANFrame(self.timestamps[slot], self.ids[slot], self.flags[slot], self.dlcs[slot],
+                        bytes(self.payloads[slot * 8:slot * 8 + 8]))
+
+    @property
+    def oldest_seq(self) -> int:
+        return self.total - self.count
+
+    def get_seq(self, seq: int) -> Optional[CANFrame]:
+        """Frame by absolute sequence number, None once evicted"""
+        index = seq - self.oldest_seq
+        return self[index] if 0 <= index < self.count else None
+
+    def clear(self):
+        self.start = 0
+        self.count = 0
+        self.total = 0
+
+
+# --- LISTENER -> GUI QUEUE ---
+class FrameQueue:
+    """Bounded listener-to-GUI frame queue with an explicit overflow policy.
+
+    "drop_oldest" discards the oldest queued frame when full. "coalesce" first
+    replaces the queued frame with the same ID, removing it and queueing the new
+    frame at the tail so arrival order holds, and only drops the oldest frame
+    when the ID is not queued yet.
+    """
+
+    def __init__(self, maxsize: int = FRAME_QUEUE_SIZE, policy: str = FRAME_QUEUE_POLICY):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self.coalesced = 0
+        self._slots: OrderedDict = OrderedDict()  # Arrival sequence -> frame
+        self._by_id: Dict[int, int] = {}  # can_id -> sequence of its queued frame
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def put(self, frame: CANFrame):
+        self.put_many((frame,))
+
+    def put_many(self, frames):
+        coalesce = self.policy == "coalesce"
+        with self._lock:
+            slots = self._slots
+            by_id = self._by_id
+            seq = self._seq
+            for frame in frames:
+                if len(slots) >= self.maxsize:
+                    queued = by_id.get(frame.can_id) if coalesce else None
+                    if queued is not None:
+                        del slots[queued]
+                        self.coalesced += 1
+                    else:
+                        key, old = slots.popitem(last=False)
+                        self.dropped += 1
+                        if by_id.get(old.can_id) == key:
+                            del by_id[old.can_id]
+                key = next(seq)
+                slots[key] = frame
+                if coalesce:
+                    by_id[frame.can_id] = key
+
+    def get_batch(self, max_items: int) -> List[CANFrame]:
+        """Pop up to max_items frames in arrival order"""
+        with self._lock:
+            slots = self._slots
+            by_id = self._by_id
+            batch = []
+            for _ in range(min(max_items, len(slots))):
+                key, frame = slots.popitem(last=False)
+                if by_id.get(frame.can_id) == key:
+                    del by_id[frame.can_id]
+                batch.append(frame)
+            return batch
+
+    def clear(self):
+        with self._lock:
+            self._slots.clear()
+            self._by_id.clear()
+
+    def reset_counters(self):
+        self.dropped = 0
+        self.coalesced = 0
+
+
+# --- PER-ID STATE ---
+class IDState:
+    """What is known about one CAN ID, updated for every received frame"""
+
+    __slots__ = ('last_data', 'first_seen', 'last_seen', 'last_change', 'count', 'changes',
+                 'change_mask', 'byte_mask', 'period')
+
+    def __init__(self, frame: CANFrame):
+        self.last_data = frame.data
+        self.first_seen = frame.timestamp
+        self.last_seen = frame.timestamp
+        self.last_change = frame.timestamp
+        self.count = 1
+        self.changes = 0      # Payload changes seen
+        self.change_mask = 0  # Bytes changed by the latest frame
+        self.byte_mask = 0    # Bytes that ever changed
+        self.period = 0.0     # Smoothed inter-arrival time (s)
+
+
+class IDStateTable:
+    """Per-ID change tracker; update() is O(1) and runs on the listener thread"""
+
+    SORT_KEYS = {
+        "Arrival": lambda st: st.first_seen,
+        "ID": None,
+        "Count": lambda st: st.count,
+        "Period": lambda st: st.period or float("inf"),
+        "Last change": lambda st: st.last_change,
+    }
+
+    def __init__(self):
+        self._states: Dict[int, IDState] = {}
+        self._lock = threading.Lock()  # Guards inserts against readers copying the table
+
+    def update(self, frame: CANFrame) -> IDState:
+        state = self._states.get(frame.can_id)
+        if state is None:
+            state = IDState(frame)
+            with self._lock:
+                self._states[frame.can_id] = state
+            return state
+
+        data = frame.data
+        if data != state.last_data:
+            mask = byte_change_mask(state.last_data, data)
+            state.change_mask = mask
+            state.byte_mask |= mask
+            state.changes += 1
+            state.last_change = frame.timestamp
+            state.last_data = data
+        else:
+            state.change_mask = 0
+        # Frames read in one chunk share a timestamp; they carry no period information
+        dt = frame.timestamp - state.last_seen
+        if dt > 0:
+            state.period = dt if not state.period else state.period * 0.875 + dt * 0.125
+        state.last_seen = frame.timestamp
+        state.count += 1
+        return state
+
+    def get(self, can_id: int) -> Optional[IDState]:
+        return self._states.get(can_id)
+
+    def sorted_ids(self, key: str, reverse: bool = False) -> List[int]:
+        """IDs ordered by one of SORT_KEYS"""
+        with self._lock:
+            items = list(self._states.items())
+        key_func = self.SORT_KEYS.get(key)
+        if key_func is None:
+            items.sort(key=lambda item: item[0], reverse=reverse)
+        else:
+            items.sort(key=lambda item: key_func(item[1]), reverse=reverse)
+        return [can_id for can_id, state in items]
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+    def __len__(self):
+        return len(self._states)
+
+
+# --- GROUPED VIEW INGEST ---
+class CoalescedEntry:
+    """Latest frame of one ID plus what happened to it since the last paint"""
+
+    __slots__ = ('frame', 'count', 'changes', 'change_mask')
+
+    def __init__(self, frame: CANFrame, change_mask: int = 0):
+        self.frame = frame
+        self.count = 1        # Frames received since the last paint
+        self.changes = 1 if change_mask else 0  # Payload changes since the last paint
+        self.change_mask = change_mask  # Bytes that changed since the last paint
+
+
+class GroupedCoalescer:
+    """Per-ID coalescing stage between the listener and the Grouped view.
+
+    The listener pushes every frame; the GUI takes one entry per dirty ID per
+    refresh, so the number of widget updates is bounded by the number of IDs.
+    """
+
     def __init__(self):
+        self._entries: Dict[int, CoalescedEntry] = {}
+        self._dirty: Dict[int, None] = {}  # Insertion-ordered set
+        self._lock = threading.Lock()
+
+    def push_many(self, frames, change_masks):
+        """Stage frames with their per-frame change masks from IDStateTable"""
+        with self._lock:
+            entries = self._entries
+            dirty = self._dirty
+            for frame, mask in zip(frames, change_masks):
+                entry = entries.get(frame.can_id)
+                if entry is None:
+                    entries[frame.can_id] = CoalescedEntry(frame, mask)
+                else:
+                    if mask:
+                        entry.changes += 1
+                        entry.change_mask |= mask
+                    entry.frame = frame
+                    entry.count += 1
+                dirty[frame.can_id] = None
+
+    def take_dirty(self) -> List[tuple]:
+        """Return (frame, change_mask, count, changes) per dirty ID and reset the accumulators"""
+        with self._lock:
+            entries = self._entries
+            taken = []
+            for can_id in self._dirty:
+                entry = entries[can_id]
+                taken.append((entry.frame, entry.change_mask, entry.count, entry.changes))
+                entry.count = 0
+                entry.changes = 0
+                entry.change_mask = 0
+            self._dirty.clear()
+            return taken
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty.clear()
+
+
+# --- FRAME FILTER ---
+DEFAULT_FILTER_SETTINGS = {
+    'hide_periodic': False,
+    'hide_zero_data': False,
+    'show_only_changed': False,
+    'min_dlc': 0,
+    'max_dlc': 8,
+    'id_whitelist': [],
+    'id_blacklist': [],
+    'expression': "",
+    'hw_filter': False
+}
+
+ZERO_DATA = bytes(8)
+
+
+class FilterSyntaxError(ValueError):
+    pass
+
+
+class FilterExpression:
+    """Filter language, e.g. `id in 0x100..0x1FF and (id & 0x7F0) == 0x320 and d[2] & 0x80 and changed(d[4])`
+
+    Fields: id, dlc, rtr, ide, d[0]..d[7] (alias data[n]). Operators: or, and, not,
+    == != < <= > >=, in lo..hi, in [a, b, lo..hi], | ^ & << >> + - ~.
+    changed(expr) is true when expr differs from the previous frame of the same ID.
+    The text is parsed once into a tree of closures taking (frame, previous frame).
+    """
+
+    TOKEN = re.compile(r"\s*(?:(0[xX][0-9a-fA-F]+|\d+)|([A-Za-z_]\w*)|(\.\.|==|!=|<=|>=|<<|>>|[<>()\[\],&|^~+\-]))")
+    COMPARE = {'==': operator.eq, '!=': operator.ne, '<': operator.lt,
+               '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+    # Precedence levels, loosest first; operators on one level are left-associative
+    BINARY = ({'|': operator.or_}, {'^': operator.xor}, {'&': operator.and_},
+              {'<<': operator.lshift, '>>': operator.rshift})
+    FIELDS = {
+        'id': lambda f, p: f.can_id,
+        'dlc': lambda f, p: f.dlc,
+        'rtr': lambda f, p: f.flags & CANFrame.FLAG_RTR,
+        'ide': lambda f, p: f.flags & CANFrame.FLAG_IDE and 1,
+    }
+
+    def __init__(self, text: str):
+        self.text = text.strip()
+        self.uses_history = False
+        self._tokens = self._tokenize(self.text)
+        self._pos = 0
+        self._root = self._parse_or()
+        if self._pos != len(self._tokens):
+            raise FilterSyntaxError(f"Unexpected '{self._tokens[self._pos]}'")
+
+    def _tokenize(self, text: str) -> List[str]:
+        tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = self.TOKEN.match(text, pos)
+            if not match:
+                raise FilterSyntaxError(f"Unexpected character '{text[pos:].strip()[0]}'")
+            tokens.append(match.group(match.lastindex))
+            pos = match.end()
+        if not tokens:
+            raise FilterSyntaxError("Empty expression")
+        return tokens
+
+    def _peek(self) -> Optional[str]:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+
+    def _take(self, expected: Optional[str] = None) -> str:
+        token = self._peek()
+        if token is None:
+            raise FilterSyntaxError("Unexpected end of expression")
+        if expected is not None and token.lower() != expected:
+            raise FilterSyntaxError(f"Expected '{expected}', got '{token}'")
+        self._pos += 1
+        return token
+
+    def _accept(self, *options: str) -> Optional[str]:
+        token = self._peek()
+        if token is not None and token.lower() in options:
+            self._pos += 1
+            return token.lower()
+        return None
+
+    def _parse_or(self):
+        node = self._parse_and()
+        while self._accept('or'):
+            left, right = node, self._parse_and()
+            node = lambda f, p, a=left, b=right: bool(a(f, p) or b(f, p))
+        return node
+
+    def _parse_and(self):
+        node = self._parse_not()
+        while self._accept('and'):
+            left, right = node, self._parse_not()
+            node = lambda f, p, a=left, b=right: bool(a(f, p) and b(f, p))
+        return node
+
+    def _parse_not(self):
+        if self._accept('not'):
+            inner = self._parse_not()
+            return lambda f, p: not inner(f, p)
+        return self._parse_compare()
+
+    def _parse_compare(self):
+        node = self._parse_binary(0)
+        token = self._peek()
+        if token in self.COMPARE:
+            self._pos += 1
+            op, right = self.COMPARE[token], self._parse_binary(0)
+            return lambda f, p: op(node(f, p), right(f, p))
+        negate = False
+        if token is not None and token.lower() == 'not' and self._pos + 1 < len(self._tokens) \
+                and self._tokens[self._pos + 1].lower() == 'in':
+            self._pos += 1
+            negate = True
+        if self._accept('in'):
+            member = self._parse_membership()
+            if negate:
+                return lambda f, p: not member(node(f, p))
+            return lambda f, p: member(node(f, p))
+        return node
+
+    def _parse_membership(self):
+        """`lo..hi` or `[a, b, lo..hi]`; items must be constants"""
+        if not self._accept('['):
+            lo, hi = self._parse_range_item()
+            if hi is None:
+                raise FilterSyntaxError("Expected 'lo..hi' or '[...]' after 'in'")
+            return lambda v: lo <= v <= hi
+        values, ranges = set(), []
+        while True:
+            lo, hi = self._parse_range_item()
+            if hi is None:
+                values.add(lo)
+            else:
+                ranges.append((lo, hi))
+            if not self._accept(','):
+                break
+        self._take(']')
+        values = frozenset(values)
+        ranges = tuple(ranges)
+        if not ranges:
+            return lambda v: v in values
+        return lambda v: v in values or any(lo <= v <= hi for lo, hi in ranges)
+
+    def _parse_range_item(self):
+        lo = self._constant()
+        if self._accept('..'):
+            return lo, self._constant()
+        return lo, None
+
+    def _constant(self) -> int:
+        node = self._parse_binary(0)
+        try:
+            return node(None, None)
+        except (AttributeError, TypeError):
+            raise FilterSyntaxError("Set and range bounds must be constants")
+
+    def _parse_binary(self, level: int):
+        if level == len(self.BINARY):
+            return self._parse_additive()
+        ops = self.BINARY[level]
+        node = self._parse_binary(level + 1)
+        while self._peek() in ops:
+            op = ops[self._take()]
+            left, right = node, self._parse_binary(level + 1)
+            node = lambda f, p, a=left, b=right, op=op: op(a(f, p), b(f, p))
+        return node
+
+    def _parse_additive(self):
+        node = self._parse_unary()
+        while self._peek() in ('+', '-'):
+            op = operator.add if self._take() == '+' else operator.sub
+            left, right = node, self._parse_unary()
+            node = lambda f, p, a=left, b=right, op=op: op(a(f, p), b(f, p))
+        return node
+
+    def _parse_unary(self):
+        if self._accept('~'):
+            inner = self._parse_unary()
+            return lambda f, p: ~inner(f, p)
+        if self._accept('-'):
+            inner = self._parse_unary()
+            return lambda f, p: -inner(f, p)
+        return self._parse_primary()
+
+    def _parse_primary(self):
+        token = self._take()
+        if token == '(':
+            node = self._parse_or()
+            self._take(')')
+            return node
+        if token[0].isdigit():
+            value = int(token, 0) if token[:2].lower() == '0x' else int(token)
+            return lambda f, p: value
+        name = token.lower()
+        if name in self.FIELDS:
+            return self.FIELDS[name]
+        if name in ('d', 'data'):
+            self._take('[')
+            index = self._constant()
+            self._take(']')
+            if not 0 <= index < 8:
+                raise FilterSyntaxError(f"Byte index {index} out of range 0..7")
+            return lambda f, p: f.data[index]
+        if name == 'changed':
+            self._take('(')
+            inner = self._parse_or()
+            self._take(')')
+            self.uses_history = True
+            return lambda f, p: p is not None and inner(f, p) != inner(p, None)
+        raise FilterSyntaxError(f"Unknown name '{token}'")
+
+    def predicate(self) -> Callable[[CANFrame], bool]:
+        """Fresh evaluator; changed() history is private to each evaluator"""
+        root = self._root
+        if not self.uses_history:
+            return lambda frame: bool(root(frame, None))
+
+        previous: Dict[int, CANFrame] = {}
+
+        def accept(frame: CANFrame) -> bool:
+            prev = previous.get(frame.can_id)
+            previous[frame.can_id] = frame
+            return bool(root(frame, prev))
+
+        return accept
+
+
+def parse_id_list(items) -> set:
+    """Hex ID strings ('1A0', '0x1A0') to a set of ints, skipping invalid entries"""
+    ids = set()
+    for item in items:
+        try:
+            ids.add(int(item, 16))
+        except ValueError:
+            pass
+    return ids
+
+
+def compile_frame_filter(settings: Dict, id_text: str = "",
+                         states: Optional[IDStateTable] = None) -> Optional[Callable[[CANFrame], bool]]:
+    """Build one predicate from the quick ID filter and the advanced filter settings; None accepts everything.
+
+    hide_periodic and show_only_changed read `states`, which the caller must
+    update with each frame before testing it.
+    """
+    id_text = id_text.strip().upper()
+    whitelist = parse_id_list(settings['id_whitelist']) if settings['id_whitelist'] else None
+    blacklist = parse_id_list(settings['id_blacklist'])
+    min_dlc, max_dlc = settings['min_dlc'], settings['max_dlc']
+    check_dlc = min_dlc > 0 or max_dlc < 8
+    hide_zero = settings['hide_zero_data']
+    check_id = bool(id_text) or whitelist is not None or bool(blacklist)
+    expression = settings.get('expression', "").strip()
+    matches = FilterExpression(expression).predicate() if expression else None
+    hide_periodic = settings['hide_periodic'] and states is not None
+    only_changed = settings['show_only_changed'] and states is not None
+
+    if not (check_id or check_dlc or hide_zero or matches or hide_periodic or only_changed):
+        return None
+
+    def id_allowed(can_id: int) -> bool:
+        if id_text and id_text not in f"{can_id:X}":
+            return False
+        if whitelist is not None and can_id not in whitelist:
+            return False
+        return can_id not in blacklist
+
+    # The ID part only depends on the ID, so each ID is judged once
+    verdicts: Dict[int, bool] = {}
+
+    def accept(frame: CANFrame) -> bool:
+        if check_id:
+            allowed = verdicts.get(frame.can_id)
+            if allowed is None:
+                allowed = verdicts[frame.can_id] = id_allowed(frame.can_id)
+            if not allowed:
+                return False
+        if check_dlc and not (min_dlc <= frame.dlc <= max_dlc):
+            return False
+        if hide_zero and frame.data == ZERO_DATA:
+            return False
+        if hide_periodic or only_changed:
+            state = states.get(frame.can_id)
+            if state is not None:
+                # Repeats of an unchanged payload
+                if hide_periodic and state.count > 1 and not state.change_mask:
+                    return False
+                # IDs whose payload has not changed recently
+                if only_changed and (not state.changes or frame.timestamp - state.last_change > RECENT_CHANGE_S):
+                    return False
+        if matches is not None:
+            return matches(frame)
+        return True
+
+    return accept
+
+
+# --- STREAM VIEW ---
+class StreamTable:
+    """Virtualized Stream view: a fixed pool of canvas rows rebound to a frame ring.
+
+    Arriving frames only touch the ring; refresh() rebinds the visible rows,
+    so no widgets are created or destroyed while capturing.
+    """
+
+    ROW_HEIGHT = 24
+    HEADER_HEIGHT = 34
+    COLUMNS = [("ID", 70), ("Device", 110), ("Function", 140), ("RTR", 40), ("IDE", 40), ("DLC", 40)] + \
+              [(f"D{i}", 36) for i in range(8)] + [("Time", 100), ("", 30)]
+
+    def __init__(self, parent, ring: FrameRing, describe, on_save):
+        self.ring = ring
+        self.describe = describe  # frame -> (device name, function name)
+        self.on_save = on_save    # frame -> None
+        self.newest_first = False
+        self.follow = True        # Stick to the newest frames
+        self.top_seq = 0          # Sequence number shown in the first visible row
+        self._rows: List[list] = []  # Canvas text items per visible row
+        self._bound: List[Optional[int]] = []  # Sequence bound to each row (-1 = blank, None = stale)
+
+        self.frame = ctk.CTkFrame(parent, fg_color=Colors.BG_DARK, corner_radius=0)
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        self.canvas = tk.Canvas(self.frame, bg=Colors.BG_DARK, highlightthickness=0, bd=0)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self.frame, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.font = ctk.CTkFont(size=11)
+        self.font_bold = ctk.CTkFont(size=11, weight="bold")
+
+        self._x = []
+        x = 8
+        for _, width in self.COLUMNS:
+            self._x.append(x)
+            x += width
+        self._width = x
+
+        self.canvas.create_rectangle(0, 0, self._width, self.HEADER_HEIGHT, fill=Colors.BG_MEDIUM, width=0)
+        for (title, _), cx in zip(self.COLUMNS, self._x):
+            self.canvas.create_text(cx, self.HEADER_HEIGHT // 2, text=title, anchor="w",
+                                    fill=Colors.TEXT_SECONDARY, font=self.font_bold)
+
+        self.canvas.bind("<Configure>", self._on_resize)
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(3))
+
+    def _on_resize(self, event):
+        visible = max(1, (event.height - self.HEADER_HEIGHT) // self.ROW_HEIGHT)
+        if visible != len(self._rows):
+            self._build_pool(visible)
+
+    def _build_pool(self, visible: int):
+        """(Re)create the canvas items for the visible rows"""
+        self.canvas.delete("row")
+        self._rows = []
+        self._bound = [None] * visible
+        for r in range(visible):
+            y = self.HEADER_HEIGHT + r * self.ROW_HEIGHT
+            bg = Colors.BG_MEDIUM if r % 2 else Colors.BG_DARK
+            self.canvas.create_rectangle(0, y, self._width, y + self.ROW_HEIGHT, fill=bg, width=0, tags=("row",))
+            items = []
+            for c, cx in enumerate(self._x):
+                tags = ("row", f"save{r}") if c == len(self._x) - 1 else ("row",)
+                items.append(self.canvas.create_text(cx, y + self.ROW_HEIGHT // 2, text="", anchor="w",
+                                                     font=self.font, tags=tags))
+            self.canvas.tag_bind(f"save{r}", "<Button-1>", lambda e, row=r: self._on_save_click(row))
+            self._rows.append(items)
+        self.refresh()
+
+    def _top_bounds(self):
+        """Valid range of top_seq for the current ring contents and sort order"""
+        oldest, newest = self.ring.oldest_seq, self.ring.total - 1
+        visible = len(self._rows)
+        if self.newest_first:
+            return min(newest, oldest + visible - 1), newest
+        return oldest, max(oldest, newest - visible + 1)
+
+    def refresh(self, force: bool = False):
+        """Rebind the visible rows to the frames they should show"""
+        count = len(self.ring)
+        if not self._rows:
+            return
+        if force:
+            self._bound = [None] * len(self._rows)
+        if not count:
+            for r in range(len(self._rows)):
+                self._blank_row(r)
+            self.scrollbar.set(0.0, 1.0)
+            return
+
+        low, high = self._top_bounds()
+        if self.follow:
+            top = high
+        else:
+            top = max(low, min(self.top_seq, high))
+        self.top_seq = top
+
+        oldest, newest = self.ring.oldest_seq, self.ring.total - 1
+        step = -1 if self.newest_first else 1
+        first = (newest - top) / count if self.newest_first else (top - oldest) / count
+        self.scrollbar.set(first, min(1.0, first + len(self._rows) / count))
+
+        for r in range(len(self._rows)):
+            seq = top + r * step
+            if oldest <= seq <= newest:
+                if self._bound[r] != seq:
+                    self._bind_row(r, seq)
+            else:
+                self._blank_row(r)
+
+    def _bind_row(self, r: int, seq: int):
+        frame = self.ring.get_seq(seq)
+        if frame is None:
+            self._blank_row(r)
+            return
+        dev_name, func_name = self.describe(frame)
+        cells = [
+            (frame.id_str, Colors.PRIMARY),
+            (dev_name, Colors.SUCCESS if dev_name != "Unknown" else Colors.TEXT_MUTED),
+            (func_name, Colors.WARNING if func_name != "---" else Colors.TEXT_MUTED),
+            (str(frame.rtr), Colors.TEXT_SECONDARY),
+            (str(frame.ide), Colors.TEXT_SECONDARY),
+            (str(frame.dlc), Colors.TEXT_SECONDARY),
+        ]
+        cells += [(HEX_BYTE[b], Colors.DANGER if b else Colors.TEXT_MUTED) for b in frame.data]
+        cells += [(format_clock_time(frame.timestamp), Colors.TEXT_MUTED), ("+", Colors.SUCCESS)]
+
+        itemconfigure = self.canvas.itemconfigure
+        for item, (text, color) in zip(self._rows[r], cells):
+            itemconfigure(item, text=text, fill=color)
+        self._bound[r] = seq
+
+    def _blank_row(self, r: int):
+        if self._bound[r] != -1:
+            for item in self._rows[r]:
+                self.canvas.itemconfigure(item, text="")
+        self._bound[r] = -1
+
+    def scroll(self, rows: int):
+        """Scroll by rows in display order (positive = towards later rows)"""
+        self.follow = False
+        self.top_seq += -rows if self.newest_first else rows
+        low, high = self._top_bounds()
+        self.top_seq = max(low, min(self.top_seq, high))
+        self.follow = self.top_seq == high
+        self.refresh()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        count = len(self.ring)
+        if not count:
+            return
+        if action == "moveto":
+            pos = int(float(value) * count)
+            target = self.ring.total - 1 - pos if self.newest_first else self.ring.oldest_seq + pos
+            delta = target - self.top_seq
+            self.scroll(-delta if self.newest_first else delta)
+        elif action == "scroll":
+            rows = int(value) * (len(self._rows) if unit == "pages" else 1)
+            self.scroll(rows)
+
+    def _on_save_click(self, r: int):
+        seq = self._bound[r] if r < len(self._bound) else None
+        frame = self.ring.get_seq(seq) if seq is not None and seq >= 0 else None
+        if frame is not None:
+            self.on_save(frame)
+
+    def set_newest_first(self, newest_first: bool):
+        """Reorder the view; only rebinds the visible rows"""
+        self.newest_first = newest_first
+        self.follow = True
+        self.refresh(force=True)
+
+    def clear(self):
+        self.ring.clear()
+        self.follow = True
+        self.refresh(force=True)
+
+
+# --- GROUPED VIEW (CANVAS RENDERER) ---
+class CanvasCell:
+    """Canvas text cell exposing the CTkLabel configure() subset the grouped view uses"""
+
+    __slots__ = ('canvas', 'text_item', 'bg_item', 'base_bg')
+
+    def __init__(self, canvas: tk.Canvas, text_item: int, bg_item: int, base_bg: str):
+        self.canvas = canvas
+        self.text_item = text_item
+        self.bg_item = bg_item
+        self.base_bg = base_bg
+
+    def configure(self, text=None, text_color=None, font=None, fg_color=None, **kwargs):
+        options = {}
+        if text is not None:
+            options['text'] = text
+        if text_color is not None:
+            options['fill'] = text_color
+        if font is not None:
+            options['font'] = font
+        if options:
+            self.canvas.itemconfigure(self.text_item, **options)
+        if fg_color is not None:
+            self.canvas.itemconfigure(self.bg_item, fill=self.base_bg if fg_color == "transparent" else fg_color)
+
+    def cget(self, key: str):
+        return self.canvas.itemcget(self.text_item, 'fill' if key == "text_color" else key)
+
+    def winfo_exists(self) -> bool:
+        return True
+
+    def destroy(self):
+        self.canvas.delete(self.text_item, self.bg_item)
+
+
+class GroupedCanvasTable:
+    """Grouped view drawn on one tk.Canvas: per-cell item IDs, cached fonts, in-place updates.
+
+    add_row() returns a row dict shaped like the widget renderer's, with
+    CanvasCell objects in place of labels, so the update path is shared.
+    """
+
+    ROW_HEIGHT = 30
+    HEADER_HEIGHT = 34
+    COLUMNS = [("Time", 70), ("ID", 70), ("Device", 110), ("Function", 140), ("RTR", 40), ("IDE", 40),
+               ("DLC", 40)] + [(f"D{i}", 45) for i in range(8)] + [("", 40)]
+
+    def __init__(self, parent, on_id_click, on_save):
+        self.on_id_click = on_id_click  # can_id -> None
+        self.on_save = on_save          # can_id -> None
+        self.order: List[str] = []      # can_id per display row
+        self._index: Dict[str, int] = {}
+
+        self.font = ctk.CTkFont(size=11)
+        self.font_bold = ctk.CTkFont(size=11, weight="bold")
+        self.font_button = ctk.CTkFont(size=14, weight="bold")
+
+        self._x = []
+        x = 8
+        for _, width in self.COLUMNS:
+            self._x.append(x)
+            x += width
+        self._width = x
+
+        self.frame = ctk.CTkFrame(parent, fg_color=Colors.BG_DARK, corner_radius=0)
+        self.frame.grid_rowconfigure(1, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        header = tk.Canvas(self.frame, bg=Colors.BG_MEDIUM, height=self.HEADER_HEIGHT, highlightthickness=0, bd=0)
+        header.grid(row=0, column=0, columnspan=2, sticky="ew")
+        for (title, _), cx in zip(self.COLUMNS, self._x):
+            header.create_text(cx, self.HEADER_HEIGHT // 2, text=title, anchor="w",
+                               fill=Colors.TEXT_SECONDARY, font=self.font_bold)
+
+        self.canvas = tk.Canvas(self.frame, bg=Colors.BG_DARK, highlightthickness=0, bd=0)
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self.frame, command=self.canvas.yview)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.bind("<MouseWheel>", lambda e: self.canvas.yview_scroll(-1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+
+    def add_row(self, can_id: str, frame: CANFrame, dev_name: str, det_func: str, relative_time: float,
+                at_top: bool = False) -> Dict:
+        """Draw a new ID row and return its row dict"""
+        if at_top:
+            self.canvas.move("cell", 0, self.ROW_HEIGHT)
+            self.order.insert(0, can_id)
+            self._index = {cid: i for i, cid in enumerate(self.order)}
+        else:
+            self._index[can_id] = len(self.order)
+            self.order.append(can_id)
+
+        y = self._index[can_id] * self.ROW_HEIGHT
+        bg = Colors.BG_MEDIUM
+        texts = [
+            (f"{relative_time:.3f}", Colors.TEXT_MUTED, self.font),
+            (can_id, Colors.PRIMARY, self.font_bold),
+            (dev_name, Colors.SUCCESS if dev_name != "Unknown" else Colors.TEXT_MUTED, self.font),
+            (det_func, Colors.WARNING if det_func != "---" else Colors.TEXT_MUTED, self.font),
+            (str(frame.rtr), Colors.TEXT_SECONDARY, self.font),
+            (str(frame.ide), Colors.TEXT_SECONDARY, self.font),
+            (str(frame.dlc), Colors.TEXT_SECONDARY, self.font),
+        ]
+        texts += [(HEX_BYTE[b], Colors.DANGER if b else Colors.TEXT_MUTED, self.font) for b in frame.data]
+        texts.append(("+", Colors.SUCCESS, self.font_button))
+
+        row_tag = f"row_{can_id}"
+        cells = []
+        for (text, color, font), cx, (_, width) in zip(texts, self._x, self.COLUMNS):
+            bg_item = self.canvas.create_rectangle(cx - 4, y + 2, cx + width - 8, y + self.ROW_HEIGHT - 2,
+                                                   fill=bg, width=0, tags=("cell", row_tag))
+            text_item = self.canvas.create_text(cx, y + self.ROW_HEIGHT // 2, text=text, anchor="w", fill=color,
+                                                font=font, tags=("cell", row_tag))
+            cells.append(CanvasCell(self.canvas, text_item, bg_item, Colors.BG_DARK))
+
+        for item in (cells[1].text_item, cells[1].bg_item):
+            self.canvas.tag_bind(item, "<Button-1>", lambda e, cid=can_id: self.on_id_click(cid))
+        for item in (cells[-1].text_item, cells[-1].bg_item):
+            self.canvas.tag_bind(item, "<Button-1>", lambda e, cid=can_id: self.on_save(cid))
+        self._update_scrollregion()
+
+        return {
+            'time_lbl': cells[0],
+            'dev_lbl': cells[2],
+            'func_lbl': cells[3],
+            'bytes': cells[7:15],
+            'last_data': frame.data,
+            'widgets': cells,
+            'bg': bg,
+            'timestamp': relative_time
+        }
+
+    def reorder(self, ordered_ids: List[str]):
+        """Move existing rows into a new order without redrawing them"""
+        for new_index, can_id in enumerate(ordered_ids):
+            old_index = self._index.get(can_id)
+            if old_index is not None and old_index != new_index:
+                self.canvas.move(f"row_{can_id}", 0, (new_index - old_index) * self.ROW_HEIGHT)
+        self.order = list(ordered_ids)
+        self._index = {cid: i for i, cid in enumerate(self.order)}
+
+    def _update_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, self._width, len(self.order) * self.ROW_HEIGHT))
+
+    def clear(self):
+        self.canvas.delete("cell")
+        self.order.clear()
+        self._index.clear()
+        self._update_scrollregion()
+
+
+# --- FUNCTION DATABASE ---
+WILDCARD_BYTE = "??"
+
+
+class FunctionEntry:
+    """One saved function: a payload pattern of one ID"""
+
+    __slots__ = ('entry_id', 'cid', 'can_id', 'device', 'pattern', 'name')
+
+    def __init__(self, entry_id: int, cid: str, can_id: int, device: str, pattern: str, name: str):
+        self.entry_id = entry_id
+        self.cid = cid          # ID key as stored in the JSON file
+        self.can_id = can_id
+        self.device = device
+        self.pattern = pattern  # "01 ?? 00 ..." as stored
+        self.name = name
+
+    @property
+    def label(self) -> str:
+        return f"[{self.cid}] {self.name} ({self.device})"
+
+    @property
+    def tx_data(self) -> str:
+        """Payload to transmit; wildcard bytes are sent as 00"""
+        return self.pattern.replace(WILDCARD_BYTE, "00")
+
+
+def parse_pattern(pattern: str) -> Optional[tuple]:
+    """'01 ?? 00' to (1, None, 0); None for a malformed pattern.
+
+    Only explicit ?? tokens become wildcards: a pattern is never padded, so
+    it matches payloads of its own length only.
+    """
+    tokens = pattern.split()
+    if len(tokens) > 8:
+        return None
+    try:
+        values = tuple(None if t == WILDCARD_BYTE else int(t, 16) for t in tokens)
+    except ValueError:
+        return None
+    if any(v is not None and not 0 <= v <= 0xFF for v in values):
+        return None
+    return values
+
+
+class FunctionDB:
+    """Function database with int-keyed indexes over the JSON structure.
+
+    `raw` keeps the on-disk shape {id: {"device": ..., "mappings": {pattern: name}}}.
+    Exact patterns are found with one (id, payload) lookup; patterns with ??
+    bytes go into a trie per (id, length) that prefers exact bytes over
+    wildcards. Payloads are matched as shown in the monitor (padded to 8).
+    Entry IDs stay the same for a pattern across edits. Edits update the
+    indexes for one entry and return the JsonStore ops describing them.
+    """
+
+    def __init__(self, raw: Optional[Dict] = None):
+        self.raw: Dict = raw if raw is not None else {}
+        self._exact: Dict[tuple, FunctionEntry] = {}
+        self._tries: Dict[tuple, dict] = {}  # (can_id, length) -> trie
+        self._by_name: Dict[str, List[FunctionEntry]] = {}
+        self._by_key: Dict[tuple, FunctionEntry] = {}  # (cid, pattern) -> entry
+        self._entries: Dict[int, FunctionEntry] = {}
+        self._next_entry_id = 1
+        for cid, obj in self.raw.items():
+            device = obj.get("device", "Unknown")
+            for pattern, name in obj.get("mappings", {}).items():
+                self._add(cid, device, pattern, name)
+
+    def _add(self, cid: str, device: str, pattern: str, name: str, entry_id: Optional[int] = None):
+        try:
+            can_id = int(cid, 16)
+        except ValueError:
+            return
+        values = parse_pattern(pattern)
+        if values is None:
+            return
+        if entry_id is None:
+            entry_id = self._next_entry_id
+            self._next_entry_id += 1
+        entry = FunctionEntry(entry_id, cid, can_id, device, pattern, name)
+        self._entries[entry_id] = entry
+        self._by_key[(cid, pattern)] = entry
+        self._by_name.setdefault(name, []).append(entry)
+        if None in values:
+            node = self._tries.setdefault((can_id, len(values)), {})
+            for value in values[:-1]:
+                node = node.setdefault(value, {})
+            node[values[-1]] = entry
+        else:
+            self._exact[(can_id, bytes(values))] = entry
+
+    def _drop(self, cid: str, pattern: str) -> Optional[int]:
+        """Remove one entry from the indexes, returning its entry id"""
+        entry = self._by_key.pop((cid, pattern), None)
+        if entry is None:
+            return None
+        del self._entries[entry.entry_id]
+        same_name = self._by_name[entry.name]
+        same_name.remove(entry)
+        if not same_name:
+            del self._by_name[entry.name]
+        values = parse_pattern(pattern)
+        if None in values:
+            trie_key = (entry.can_id, len(values))
+            root = node = self._tries.get(trie_key, {})
+            path = []
+            for value in values[:-1]:
+                path.append((node, value))
+                node = node.get(value, {})
+            if node.get(values[-1]) is entry:
+                del node[values[-1]]
+            # Prune branches left empty
+            for parent, value in reversed(path):
+                if node:
+                    break
+                parent.pop(value, None)
+                node = parent
+            if not root:
+                self._tries.pop(trie_key, None)
+        else:
+            key = (entry.can_id, bytes(values))
+            if self._exact.get(key) is entry:
+                del self._exact[key]
+        return entry.entry_id
+
+    def _match(self, node, data: bytes, depth: int) -> Optional[FunctionEntry]:
+        if depth == len(data):
+            return node
+        child = node.get(data[depth])
+        if child is not None:
+            found = self._match(child, data, depth + 1)
+            if found is not None:
+                return found
+        child = node.get(None)
+        if child is not None:
+            return self._match(child, data, depth + 1)
+        return None
+
+    def lookup(self, can_id: int, data: bytes) -> Optional[FunctionEntry]:
+        """Function whose pattern has the length of `data` and matches it"""
+        entry = self._exact.get((can_id, data))
+        if entry is None:
+            trie = self._tries.get((can_id, len(data)))
+            if trie is not None:
+                entry = self._match(trie, data, 0)
+        return entry
+
+    def find_by_name(self, name: str) -> List[FunctionEntry]:
+        return self._by_name.get(name, [])
+
+    def entry(self, entry_id: int) -> Optional[FunctionEntry]:
+        return self._entries.get(entry_id)
+
+    def entries(self) -> List[FunctionEntry]:
+        return sorted(self._entries.values(), key=lambda e: (e.cid, e.pattern))
+
+    def set(self, cid: str, device: str, pattern: str, name: str) -> List[tuple]:
+        """Add or rename the function of a pattern"""
+        obj = self.raw.get(cid)
+        if obj is None:
+            obj = self.raw[cid] = {"device": device, "mappings": {pattern: name}}
+            ops = [("set", [cid], obj)]
+        else:
+            ops = []
+            if obj.get("device") != device:
+                obj["device"] = device
+                ops.append(("set", [cid, "device"], device))
+                for other in obj["mappings"]:
+                    entry = self._by_key.get((cid, other))
+                    if entry is not None:
+                        entry.device = device
+            obj["mappings"][pattern] = name
+            ops.append(("set", [cid, "mappings", pattern], name))
+        entry_id = self._drop(cid, pattern)
+        self._add(cid, device, pattern, name, entry_id)
+        return ops
+
+    def rename(self, cid: str, pattern: str, name: str) -> List[tuple]:
+        return self.set(cid, self.raw[cid].get("device", "Unknown"), pattern, name)
+
+    def remove(self, cid: str, pattern: str) -> List[tuple]:
+        self._drop(cid, pattern)
+        del self.raw[cid]["mappings"][pattern]
+        if not self.raw[cid]["mappings"]:
+            del self.raw[cid]
+            return [("del", [cid])]
+        return [("del", [cid, "mappings", pattern])]
+
+
+# --- STORAGE ---
+class JsonStore:
+    """JSON database file plus an append-only journal of edits.
+
+    Each commit appends one JSON line (a list of set/del ops on a key path)
+    and fsyncs it, so an edit costs one small write and a crash loses at most
+    the edit being written; a torn last line is dropped on load. compact()
+    folds the journal into the JSON file through a temp file and os.replace.
+    The file is read on first access to `data`.
+    """
+
+    def __init__(self, path: str, compact_after: int = JOURNAL_COMPACT_COMMITS):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_after = compact_after
+        self._data: Optional[Dict] = None
+        self._pending = 0  # Commits in the journal
+
+    @property
+    def data(self) -> Dict:
+        if self._data is None:
+            self.load()
+        return self._data
+
+    def load(self):
+        data = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Error loading {self.path}: {e}")
+        self._pending = 0
+        if os.path.exists(self.journal_path):
+            good = 0
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        ops = json.loads(line)
+                    except ValueError:
+                        break
+                    for op in ops:
+                        self._apply(data, op)
+                    good += len(line)
+                    self._pending += 1
+                size = f.tell()
+            if good < size:
+                print(f"Dropping torn journal tail of {self.journal_path}")
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(good)
+        self._data = data
+
+    @staticmethod
+    def _apply(data: Dict, op):
+        kind, keys = op[0], op[1]
+        node = data
+        for key in keys[:-1]:
+            if kind == "set":
+                node = node.setdefault(key, {})
+            else:
+                node = node.get(key)
+                if node is None:
+                    return
+        if kind == "set":
+            node[keys[-1]] = op[2]
+        else:
+            node.pop(keys[-1], None)
+
+    def commit(self, ops: List[tuple]):
+        """Journal edits already made to `data`"""
+        if not ops:
+            return
+        line = json.dumps(ops, ensure_ascii=False) + "\n"
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._pending += 1
+        if self._pending >= self.compact_after:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the JSON file atomically and empty the journal"""
+        if self._data is None or not self._pending:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        # Replaying ops onto the new file is harmless, so a crash here loses nothing
+        open(self.journal_path, 'w').close()
+        self._pending = 0
+
+
+# --- EXPORT ---
+# Compression choices for exports: label -> (module, level, file suffix)
+EXPORT_COMPRESSION = {
+    "None": None,
+    "gzip (fast)": (gzip, 1, ".gz"),
+    "gzip (best)": (gzip, 9, ".gz"),
+    "xz": (lzma, 6, ".xz"),
+}
+if zstd is not None:
+    EXPORT_COMPRESSION["zstd"] = (zstd, 3, ".zst")
+
+
+def open_compressed(path: str, compression, mode: str = 'wb'):
+    """Open a binary file, compressing on the fly with an EXPORT_COMPRESSION entry"""
+    if compression is None:
+        return open(path, mode)
+    module, level, _ = compression
+    if module is gzip:
+        return gzip.open(path, mode, compresslevel=level)
+    if module is lzma:
+        return lzma.open(path, mode, preset=level)
+    return module.open(path, mode, level=level)
+
+
+class CsvLogFormat:
+    """The app's CSV: timestamp,id,rtr,ide,dlc,data with wall-clock HH:MM:SS.fff.
+
+    `data` holds the DLC payload bytes. Older versions copied the firmware's
+    data field verbatim, which is the same for well-formed frames.
+    """
+
+    name = "CSV"
+    extension = ".csv"
+
+    def header(self) -> bytes:
+        return b"timestamp,id,rtr,ide,dlc,data\r\n"
+
+    def encode(self, frames: List[CANFrame]) -> bytes:
+        # No field needs quoting, so rows are formatted directly instead of going through csv.writer
+        return "".join([
+            f"{format_clock_time(fr.timestamp)},{fr.can_id:X},{fr.flags & 1},{fr.flags >> 1 & 1},{fr.dlc},"
+            f"{fr.data[:fr.dlc].hex(' ').upper()}\r\n"
+            for fr in frames
+        ]).encode('ascii')
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class ExportJob:
+    """Writes a capture to a file on a worker thread.
+
+    on_progress(done, total) and on_done(count, error, cancelled) are called
+    from the worker; the file is written under a .part name and only renamed
+    into place when complete.
+    """
+
+    def __init__(self, log: CaptureLog, path: str, log_format=None, compression=None,
+                 matches: Optional[Callable[[CANFrame], bool]] = None,
+                 on_progress: Optional[Callable] = None, on_done: Optional[Callable] = None):
+        self.log = log
+        self.path = path
+        self.log_format = log_format or CsvLogFormat()
+        self.compression = compression
+        self.matches = matches
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.total = len(log)  # Frames captured after the export starts are not included
+        self._cancel = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _run(self):
+        part_path = self.path + ".part"
+        count = 0
+        done = 0
+        error = None
+        try:
+            with open_compressed(part_path, self.compression) as f:
+                f.write(self.log_format.header())
+                for chunk in self.log.iter_chunks(0, self.total):
+                    if self._cancel.is_set():
+                        break
+                    done += len(chunk)
+                    if self.matches is not None:
+                        chunk = [fr for fr in chunk if self.matches(fr)]
+                    f.write(self.log_format.encode(chunk))
+                    count += len(chunk)
+                    if self.on_progress:
+                        self.on_progress(done, self.total)
+                f.write(self.log_format.footer())
+            if self._cancel.is_set():
+                os.remove(part_path)
+            else:
+                os.replace(part_path, self.path)
+        except Exception as e:
+            error = e
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+        if self.on_done:
+            self.on_done(count, error, self._cancel.is_set())
+
+
+# --- SESSION LOADING ---
+def open_session_stream(raw):
+    """Wrap a binary file in a decompressor chosen by its magic bytes"""
+    head = raw.peek(6)[:6] if hasattr(raw, 'peek') else b""
+    if head.startswith(b"\x1f\x8b"):
+        return gzip.GzipFile(fileobj=raw)
+    if head.startswith(b"\xfd7zXZ"):
+        return lzma.LZMAFile(raw)
+    if zstd is not None and head.startswith(b"\x28\xb5\x2f\xfd"):
+        return zstd.ZstdFile(raw)
+    return raw
+
+
+def iter_csv_chunks(stream, base: float, chunk_size: int = SESSION_LOG_READ_CHUNK):
+    """Yield lists of CANFrames from an exported CSV (text stream), skipping malformed rows.
+
+    Wall-clock timestamps are offset by `base` (midnight of the capture day);
+    when the clock steps back by more than 12 h the capture ran past midnight
+    and later rows move on a day.
+    """
+    columns = [c.strip() for c in stream.readline().split(",")]
+    try:
+        i_ts, i_id, i_rtr, i_ide, i_dlc, i_data = (columns.index(c) for c in
+                                                   ('timestamp', 'id', 'rtr', 'ide', 'dlc', 'data'))
+    except ValueError:
+        raise ValueError("Not a session CSV (missing columns)")
+    chunk = []
+    last_ts = None
+    for line in stream:
+        parts = line.rstrip("\r\n").split(",")
+        try:
+            data = bytes.fromhex(parts[i_data])
+            ts = parse_clock_time(parts[i_ts] or '00:00:00.000', base)
+            if last_ts is not None and ts < last_ts - 43200:
+                base += 86400
+                ts += 86400
+            last_ts = ts
+            chunk.append(CANFrame(ts, int(parts[i_id], 16),
+                                  int(parts[i_rtr] or 0) | (int(parts[i_ide] or 0) << 1),
+                                  int(parts[i_dlc] or len(data)), data))
+        except (ValueError, IndexError):
+            continue
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class SessionLoadJob:
+    """Parses a text or pcap session on a worker thread into a CaptureLog.
+
+    Keeps the last frame per ID so the monitor can show the final state without
+    replaying the capture, plus StateSnapshots for seeking; the CaptureLog
+    builds its time index as frames arrive.
+    on_progress(fraction) and on_done(job, error, cancelled) run on the worker.
+    """
+
+    def __init__(self, path: str, on_progress: Optional[Callable] = None, on_done: Optional[Callable] = None):
+        self.path = path
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.frames = CaptureLog()
+        self.latest: Dict[int, CANFrame] = {}
+        self.snapshots = StateSnapshots(self.frames)
+        self._cancel = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _run(self):
+        error = None
+        try:
+            size = os.path.getsize(self.path) or 1
+            # Wall-clock CSV timestamps are anchored to today's midnight
+            midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+            read_chunks = session_reader(self.path)
+            with open(self.path, 'rb') as raw:
+                stream = open_session_stream(io.BufferedReader(raw))
+                latest = self.latest
+                append = self.frames.append
+                record = self.snapshots.record
+                position = 0
+                for chunk in read_chunks(stream, midnight):
+                    if self._cancel.is_set():
+                        break
+                    record(position, latest)
+                    position += len(chunk)
+                    for frame in chunk:
+                        append(frame)
+                        latest[frame.can_id] = frame
+                    if self.on_progress:
+                        self.on_progress(min(raw.tell() / size, 1.0))
+        except Exception as e:
+            error = e
+        if error or self._cancel.is_set():
+            self.frames.close()
+        if self.on_done:
+            self.on_done(self, error, self._cancel.is_set())
+
+
+# --- BINARY CAPTURE FILE ---
+# Layout (little endian):
+#   header   CAPFILE_HEADER: magic, version, record size, index stride
+#   records  CaptureLog.RECORD each: float64 timestamp, uint32 ID, uint8 flags, uint8 DLC, 8 payload bytes
+#   index    uint32 n, n x float64 timestamp of every stride-th record,
+#            uint32 m, m x (uint32 ID, uint32 frames, uint32 k, k x uint32 block), block = record // stride
+#   trailer  CAPFILE_TRAILER: index offset, record count, magic
+# The writer streams front to back; readers start from the trailer.
+CAPFILE_MAGIC = b"CANCAP1\x00"
+CAPFILE_HEADER = struct.Struct("<8sHHI")
+CAPFILE_TRAILER = struct.Struct("<QQ8s")
+CAPFILE_STRIDE = CaptureLog.INDEX_STRIDE  # Records per index block
+CAPFILE_VERSION = 1
+
+
+class BinaryLogFormat:
+    """Writer side of the binary capture file (.cancap)"""
+
+    name = "Binary capture"
+    extension = ".cancap"
+
+    def __init__(self, stride: int = CAPFILE_STRIDE):
+        self.stride = stride
+        self.count = 0
+        self.block_times = array('d')
+        self.id_blocks: Dict[int, array] = {}
+        self.id_counts: Dict[int, int] = {}
+
+    def header(self) -> bytes:
+        return CAPFILE_HEADER.pack(CAPFILE_MAGIC, CAPFILE_VERSION, CaptureLog.RECORD.size, self.stride)
+
+    def encode(self, frames: List[CANFrame]) -> bytes:
+        pack = CaptureLog.RECORD.pack
+        stride = self.stride
+        id_blocks = self.id_blocks
+        id_counts = self.id_counts
+        count = self.count
+        out = []
+        for fr in frames:
+            if count % stride == 0:
+                self.block_times.append(fr.timestamp)
+            block = count // stride
+            blocks = id_blocks.get(fr.can_id)
+            if blocks is None:
+                blocks = id_blocks[fr.can_id] = array('I')
+            if not blocks or blocks[-1] != block:
+                blocks.append(block)
+            id_counts[fr.can_id] = id_counts.get(fr.can_id, 0) + 1
+            out.append(pack(fr.timestamp, fr.can_id, fr.flags, fr.dlc, fr.data))
+            count += 1
+        self.count = count
+        return b"".join(out)
+
+    def footer(self) -> bytes:
+        index_offset = CAPFILE_HEADER.size + self.count * CaptureLog.RECORD.size
+        parts = [struct.pack("<I", len(self.block_times)), self.block_times.tobytes(),
+                 struct.pack("<I", len(self.id_blocks))]
+        for can_id in sorted(self.id_blocks):
+            blocks = self.id_blocks[can_id]
+            parts.append(struct.pack("<III", can_id, self.id_counts[can_id], len(blocks)))
+            parts.append(blocks.tobytes())
+        parts.append(CAPFILE_TRAILER.pack(index_offset, self.count, CAPFILE_MAGIC))
+        return b"".join(parts)
+
+
+class CaptureFile:
+    """mmap-backed reader for .cancap files with the CaptureLog read interface.
+
+    Opening reads only the header, trailer and index; records are decoded on
+    demand, so multi-GB captures open instantly.
+    """
+
+    RECORD = CaptureLog.RECORD
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("Not a capture file (empty)")
+        try:
+            self._read_index()
+        except:
+            self.close()
+            raise
+
+    def _read_index(self):
+        buf = self._map
+        if len(buf) < CAPFILE_HEADER.size + CAPFILE_TRAILER.size:
+            raise ValueError("Not a capture file (too short)")
+        magic, version, record_size, self.stride = CAPFILE_HEADER.unpack_from(buf, 0)
+        index_offset, self.count, end_magic = CAPFILE_TRAILER.unpack_from(buf, len(buf) - CAPFILE_TRAILER.size)
+        if magic != CAPFILE_MAGIC or end_magic != CAPFILE_MAGIC:
+            raise ValueError("Not a capture file or truncated")
+        if version != CAPFILE_VERSION or record_size != self.RECORD.size:
+            raise ValueError(f"Unsupported capture file version {version}")
+        index_end = len(buf) - CAPFILE_TRAILER.size
+        if not self.stride or index_offset != CAPFILE_HEADER.size + self.count * record_size \
+                or index_offset > index_end:
+            raise ValueError("Capture file is truncated or corrupt")
+
+        try:
+            pos = index_offset
+            n, = struct.unpack_from("<I", buf, pos)
+            pos += 4
+            self.block_times = array('d')
+            self.block_times.frombytes(buf[pos:pos + 8 * n])
+            pos += 8 * n
+            m, = struct.unpack_from("<I", buf, pos)
+            pos += 4
+            self.id_blocks: Dict[int, array] = {}
+            self.id_counts: Dict[int, int] = {}
+            for _ in range(m):
+                can_id, frames, k = struct.unpack_from("<III", buf, pos)
+                pos += 12
+                blocks = array('I')
+                blocks.frombytes(buf[pos:pos + 4 * k])
+                pos += 4 * k
+                self.id_blocks[can_id] = blocks
+                self.id_counts[can_id] = frames
+        except (struct.error, ValueError):
+            raise ValueError("Capture file index is corrupt") from None
+        if pos != index_end or len(self.block_times) != -(-self.count // self.stride):
+            raise ValueError("Capture file index is corrupt")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def _timestamp(self, index: int) -> float:
+        return struct.unpack_from("<d", self._map, CAPFILE_HEADER.size + index * self.RECORD.size)[0]
+
+    def read_range(self, start: int, stop: int, spill_reader=None) -> List[CANFrame]:
+        """Return frames [start, stop)"""
+        start = max(start, 0)
+        stop = min(stop, self.count)
+        if start >= stop:
+            return []
+        size = self.RECORD.size
+        offset = CAPFILE_HEADER.size
+        raw = self._map[offset + start * size:offset + stop * size]
+        return [CANFrame(*rec) for rec in self.RECORD.iter_unpack(raw)]
+
+    def iter_chunks(self, start: int = 0, stop: Optional[int] = None, chunk_size: int = SESSION_LOG_READ_CHUNK):
+        stop = self.count if stop is None else min(stop, self.count)
+        for pos in range(start, stop, chunk_size):
+            yield self.read_range(pos, min(pos + chunk_size, stop))
+
+    def index_at_time(self, timestamp: float) -> int:
+        """Index of the first frame at or after `timestamp`"""
+        block = max(bisect.bisect_right(self.block_times, timestamp) - 1, 0)
+        lo = block * self.stride
+        hi = min(lo + self.stride, self.count)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamp(mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def iter_ids(self, can_ids, start: int = 0, stop: Optional[int] = None):
+        """Yield chunks holding only frames of `can_ids`, reading just the index blocks that contain them"""
+        can_ids = set(can_ids)
+        stop = self.count if stop is None else min(stop, self.count)
+        blocks = sorted({b for can_id in can_ids for b in self.id_blocks.get(can_id, ())})
+        for block in blocks:
+            lo = max(block * self.stride, start)
+            hi = min((block + 1) * self.stride, stop)
+            if lo >= hi:
+                continue
+            chunk = [fr for fr in self.read_range(lo, hi) if fr.can_id in can_ids]
+            if chunk:
+                yield chunk
+
+    def time_span(self) -> float:
+        if not self.count:
+            return 0.0
+        return self._timestamp(self.count - 1) - self._timestamp(0)
+
+    def latest_frames(self) -> Dict[int, CANFrame]:
+        """Last frame of every ID"""
+        return self.state_at(self.count)
+
+    def state_at(self, index: int) -> Dict[int, CANFrame]:
+        """Last frame of every ID before frame `index`, read from each ID's nearest index block"""
+        stride = self.stride
+        block = index // stride
+        state = {}
+        by_block: Dict[int, Dict[int, int]] = {}
+        for can_id, blocks in self.id_blocks.items():
+            k = bisect.bisect_right(blocks, block) - 1
+            if k >= 0:
+                by_block.setdefault(blocks[k], {})[can_id] = k
+        # The block holding `index` is only read up to it; IDs not seen there fall back a block
+        earlier: Dict[int, set] = {}
+        for found, entries in by_block.items():
+            for fr in self.read_range(found * stride, min((found + 1) * stride, index)):
+                if fr.can_id in entries:
+                    state[fr.can_id] = fr
+            for can_id, k in entries.items():
+                if can_id not in state and k > 0:
+                    earlier.setdefault(self.id_blocks[can_id][k - 1], set()).add(can_id)
+        for found, can_ids in earlier.items():
+            for fr in self.read_range(found * stride, (found + 1) * stride):
+                if fr.can_id in can_ids:
+                    state[fr.can_id] = fr
+        return state
+
+    def close(self):
+        try:
+            self._map.close()
+        except:
+            pass
+        self._file.close()
+
+    def clear(self):
+        self.close()
+
+
+# --- CAN LOG FORMATS ---
+# Interchange formats of other tools. Readers take a binary stream and yield
+# lists of CANFrames; writers plug into ExportJob like CsvLogFormat.
+LOG_INTERFACE = "can0"  # Interface/channel name written to candump and pcap logs
+CANDUMP_LINE = re.compile(r"\(\s*(\d+(?:\.\d+)?)\)\s+\S+\s+([0-9A-Fa-f]{1,8})#(R[0-9A-Fa-f]?|[0-9A-Fa-f]*)(?=\s|$)")
+
+
+def _text_lines(stream):
+    return io.TextIOWrapper(stream, encoding='utf-8', errors='replace', newline='')
+
+
+def iter_candump_chunks(stream, base: float = 0.0, chunk_size: int = SESSION_LOG_READ_CHUNK):
+    """candump -l lines: (1436509052.249713) can0 123#DEADBEEF; CAN FD (##) lines are skipped"""
+    match_line = CANDUMP_LINE.match
+    chunk = []
+    for line in _text_lines(stream):
+        m = match_line(line)
+        if not m:
+            continue
+        ts, can_id, payload = m.groups()
+        try:
+            flags = CANFrame.FLAG_IDE if len(can_id) == 8 else 0
+            if payload[:1] == "R":
+                flags |= CANFrame.FLAG_RTR
+                dlc = int(payload[1:] or "0", 16)
+                data = b""
+            else:
+                data = bytes.fromhex(payload)
+                dlc = len(data)
+            if dlc > 8:
+                continue
+            chunk.append(CANFrame(float(ts), int(can_id, 16), flags, dlc, data))
+        except ValueError:
+            continue
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class CandumpLogFormat:
+    """SocketCAN candump -l log"""
+
+    name = "candump .log"
+    extension = ".log"
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, frames: List[CANFrame]) -> bytes:
+        lines = []
+        for fr in frames:
+            can_id = f"{fr.can_id:08X}" if fr.flags & CANFrame.FLAG_IDE else f"{fr.can_id:03X}"
+            if fr.flags & CANFrame.FLAG_RTR:
+                payload = f"R{fr.dlc:X}" if fr.dlc else "R"
+            else:
+                payload = fr.data[:fr.dlc].hex().upper()
+            lines.append(f"({fr.timestamp:.6f}) {LOG_INTERFACE} {can_id}#{payload}\n")
+        return "".join(lines).encode('ascii')
+
+    def footer(self) -> bytes:
+        return b""
+
+
+ASC_DATE_FORMAT = "%a %b %d %I:%M:%S.%f %p %Y"
+
+
+def _parse_asc_date(text: str) -> Optional[float]:
+    # Vector writes milliseconds ("12:00:00.000"); strptime's %f accepts them
+    try:
+        return datetime.strptime(" ".join(text.split()), ASC_DATE_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def iter_asc_chunks(stream, base: float = 0.0, chunk_size: int = SESSION_LOG_READ_CHUNK):
+    """Vector ASCII logs: classic CAN data/remote frames; error, FD and event lines are skipped.
+
+    Times are offset by the "date" header line, or by `base` when it is missing.
+    """
+    start = base
+    id_base = 16
+    chunk = []
+    for line in _text_lines(stream):
+        tokens = line.split()
+        if len(tokens) < 2:
+            continue
+        if tokens[0] == "date":
+            start = _parse_asc_date(line.split(None, 1)[1]) or base
+            continue
+        if tokens[0] == "base":
+            id_base = 10 if tokens[1] == "dec" else 16
+            continue
+        # <time> <channel> <id>[x] Rx|Tx d <dlc> <bytes...>   or   ... Rx|Tx r [<dlc>]
+        if len(tokens) < 5 or not tokens[1].isdigit() or tokens[3] not in ("Rx", "Tx") or tokens[4] not in ("d", "r"):
+            continue
+        try:
+            ts = float(tokens[0])
+            id_text = tokens[2]
+            flags = 0
+            if id_text[-1] in "xX":
+                flags = CANFrame.FLAG_IDE
+                id_text = id_text[:-1]
+            can_id = int(id_text, id_base)
+            if tokens[4] == "r":
+                flags |= CANFrame.FLAG_RTR
+                dlc = int(tokens[5], 16) if len(tokens) > 5 and len(tokens[5]) == 1 else 0
+                data = b""
+            else:
+                dlc = int(tokens[5], 16)
+                if dlc > 8:
+                    continue
+                data = bytes.fromhex("".join(tokens[6:6 + dlc]))
+        except (ValueError, IndexError):
+            continue
+        chunk.append(CANFrame(start + ts, can_id, flags, dlc, data))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class VectorAscFormat:
+    """Vector ASCII log (.asc) with absolute timestamps relative to the measurement start"""
+
+    name = "Vector .asc"
+    extension = ".asc"
+
+    def __init__(self):
+        self.start: Optional[float] = None
+
+    def _begin(self, start: float) -> str:
+        # The date line only holds milliseconds; frame times are relative to exactly that
+        start = int(start * 1000) / 1000.0
+        self.start = start
+        date = datetime.fromtimestamp(start).strftime(ASC_DATE_FORMAT)
+        # %f gives microseconds; Vector shows milliseconds
+        date = date[:date.index(".") + 4] + date[date.index(".") + 7:]
+        return (f"date {date}\nbase hex  timestamps absolute\ninternal events logged\n"
+                f"Begin Triggerblock {date}\n   0.000000 Start of measurement\n")
+
+    def header(self) -> bytes:
+        # Written with the first frame, which sets the measurement start
+        return b""
+
+    def encode(self, frames: List[CANFrame]) -> bytes:
+        if not frames:
+            return b""
+        lines = [self._begin(frames[0].timestamp)] if self.start is None else []
+        start = self.start
+        for fr in frames:
+            can_id = f"{fr.can_id:X}x" if fr.flags & CANFrame.FLAG_IDE else f"{fr.can_id:X}"
+            if fr.flags & CANFrame.FLAG_RTR:
+                lines.append(f"{fr.timestamp - start:11.6f} 1  {can_id:<15} Rx   r {fr.dlc:X}\n")
+            else:
+                lines.append(f"{fr.timestamp - start:11.6f} 1  {can_id:<15} Rx   d {fr.dlc:X}"
+                             f"{' ' if fr.dlc else ''}{fr.data[:fr.dlc].hex(' ').upper()}\n")
+        return "".join(lines).encode('ascii')
+
+    def footer(self) -> bytes:
+        head = self._begin(time.time()) if self.start is None else ""
+        return (head + "End TriggerBlock\n").encode('ascii')
+
+
+# pcap with LINKTYPE_CAN_SOCKETCAN: 16-byte struct can_frame per packet, ID word in network byte order
+PCAP_LINKTYPE_CAN = 227
+PCAP_MAGIC_US = 0xA1B2C3D4
+PCAP_MAGIC_NS = 0xA1B23C4D
+CAN_EFF_FLAG = 0x80000000
+CAN_RTR_FLAG = 0x40000000
+CAN_ERR_FLAG = 0x20000000
+SOCKETCAN_FRAME = struct.Struct(">IBxxx8s")
+
+
+def iter_pcap_chunks(stream, base: float = 0.0, chunk_size: int = SESSION_LOG_READ_CHUNK):
+    """SocketCAN pcap captures (classic CAN; error and CAN FD packets are skipped)"""
+    header = stream.read(24)
+    if len(header) < 24:
+        raise ValueError("Not a pcap file")
+    for endian in ("<", ">"):
+        magic, = struct.unpack(endian + "I", header[:4])
+        if magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+            break
+    else:
+        raise ValueError("Not a pcap file (pcapng is not supported)")
+    linktype, = struct.unpack(endian + "I", header[20:24])
+    if linktype & 0xFFFF != PCAP_LINKTYPE_CAN:
+        raise ValueError(f"pcap link type {linktype} is not SocketCAN")
+    scale = 1e-9 if magic == PCAP_MAGIC_NS else 1e-6
+    record = struct.Struct(endian + "IIII")
+    unpack_frame = SOCKETCAN_FRAME.unpack_from
+    chunk = []
+    while True:
+        head = stream.read(16)
+        if len(head) < 16:
+            break
+        ts_sec, ts_frac, incl_len, orig_len = record.unpack(head)
+        packet = stream.read(incl_len)
+        if len(packet) < incl_len:
+            break
+        if incl_len != SOCKETCAN_FRAME.size:
+            continue  # Truncated, or a 72-byte CAN FD frame
+        word, dlc, data = unpack_frame(packet)
+        if word & CAN_ERR_FLAG or dlc > 8:
+            continue
+        flags = (CANFrame.FLAG_IDE if word & CAN_EFF_FLAG else 0) | (CANFrame.FLAG_RTR if word & CAN_RTR_FLAG else 0)
+        chunk.append(CANFrame(ts_sec + ts_frac * scale, word & CAN_ID_MASK, flags, dlc, data))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class PcapLogFormat:
+    """pcap with LINKTYPE_CAN_SOCKETCAN and microsecond timestamps, readable by Wireshark"""
+
+    name = "SocketCAN .pcap"
+    extension = ".pcap"
+    RECORD = struct.Struct("<IIII")
+
+    def header(self) -> bytes:
+        return struct.pack("<IHHiIII", PCAP_MAGIC_US, 2, 4, 0, 0, 65535, PCAP_LINKTYPE_CAN)
+
+    def encode(self, frames: List[CANFrame]) -> bytes:
+        pack_record = self.RECORD.pack
+        pack_frame = SOCKETCAN_FRAME.pack
+        size = SOCKETCAN_FRAME.size
+        out = []
+        for fr in frames:
+            usec = round(fr.timestamp * 1e6)
+            word = fr.can_id
+            if fr.flags & CANFrame.FLAG_IDE:
+                word |= CAN_EFF_FLAG
+            if fr.flags & CANFrame.FLAG_RTR:
+                word |= CAN_RTR_FLAG
+            out.append(pack_record(usec // 1000000, usec % 1000000, size, size))
+            out.append(pack_frame(word, fr.dlc, fr.data))
+        return b"".join(out)
+
+    def footer(self) -> bytes:
+        return b""
+
+
+def _read_csv(stream, base: float):
+    return iter_csv_chunks(_text_lines(stream), base)
+
+
+# File extension -> reader(binary stream, base time) yielding frame chunks
+SESSION_READERS = {
+    CsvLogFormat.extension: _read_csv,
+    CandumpLogFormat.extension: iter_candump_chunks,
+    VectorAscFormat.extension: iter_asc_chunks,
+    PcapLogFormat.extension: iter_pcap_chunks,
+}
+EXPORT_FORMATS = (CsvLogFormat, BinaryLogFormat, CandumpLogFormat, VectorAscFormat, PcapLogFormat)
+
+
+def session_reader(path: str):
+    """Reader for a session file by extension, ignoring a compression suffix"""
+    name = path.lower()
+    for suffix in (".gz", ".xz", ".zst"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return SESSION_READERS.get(os.path.splitext(name)[1], _read_csv)
+
+
+# --- PLAYBACK ---
+class TimingStats:
+    """Lateness of replayed frames against their scheduled deadlines"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.target_span = 0.0  # Scheduled duration of the replay (s)
+        self.actual_span = 0.0  # Measured duration (s)
+
+    def add(self, late: float):
+        self.count += 1
+        self.total += late
+        if late > self.worst:
+            self.worst = late
+
+    def summary(self) -> str:
+        mean = self.total / self.count if self.count else 0.0
+        drift = self.actual_span - self.target_span
+        return f"timing error mean {mean * 1e6:.0f} µs, max {self.worst * 1e3:.2f} ms, drift {drift * 1e3:+.1f} ms"
+
+
+class PlaybackEngine:
+    """Replays a capture against absolute perf_counter deadlines on its own thread.
+
+    Each frame is due at start + (timestamp - first timestamp) * scale, so sleep
+    overshoot never accumulates. The thread sleeps until PLAYBACK_SPIN_S before
+    a deadline and spins the rest, yielding the GIL. Frames that are due
+    together are delivered in one on_frames(frames) call of at most
+    PLAYBACK_BATCH frames. scale 0 replays as fast as possible. Waits longer
+    than PLAYBACK_MAX_GAP_S are shortened to it. When on_frames blocks, the
+    schedule moves on by that time rather than bursting.
+
+    The replay covers frames [start, stop), optionally only `can_ids`. pause(),
+    resume() and seek(timestamp) work while it runs; a seek finds its frame via
+    the session's time index and hands on_seek(index, state) the per-ID state
+    from `snapshots` (anything with state_at(index)).
+    """
+
+    def __init__(self, session, scale: float = 1.0, loop: bool = False,
+                 on_frames: Optional[Callable] = None, on_progress: Optional[Callable] = None,
+                 on_done: Optional[Callable] = None, start: int = 0, stop: Optional[int] = None,
+                 can_ids=None, snapshots=None, on_seek: Optional[Callable] = None):
+        self.session = session
+        self.scale = scale
+        self.loop = loop
+        self.on_frames = on_frames
+        self.on_progress = on_progress  # (timestamp, fraction of the window)
+        self.on_done = on_done          # (TimingStats, stopped)
+        self.on_seek = on_seek          # (index, {can_id: frame})
+        self.start_index = start
+        self.stop_index = len(session) if stop is None else min(stop, len(session))
+        self.can_ids = set(can_ids) if can_ids else None
+        self.snapshots = snapshots
+        self.stats = TimingStats()
+        self._stop = threading.Event()
+        self._wake = threading.Event()  # Interrupts waits on pause, resume, seek and stop
+        self._paused = False
+        self._seek_to: Optional[float] = None
+        self._wall_origin = 0.0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait for the replay thread to finish, e.g. after stop()"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def pause(self):
+        self._paused = True
+        self._wake.set()
+
+    def resume(self):
+        self._paused = False
+        self._wake.set()
+
+    def seek(self, timestamp: float):
+        """Continue from the first frame at or after `timestamp`"""
+        self._seek_to = timestamp
+        self._wake.set()
+
+    @property
+    def running(self) -> bool:
+        return not self._stop.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def _interrupted(self) -> bool:
+        return self._paused or self._seek_to is not None or self._stop.is_set()
+
+    def _wait_until(self, deadline: float) -> bool:
+        """Wait for `deadline`; False if a pause, seek or stop came first"""
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= PLAYBACK_SPIN_S:
+                break
+            self._wake.wait(remaining - PLAYBACK_SPIN_S)
+            self._wake.clear()
+            if self._interrupted():
+                return False
+        while time.perf_counter() < deadline:
+            if self._interrupted():
+                return False
+            time.sleep(0)
+        return True
+
+    def _hold(self):
+        """Block while paused, moving the schedule on by the time spent"""
+        began = time.perf_counter()
+        while self._paused and self._seek_to is None and not self._stop.is_set():
+            self._wake.wait(0.1)
+            self._wake.clear()
+        self._wall_origin += time.perf_counter() - began
+
+    def _run(self):
+        try:
+            pos = self.start_index
+            while not self._stop.is_set():
+                pos = self._play_from(pos)
+                if pos is None:
+                    if not self.loop or self._stop.is_set():
+                        break
+                    pos = self.start_index
+        finally:
+            if self.on_done:
+                self.on_done(self.stats, self._stop.is_set())
+
+    def _chunks(self, pos: int):
+        if self.can_ids is None:
+            yield from self.session.iter_chunks(pos, self.stop_index)
+        elif hasattr(self.session, "iter_ids"):
+            # Capture files skip index blocks without the selected IDs
+            yield from self.session.iter_ids(self.can_ids, pos, self.stop_index)
+        else:
+            can_ids = self.can_ids
+            for chunk in self.session.iter_chunks(pos, self.stop_index):
+                yield [fr for fr in chunk if fr.can_id in can_ids]
+
+    def _window(self) -> tuple:
+        """First and last timestamp of the replayed window"""
+        first = self.session.read_range(self.start_index, self.start_index + 1)
+        last = self.session.read_range(self.stop_index - 1, self.stop_index)
+        if not first or not last:
+            return 0.0, 0.0
+        return first[0].timestamp, last[0].timestamp
+
+    def _play_from(self, pos: int) -> Optional[int]:
+        """Replay from frame `pos`; returns where to go on after a seek, None at the end or on stop"""
+        scale = self.scale
+        stats = self.stats
+        window_start, window_end = self._window()
+        window = (window_end - window_start) or 1.0
+        origin = None       # Capture time that maps to `_wall_origin`
+        last_ts = None
+        due = []
+        due_at = 0.0        # Offset of the pending batch from `_wall_origin`
+        resume_at = None
+        try:
+            for chunk in self._chunks(pos):
+                if self._stop.is_set():
+                    return None
+                for frame in chunk:
+                    ts = frame.timestamp
+                    if origin is None:
+                        origin, self._wall_origin = ts, time.perf_counter()
+                    elif scale and (ts - last_ts) * scale > PLAYBACK_MAX_GAP_S:
+                        # Skip dead time so the wait is PLAYBACK_MAX_GAP_S; later deadlines move with it
+                        origin += ts - last_ts - PLAYBACK_MAX_GAP_S / scale
+                    offset = (ts - origin) * scale
+                    if due and (offset > due_at or len(due) >= PLAYBACK_BATCH):
+                        if not self._deliver(due, due_at):
+                            resume_at = self._take_seek()
+                            return resume_at
+                        if self.on_progress:
+                            self.on_progress(last_ts, (last_ts - window_start) / window)
+                        due = []
+                    if not due:
+                        due_at = offset
+                    due.append(frame)
+                    last_ts = ts
+            if due:
+                if not self._deliver(due, due_at):
+                    resume_at = self._take_seek()
+                    return resume_at
+                if self.on_progress:
+                    self.on_progress(last_ts, (last_ts - window_start) / window)
+            return None
+        finally:
+            if origin is not None and resume_at is None:
+                stats.target_span += (last_ts - origin) * scale
+                stats.actual_span += time.perf_counter() - self._wall_origin
+
+    def _take_seek(self) -> Optional[int]:
+        """Resolve a pending seek to a frame index and publish the state there"""
+        timestamp, self._seek_to = self._seek_to, None
+        if timestamp is None or self._stop.is_set():
+            return None
+        index = min(max(self.session.index_at_time(timestamp), self.start_index), self.stop_index)
+        if self.on_seek:
+            state = self.snapshots.state_at(index) if self.snapshots else {}
+            if self.can_ids is not None:
+                state = {can_id: fr for can_id, fr in state.items() if can_id in self.can_ids}
+            self.on_seek(index, state)
+        return index
+
+    def _deliver(self, frames: List[CANFrame], offset: float) -> bool:
+        """Hand frames over at their deadline; False if a seek or stop came first"""
+        while True:
+            if self._paused:
+                self._hold()
+            if self._stop.is_set() or self._seek_to is not None:
+                return False
+            if not self.scale or self._wait_until(self._wall_origin + offset):
+                break
+        if self.scale:
+            late = time.perf_counter() - (self._wall_origin + offset)
+            for _ in frames:
+                self.stats.add(late)
+        if self.on_frames:
+            began = time.perf_counter()
+            self.on_frames(frames)
+            stalled = time.perf_counter() - began
+            if self.scale and stalled > PLAYBACK_SPIN_S:
+                # The consumer held us up (transmit waiting on the port): keep later frames' spacing
+                self._wall_origin += stalled
+            # Flat out: let the GUI thread at the GIL between batches
+            time.sleep(0)
+        return True
+
+
+# --- SERIAL INPUT ---
+# Binary wire format (little endian), 13 + DLC bytes per frame:
+#   [0]        sync byte 0xA5
+#   [1:5]      uint32 ID word: bits 0-28 CAN ID, bit 29 RTR, bit 30 IDE
+#   [5]        DLC (0-8)
+#   [6:6+DLC]  payload
+#   [+4]       uint32 device timestamp in microseconds (wraps)
+#   [+2]       uint16 CRC-16/CCITT (binascii.crc_hqx, init 0xFFFF) over ID word .. timestamp
+# Text format: "FRAME:ID|RTR|IDE|DLC|B0 B1 ...\n" with hex ID and bytes.
+BIN_SYNC = 0xA5
+BIN_HEADER = struct.Struct("<IB")
+BIN_TRAILER = struct.Struct("<IH")
+BIN_MIN_LEN = 1 + BIN_HEADER.size + BIN_TRAILER.size
+BIN_MODE_COMMAND = b"MODE:BIN\n"
+
+CAN_ID_MASK = 0x1FFFFFFF
+STD_ID_MASK = 0x7FF
+
+# Acceptance filters: the firmware passes a frame when (id & mask) == (filter & mask)
+# for any loaded pair, before it reaches the UART.
+#   "FILTER:CLEAR\n"               accept everything
+#   "FILTER:STD|100|7F0\n"         add an 11-bit filter/mask pair
+#   "FILTER:EXT|18FF0000|1FFF0000\n" add a 29-bit pair
+FILTER_CLEAR_COMMAND = b"FILTER:CLEAR\n"
+
+
+def plan_acceptance_filters(ids, banks: int = HW_FILTER_BANKS) -> List[tuple]:
+    """Cover `ids` with at most `banks` (ide, filter, mask) pairs passing as few other IDs as possible.
+
+    Starts with one exact pair per ID and greedily merges the pair of sorted
+    neighbours whose merge passes the fewest extra IDs; only neighbours are
+    candidates, so planning stays O(n log n). Standard and extended IDs are
+    never merged. The whitelist does not say which frame format an ID uses,
+    so IDs up to 0x7FF get both a standard and an extended pair. Returns []
+    (accept all) when the IDs cannot fit the banks.
+    """
+    ordered = sorted(set(ids))
+    pairs = {}
+    prev, nxt = {}, {}  # Neighbours in ID order within each frame format
+    for ide, width_mask in ((0, STD_ID_MASK), (1, CAN_ID_MASK)):
+        last = None
+        for can_id in ordered:
+            if not ide and can_id > STD_ID_MASK:
+                continue
+            key = len(pairs)
+            pairs[key] = (ide, can_id & width_mask, width_mask)
+            prev[key], nxt[key] = last, None
+            if last is not None:
+                nxt[last] = key
+            last = key
+
+    def passed(ide, mask):
+        width = 29 if ide else 11
+        return 1 << (width - bin(mask).count("1"))
+
+    def merge_cost(a, b):
+        ide_a, id_a, mask_a = pairs[a]
+        ide_b, id_b, mask_b = pairs[b]
+        mask = mask_a & mask_b & ~(id_a ^ id_b)
+        return passed(ide_a, mask) - passed(ide_a, mask_a) - passed(ide_b, mask_b)
+
+    # Candidate merges in a heap; entries whose pairs changed since are skipped
+    heap = [(merge_cost(a, b), a, b) for a, b in nxt.items() if b is not None]
+    heapq.heapify(heap)
+    next_key = len(pairs)
+    while len(pairs) > max(banks, 1):
+        if not heap:
+            # Standard and extended IDs left with a single bank
+            return []
+        cost, a, b = heapq.heappop(heap)
+        if a not in pairs or b not in pairs:
+            continue
+        ide, id_a, mask_a = pairs.pop(a)
+        _, id_b, mask_b = pairs.pop(b)
+        mask = mask_a & mask_b & ~(id_a ^ id_b)
+        merged = next_key
+        next_key += 1
+        pairs[merged] = (ide, id_a & mask, mask)
+        before, after = prev.pop(a), nxt.pop(b)
+        del nxt[a], prev[b]
+        prev[merged], nxt[merged] = before, after
+        if before is not None:
+            nxt[before] = merged
+            heapq.heappush(heap, (merge_cost(before, merged), before, merged))
+        if after is not None:
+            prev[after] = merged
+            heapq.heappush(heap, (merge_cost(merged, after), merged, after))
+    return list(pairs.values())
+
+
+def encode_filter_commands(pairs: List[tuple]) -> bytes:
+    """FILTER: commands replacing the firmware acceptance filters with `pairs` (none = accept all)"""
+    commands = [FILTER_CLEAR_COMMAND]
+    for ide, can_id, mask in pairs:
+        commands.append(f"FILTER:{'EXT' if ide else 'STD'}|{can_id:X}|{mask:X}\n".encode('ascii'))
+    return b"".join(commands)
+
+
+def parse_text_frame(payload: bytes) -> Optional[tuple]:
+    """Parse an ID|RTR|IDE|DLC|data payload into (id, rtr, ide, dlc, data, device_ts)"""
+    parts = payload.split(b"|")
+    if len(parts) < 5:
+        return None
+    try:
+        tokens = parts[4].split()
+        joined = b"".join(tokens)
+        if len(joined) == 2 * len(tokens):
+            data = binascii.unhexlify(joined)
+        else:
+            data = bytes(int(t, 16) for t in tokens)
+        return int(parts[0], 16), int(parts[1]), int(parts[2]), int(parts[3]), data, None
+    except (ValueError, binascii.Error):
+        return None
+
+
+def encode_binary_frame(can_id: int, rtr: int, ide: int, data: bytes, device_ts: int = 0) -> bytes:
+    """Encode a frame in the binary wire format (reference for firmware and simulators)"""
+    word = (can_id & CAN_ID_MASK) | ((rtr & 1) << 29) | ((ide & 1) << 30)
+    body = BIN_HEADER.pack(word, len(data)) + bytes(data) + struct.pack("<I", device_ts & 0xFFFFFFFF)
+    return bytes((BIN_SYNC,)) + body + struct.pack("<H", binascii.crc_hqx(body, 0xFFFF))
+
+
+def decode_binary_frame(buf, pos: int):
+    """Decode one binary frame starting at a sync byte.
+
+    Returns (frame, next_pos) for a valid frame, (None, pos + 1) for garbage
+    and (None, -1) when more bytes are needed.
+    """
+    if len(buf) - pos < BIN_MIN_LEN:
+        return None, -1
+    word, dlc = BIN_HEADER.unpack_from(buf, pos + 1)
+    if dlc > 8:
+        return None, pos + 1
+    data_end = pos + 1 + BIN_HEADER.size + dlc
+    end = data_end + BIN_TRAILER.size
+    if end > len(buf):
+        return None, -1
+    device_ts, crc = BIN_TRAILER.unpack_from(buf, data_end)
+    if binascii.crc_hqx(bytes(buf[pos + 1:data_end + 4]), 0xFFFF) != crc:
+        return None, pos + 1
+    frame = (word & CAN_ID_MASK, (word >> 29) & 1, (word >> 30) & 1, dlc,
+             bytes(buf[pos + 1 + BIN_HEADER.size:data_end]), device_ts)
+    return frame, end
+
+
+class SerialFrameReader:
+    """Reads CAN frames from the serial port in bulk chunks (text or binary framing)"""
+
+    FRAME_PREFIX = b"FRAME:"
+    MAX_UNDETECTED = 64 * 1024  # Bytes kept while the protocol is still unknown
+
+    def __init__(self, ser: serial.Serial, mode: str = SERIAL_READ_MODE, chunk_size: int = SERIAL_CHUNK_SIZE,
+                 protocol: str = SERIAL_PROTOCOL):
+        self.ser = ser
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.protocol = "text" if mode == "line" else protocol
+        self.crc_errors = 0
+        self._chunk = bytearray(chunk_size)
+        self._chunk_view = memoryview(self._chunk)
+        self._pending = bytearray()  # Partial line/frame carried over between reads
+
+    def request_binary(self, write: Optional[Callable[[bytes], object]] = None):
+        """Ask the firmware to switch to binary framing, through `write` if given"""
+        (write or self.ser.write)(BIN_MODE_COMMAND)
+        self.protocol = "auto"
+
+    def read_frames(self) -> List[tuple]:
+        """Return complete frames as (id, rtr, ide, dlc, data, device_ts), blocking up to the port timeout"""
+        if self.mode == "line":
+            line = self.ser.readline()
+            if line.startswith(self.FRAME_PREFIX):
+                frame = parse_text_frame(line[len(self.FRAME_PREFIX):].strip())
+                return [frame] if frame else []
+            return []
+
+        # Everything that is waiting, or block for the first byte (up to ser.timeout)
+        size = min(max(self.ser.in_waiting, 1), self.chunk_size)
+        n = self.ser.readinto(self._chunk_view[:size])
+        if not n:
+            return []
+        return self.feed(self._chunk_view[:n])
+
+    def feed(self, data) -> List[tuple]:
+        """Append raw bytes and decode every complete frame"""
+        self._pending += data
+        if self.protocol == "auto":
+            self.protocol = self._detect_protocol()
+            if self.protocol == "auto":
+                if len(self._pending) > self.MAX_UNDETECTED:
+                    del self._pending[:-self.chunk_size]
+                return []
+        if self.protocol == "binary":
+            return self._feed_binary()
+        return [f for f in map(parse_text_frame, self.feed_lines()) if f]
+
+    def feed_lines(self) -> List[bytes]:
+        """Split every complete FRAME: line out of the pending buffer (prefix stripped)"""
+        pending = self._pending
+        end = pending.rfind(b"\n")
+        if end < 0:
+            return []
+
+        prefix = self.FRAME_PREFIX
+        skip = len(prefix)
+        lines = [line[skip:].rstrip(b"\r") for line in pending[:end].split(b"\n") if line.startswith(prefix)]
+        del pending[:end + 1]
+        return lines
+
+    def _feed_binary(self) -> List[tuple]:
+        """Decode binary frames, resynchronising on the sync byte after garbage"""
+        buf = self._pending
+        frames = []
+        pos = 0
+        while True:
+            pos = buf.find(BIN_SYNC, pos)
+            if pos < 0:
+                pos = len(buf)
+                break
+            frame, next_pos = decode_binary_frame(buf, pos)
+            if next_pos < 0:
+                break
+            if frame is None:
+                self.crc_errors += 1
+            else:
+                frames.append(frame)
+            pos = next_pos
+        del buf[:pos]
+        return frames
+
+    def _detect_protocol(self) -> str:
+        """Pick text or binary framing from the bytes seen so far"""
+        buf = self._pending
+        if self.FRAME_PREFIX in buf:
+            return "text"
+        pos = buf.find(BIN_SYNC)
+        while pos >= 0:
+            frame, next_pos = decode_binary_frame(buf, pos)
+            if frame is not None:
+                del buf[:pos]
+                return "binary"
+            if next_pos < 0:
+                break
+            pos = buf.find(BIN_SYNC, pos + 1)
+        return "auto"
+
+    def reset(self):
+        """Drop any partially received data"""
+        self._pending.clear()
+
+
+class FrameClock:
+    """Host timestamps for the frames of each read.
+
+    Binary frames carry the firmware's wrapping microsecond counter, which is
+    unwrapped and anchored so the last frame of a read lands on the read time;
+    the anchor only moves when a read would land in the future (device clock
+    fast, firmware restart) or DEVICE_CLOCK_RESYNC_S behind. Text frames have
+    no device time and are spread evenly over the time since the previous
+    read, at most `max_spread` seconds.
+    """
+
+    WRAP = 1 << 32
+
+    def __init__(self, max_spread: float = 0.1):
+        self.max_spread = max_spread
+        self._offset: Optional[float] = None  # Host time of device time zero
+        self._last_ts = 0
+        self._base = 0  # Wrapped device time so far (us)
+        self._last_read: Optional[float] = None
+
+    def frames(self, raw_frames: List[tuple], now: float) -> List[CANFrame]:
+        """CANFrames for (id, rtr, ide, dlc, data, device_ts) tuples read at host time `now`"""
+        last_read, self._last_read = self._last_read, now
+        if raw_frames[0][5] is None:
+            count = len(raw_frames)
+            spread = min(now - last_read, self.max_spread) if last_read is not None else 0.0
+            start = now - spread
+            step = spread / count
+            return [CANFrame(start + step * (k + 1), can_id, rtr | (ide << 1), dlc, data)
+                    for k, (can_id, rtr, ide, dlc, data, device_ts) in enumerate(raw_frames)]
+
+        times = []
+        last_ts = self._last_ts
+        base = self._base
+        for raw in raw_frames:
+            device_ts = raw[5]
+            if device_ts < last_ts:
+                base += self.WRAP
+            last_ts = device_ts
+            times.append((base + device_ts) * 1e-6)
+        self._last_ts = last_ts
+        self._base = base
+        offset = self._offset
+        if offset is None or not now - DEVICE_CLOCK_RESYNC_S <= offset + times[-1] <= now:
+            offset = self._offset = now - times[-1]
+        return [CANFrame(offset + t, can_id, rtr | (ide << 1), dlc, data)
+                for t, (can_id, rtr, ide, dlc, data, device_ts) in zip(times, raw_frames)]
+
+
+# --- TRANSMIT ---
+def encode_send_command(can_id: str, data: str) -> bytes:
+    """SEND command line for the firmware: hex ID and space separated hex bytes"""
+    return f"SEND:{can_id}|{data}\n".encode('utf-8')
+
+
+class SerialTxPath:
+    """The one writer of the serial port: a lock, a batching writer thread and an encoded command cache.
+
+    submit() queues encoded commands; the writer thread joins whatever is
+    pending (up to TX_MAX_WRITE bytes) into one write, so commands that pile
+    up while the port is busy go out together. Once TX_MAX_PENDING commands
+    are queued, submit() blocks, so producers run at the port's pace instead
+    of building an ever longer backlog. write_now() writes
+    synchronously under the same lock, for callers that need the result or
+    their own timing. A write error drops what is pending, is reported
+    through on_error(error) on the writer thread and stays in `error` until
+    a caller takes it with take_error().
+    """
+
+    def __init__(self, ser, on_error: Optional[Callable] = None):
+        self.ser = ser
+        self.on_error = on_error
+        self.error: Optional[Exception] = None
+        self.commands_sent = 0
+        self.bytes_sent = 0
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._cache: Dict[tuple, bytes] = {}
+        self._closed = False
+        self._last_sample = (time.perf_counter(), 0, 0)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def command(self, can_id: str, data: str) -> bytes:
+        """Encoded SEND command for a hex ID and data string"""
+        key = (can_id, data)
+        command = self._cache.get(key)
+        if command is None:
+            if len(self._cache) >= TX_CACHE_SIZE:
+                self._cache.clear()
+            command = self._cache[key] = encode_send_command(can_id, data)
+        return command
+
+    def frame_command(self, frame: CANFrame) -> bytes:
+        """Encoded SEND command for a captured frame"""
+        key = (frame.can_id, frame.flags, frame.dlc, frame.data)
+        command = self._cache.get(key)
+        if command is None:
+            if len(self._cache) >= TX_CACHE_SIZE:
+                self._cache.clear()
+            command = self._cache[key] = encode_send_command(frame.id_str, format_data(frame.payload))
+        return command
+
+    def take_error(self) -> Optional[Exception]:
+        """Return the last write error and clear it"""
+        error, self.error = self.error, None
+        return error
+
+    @property
+    def depth(self) -> int:
+        """Commands waiting for the writer thread"""
+        return len(self._pending)
+
+    def submit(self, command: bytes):
+        self.submit_many((command,))
+
+    def submit_many(self, commands: List[bytes]):
+        """Queue commands, blocking while TX_MAX_PENDING are already waiting"""
+        pending = self._pending
+        with self._cond:
+            for command in commands:
+                while len(pending) >= TX_MAX_PENDING and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                pending.append(command)
+                self._cond.notify_all()
+
+    def write_now(self, data: bytes):
+        """Write immediately, in order with anything the writer thread sends; raises on error"""
+        with self._write_lock:
+            self.ser.write(data)
+            self.commands_sent += data.count(b"\n")
+            self.bytes_sent += len(data)
+
+    def sample(self) -> tuple:
+        """(commands/s, bytes/s) since the previous call"""
+        now = time.perf_counter()
+        then, commands, sent = self._last_sample
+        self._last_sample = (now, self.commands_sent, self.bytes_sent)
+        elapsed = now - then
+        if elapsed <= 0:
+            return 0.0, 0.0
+        return (self.commands_sent - commands) / elapsed, (self.bytes_sent - sent) / elapsed
+
+    def _run(self):
+        pending = self._pending
+        while True:
+            with self._cond:
+                while not pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                batch = []
+                size = 0
+                while pending and size < TX_MAX_WRITE:
+                    command = pending.popleft()
+                    batch.append(command)
+                    size += len(command)
+                # Room again for blocked submitters
+                self._cond.notify_all()
+            try:
+                self.write_now(b"".join(batch))
+            except Exception as e:
+                self.error = e
+                with self._cond:
+                    pending.clear()
+                    self._cond.notify_all()
+                print(f"Serial write error: {e}")
+                if self.on_error:
+                    self.on_error(e)
+
+    def close(self):
+        """Stop the writer, dropping anything pending, and close the port"""
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._cond.notify_all()
+        with self._write_lock:
+            try:
+                self.ser.close()
+            except:
+                pass
+
+
+class TxJob:
+    """One cyclic transmission and its counters"""
+
+    __slots__ = ('job_id', 'label', 'command', 'period', 'remaining', 'deadline', 'active',
+                 'sent', 'missed', 'worst_late', 'on_done')
+
+    def __init__(self, job_id: int, label: str, command: bytes, period: float,
+                 count: Optional[int], deadline: float, on_done: Optional[Callable]):
+        self.job_id = job_id
+        self.label = label
+        self.command = command
+        self.period = period
+        self.remaining = count  # None repeats until removed
+        self.deadline = deadline
+        self.active = True
+        self.sent = 0
+        self.missed = 0         # Deadlines skipped because the writer fell a whole period behind
+        self.worst_late = 0.0   # Seconds
+        self.on_done = on_done  # (job, error) once the count runs out, or on a write error
+
+
+class TxScheduler:
+    """Sends any number of cyclic commands from one thread against absolute deadlines.
+
+    Jobs sit in a heap keyed by their next deadline, which advances by whole
+    periods so jitter never accumulates. Commands due within TX_COALESCE_S of
+    each other go out in a single write. Jobs can be added and removed while
+    it runs; a write error ends every job.
+    """
+
+    def __init__(self, write: Callable[[bytes], object]):
+        self.write = write
+        self._heap: List[tuple] = []
+        self._jobs: Dict[int, TxJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, label: str, command: bytes, period_s: float, count: Optional[int] = None,
+            on_done: Optional[Callable] = None) -> TxJob:
+        """Schedule `command` every `period_s` (at least TX_MIN_PERIOD_S), first right away; returns the job"""
+        with self._lock:
+            job_id = next(self._ids)
+            job = TxJob(job_id, label, command, max(period_s, TX_MIN_PERIOD_S), count, time.perf_counter(),
+                        on_done)
+            self._jobs[job_id] = job
+            heapq.heappush(self._heap, (job.deadline, job_id, job))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return job
+
+    def remove(self, job_id: int):
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job:
+                job.active = False  # Its heap entry is dropped when it comes up
+
+    def clear(self):
+        """End every job, reporting each through its on_done"""
+        for job in self._end_all():
+            if job.on_done:
+                job.on_done(job, None)
+
+    def _end_all(self) -> List[TxJob]:
+        with self._lock:
+            ended = list(self._jobs.values())
+            for job in ended:
+                job.active = False
+            self._jobs.clear()
+            self._heap.clear()
+        return ended
+
+    def jobs(self) -> List[TxJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _next_deadline(self) -> Optional[float]:
+        with self._lock:
+            heap = self._heap
+            while heap and not heap[0][2].active:
+                heapq.heappop(heap)
+            return heap[0][0] if heap else None
+
+    def _run(self):
+        while True:
+            deadline = self._next_deadline()
+            if deadline is None:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining > TX_SPIN_S:
+                # Woken early when a job is added, so its deadline is considered
+                self._wake.wait(remaining - TX_SPIN_S)
+                self._wake.clear()
+                continue
+            while time.perf_counter() < deadline:
+                time.sleep(0)
+            self._send_due()
+
+    def _send_due(self):
+        now = time.perf_counter()
+        batch = []
+        finished = []
+        requeue = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now + TX_COALESCE_S:
+                deadline, job_id, job = heapq.heappop(heap)
+                if not job.active:
+                    continue
+                batch.append(job.command)
+                job.sent += 1
+                late = now - deadline
+                if late > job.worst_late:
+                    job.worst_late = late
+                if job.remaining is not None:
+                    job.remaining -= 1
+                    if job.remaining <= 0:
+                        job.active = False
+                        del self._jobs[job_id]
+                        finished.append(job)
+                        continue
+                deadline += job.period
+                if deadline < now:
+                    # Fell a whole period behind: skip the missed slots rather than burst
+                    skipped = int((now - deadline) // job.period) + 1
+                    job.missed += skipped
+                    deadline += skipped * job.period
+                job.deadline = deadline
+                requeue.append((deadline, job_id, job))
+            for item in requeue:
+                heapq.heappush(heap, item)
+        error = None
+        if batch:
+            try:
+                self.write(b"".join(batch))
+            except Exception as e:
+                error = e
+                print(f"Cyclic transmit error: {e}")
+                finished.extend(self._end_all())
+        for job in finished:
+            if job.on_done:
+                job.on_done(job, error)
+
+
+class ModernCANApp(ctk.CTk):
+    def __init__(self, grouped_renderer: str = GROUPED_RENDERER):
         super().__init__()
         self.title("CAN Sniffer")
         self.geometry("1920x1080")
         self.minsize(1400, 700)
 
         # Data structures
+        self.grouped_renderer = grouped_renderer
+        self.grouped_table: Optional[GroupedCanvasTable] = None
         self.can_rows: Dict = {}
-        self.all_msgs_widgets: List = []
-        self.can_queue = queue.Queue()
-        self.session_log: List = []
+        self.can_queue = FrameQueue()  # Feeds the Stream view
+        self.grouped_stage = GroupedCoalescer()  # Feeds the Grouped view
+        self.id_states = IDStateTable()  # Per-ID change tracker, updated by the listener
+        self._stream_active = False  # Plain flag the listener thread can read
+        self._drain_budget = QUEUE_DRAIN_MIN_BUDGET_MS / 1000.0
+
+        # Render loop state: highlight expiry times instead of per-cell after() callbacks
+        self._next_render = 0.0
+        self._byte_highlights: Dict[tuple, float] = {}  # (can_id, byte index) -> expiry
+        self._row_fades: Dict[str, float] = {}  # can_id -> expiry
+        self.session_log = CaptureLog()
 
         # Statistics
         self.stats = {
@@ -62,72 +3130,113 @@ class ModernCANApp(ctk.CTk):
         }
 
         # Load databases
-        self.id_labels = self._load_db(DB_IDS)
-        self.function_labels = self._load_db(DB_FUNCTIONS)
+        self.id_store = JsonStore(DB_IDS)
+        self.id_labels: Dict[str, str] = {}  # Both replaced once the background load finishes
+        self.function_store = JsonStore(DB_FUNCTIONS)
+        self.function_db = FunctionDB()
+        self._databases_ready = False
+        self._tx_entries: Dict[str, int] = {}  # TX combo label -> FunctionDB entry id
 
         self.message_queue = []
         self.is_queue_running = False
+        self._queue_jobs: List[TxJob] = []  # Cyclic jobs started from the queue manager
 
         # Counters
         self.row_counter_grouped = 1
-        self.row_counter_all = 1
 
         # Connection state
         self.ser: Optional[serial.Serial] = None
+        self.tx: Optional[SerialTxPath] = None  # Every write to self.ser goes through this
         self.is_sniffing = False
         self.is_sending_active = False
         self.is_paused = False
+        # All cyclic transmission runs on this one scheduler thread
+        self.tx_scheduler = TxScheduler(self._serial_write)
+        self._send_job: Optional[TxJob] = None
 
-        # Filter state
+        # Filter state - compiled into self.frame_filter, applied on the listener thread
+        self.filter_settings = dict(DEFAULT_FILTER_SETTINGS)
+        self.frame_filter: Optional[Callable[[CANFrame], bool]] = None
         self.filter_id = ""
 
-        # ADD THIS:
         self.sort_newest_first = False  # False = oldest first (default), True = newest first
+        self.sort_key = "Arrival"  # Grouped view sort key, see IDStateTable.SORT_KEYS
         # Playback state (NEW)
         self.is_playing_back = False
         self.playback_thread = None
-        self.loaded_session = []
+        self.playback_engine: Optional[PlaybackEngine] = None  # Replay of the loaded session, if any
+        self._scrub_worker: Optional[threading.Thread] = None  # Reads the preview state while scrubbing
+        self.loaded_session = CaptureLog()
+        self.loaded_latest: Dict[int, CANFrame] = {}  # Last frame per ID of the loaded session
+        self.loaded_snapshots = None  # Per-ID state index of the loaded session, for seeking
 
         # Session start timestamp for relative time (NEW)
-        self.session_start_time: Optional[datetime] = None
+        self.session_start_time: Optional[float] = None
+        self.monitor_origin: Optional[float] = None  # Shown as 0.0 s: live session start or loaded first frame
 
         # Window close handler
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
 
+        # Fonts reused by the render loop (creating one per update is expensive)
+        self._font_byte = ctk.CTkFont(weight="normal", size=11)
+        self._font_byte_highlight = ctk.CTkFont(weight="bold", size=12)
+
         self._build_modern_ui()
         self._update_tx_list()
-        self.after(10, self._process_queue)
+        threading.Thread(target=self._load_databases, daemon=True).start()
+        self.after(10, self._render_loop)
         self.after(1000, self._update_stats_display)
 
     def _on_closing(self):
         """Clean up resources on window close"""
         self.is_sniffing = False
         self.is_playing_back = False
+        self.tx_scheduler.clear()
+        if self.tx:
+            self.tx.close()
         if self.ser and self.ser.is_open:
             try:
                 self.ser.close()
             except:
                 pass
-        self.destroy()
-
-    def _load_db(self, path: str) -> Dict:
-        """Load JSON database with error handling"""
-        if os.path.exists(path):
+        self.session_log.close()
+        self._release_loaded_session()
+        self.loaded_session.close()
+        for store in (self.id_store, self.function_store):
             try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                store.compact()
             except Exception as e:
-                print(f"Error loading {path}: {e}")
-                return {}
-        return {}
+                print(f"Compaction of {store.path} failed: {e}")
+        self.destroy()
 
-    def _save_db(self, path: str, data: Dict):
-        """Save JSON database"""
+    def _load_databases(self):
+        """Load the ID and function databases and index functions off the UI thread"""
+        labels = self.id_store.data
+        db = FunctionDB(self.function_store.data)
+        self.after(0, lambda: self._install_databases(labels, db))
+
+    def _install_databases(self, labels: Dict[str, str], db: FunctionDB):
+        self.id_labels = labels
+        self.function_db = db
+        self._databases_ready = True
+        for can_id, row in self.can_rows.items():
+            if can_id in labels:
+                row['dev_lbl'].configure(text=labels[can_id], text_color=Colors.SUCCESS)
+        self._update_tx_list()
+        self.stream_table.refresh(force=True)
+
+    def _check_databases(self) -> bool:
+        """False (with a status message) while the databases are still loading"""
+        if not self._databases_ready:
+            self._show_status("⏳ Databases are still loading", 2000, Colors.WARNING)
+        return self._databases_ready
+
+    def _commit_db(self, store: JsonStore, ops: List[tuple]):
+        """Journal one database edit"""
         try:
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            store.commit(ops)
         except Exception as e:
-            messagebox.showerror("Save Error", f"Failed to save {path}:\n{str(e)}")
+            messagebox.showerror("Save Error", f"Failed to save {store.path}:\n{str(e)}")
 
     def _build_modern_ui(self):
         """Build modern, clean UI with better layout"""
@@ -430,7 +3539,19 @@ class ModernCANApp(ctk.CTk):
             hover_color="#0891B2",
             corner_radius=8
         )
-        self.btn_sort.pack(side="left", padx=(0, 20), pady=15)
+        self.btn_sort.pack(side="left", padx=(0, 10), pady=15)
+
+        self.sort_key_menu = ctk.CTkOptionMenu(
+            top_bar,
+            values=list(IDStateTable.SORT_KEYS),
+            command=self._on_sort_key,
+            width=120,
+            fg_color=Colors.BG_LIGHT,
+            button_color=Colors.INFO,
+            button_hover_color="#0891B2"
+        )
+        self.sort_key_menu.set(self.sort_key)
+        self.sort_key_menu.pack(side="left", padx=(0, 20), pady=15)
 
         # Filter controls
         filter_frame = ctk.CTkFrame(top_bar, fg_color="transparent")
@@ -447,6 +3568,7 @@ class ModernCANApp(ctk.CTk):
             border_color=Colors.BG_LIGHT
         )
         self.filter_entry.pack(side="left", padx=5)
+        self.filter_entry.bind("<KeyRelease>", lambda e: self._compile_filters())
 
         # Advanced filters button
         ctk.CTkButton(
@@ -467,257 +3589,64 @@ class ModernCANApp(ctk.CTk):
         else:
             self.btn_sort.configure(text="▼ Oldest First")
 
-        # Rebuild current view
-        current_mode = self.view_mode.get()
-        if current_mode == "Grouped":
-            self._rebuild_grouped_view()
-        else:
-            self._rebuild_stream_view()
+        # Both views are model-backed, reordering them is cheap
+        self._rebuild_grouped_view()
+        self._rebuild_stream_view()
 
-    def _rebuild_grouped_view(self):
-        """Rebuild grouped view with current sort order"""
-        # Store current data
-        stored_rows = {}
-        for can_id, row_data in self.can_rows.items():
-            stored_rows[can_id] = {
-                'last_data': row_data['last_data'].copy(),
-                'dev_name': row_data['dev_lbl'].cget("text"),
-                'func_name': row_data['func_lbl'].cget("text"),
-                'timestamp': row_data.get('timestamp', 0.0)  # NEW
-            }
+    def _on_sort_key(self, value: str):
+        """Sort grouped rows by ID, count, period, last change or arrival"""
+        self.sort_key = value
+        self._rebuild_grouped_view()
 
-        # Clear display
-        for r in self.can_rows.values():
-            for w in r['widgets']:
-                try:
-                    w.destroy()
-                except:
-                    pass
+    def _clear_grouped_rows(self):
+        """Remove every grouped row from whichever renderer is active"""
+        if self.grouped_table is not None:
+            self.grouped_table.clear()
+        else:
+            for r in self.can_rows.values():
+                for w in r['widgets']:
+                    try:
+                        w.destroy()
+                    except:
+                        pass
         self.can_rows.clear()
-
-        # Sort IDs
-        sorted_ids = sorted(stored_rows.keys())
-        if self.sort_newest_first:
-            sorted_ids = reversed(sorted_ids)
-
-        # Rebuild in new order
         self.row_counter_grouped = 1
-        for can_id in sorted_ids:
-            data = stored_rows[can_id]
-            dev_name = data['dev_name']
-            func_name = data['func_name']
-            bytes_list = data['last_data']
-            timestamp = data['timestamp']  # NEW
-
-            # Create row
-            row = self.row_counter_grouped
-            self.row_counter_grouped += 1
-            bg = Colors.BG_DARK
-
-            # NEW: Timestamp label
-            time_l = ctk.CTkLabel(
-                self.scroll_grouped,
-                text=f"{timestamp:.3f}",
-                text_color=Colors.TEXT_MUTED,
-                width=70,
-                fg_color=bg,
-                font=ctk.CTkFont(size=11)
-            )
-            time_l.grid(row=row, column=0, padx=4, pady=4, sticky="ew")
-
-            id_l = ctk.CTkLabel(
-                self.scroll_grouped,
-                text=can_id,
-                text_color=Colors.PRIMARY,
-                cursor="hand2",
-                width=60,
-                fg_color=bg,
-                font=ctk.CTkFont(size=11, weight="bold")
-            )
-            id_l.grid(row=row, column=1, padx=4, pady=4, sticky="ew")
-            id_l.bind("<Button-1>", lambda e, cid=can_id: self._open_id_edit(cid))
-
-            dev_l = ctk.CTkLabel(
-                self.scroll_grouped,
-                text=dev_name,
-                text_color=Colors.SUCCESS if dev_name != "Unknown" else Colors.TEXT_MUTED,
-                width=100,
-                fg_color=bg,
-                font=ctk.CTkFont(size=11)
-            )
-            dev_l.grid(row=row, column=2, padx=4, pady=4, sticky="ew")
-
-            func_l = ctk.CTkLabel(
-                self.scroll_grouped,
-                text=func_name,
-                text_color=Colors.WARNING if func_name != "---" else Colors.TEXT_MUTED,
-                width=120,
-                fg_color=bg,
-                font=ctk.CTkFont(size=11)
-            )
-            func_l.grid(row=row, column=3, padx=4, pady=4, sticky="ew")
-
-            rtr_l = ctk.CTkLabel(self.scroll_grouped, text="0", text_color=Colors.TEXT_SECONDARY, width=35, fg_color=bg,
-                                 font=ctk.CTkFont(size=11))
-            rtr_l.grid(row=row, column=4, padx=4, pady=4, sticky="ew")
-
-            ide_l = ctk.CTkLabel(self.scroll_grouped, text="0", text_color=Colors.TEXT_SECONDARY, width=35, fg_color=bg,
-                                 font=ctk.CTkFont(size=11))
-            ide_l.grid(row=row, column=5, padx=4, pady=4, sticky="ew")
 
-            dlc_l = ctk.CTkLabel(self.scroll_grouped, text="8", text_color=Colors.TEXT_SECONDARY, width=35, fg_color=bg,
-                                 font=ctk.CTkFont(size=11))
-            dlc_l.grid(row=row, column=6, padx=4, pady=4, sticky="ew")
-
-            # Data bytes
-            b_labels = []
-            for j in range(8):
-                val = bytes_list[j] if j < len(bytes_list) else "00"
-                color = Colors.DANGER if val != "00" else Colors.TEXT_MUTED
-                l = ctk.CTkLabel(
-                    self.scroll_grouped,
-                    text=val,
-                    text_color=color,
-                    width=45,
-                    fg_color=bg,
-                    font=ctk.CTkFont(size=11)
-                )
-                l.grid(row=row, column=7 + j, padx=4, pady=4, sticky="ew")
-                b_labels.append(l)
-
-            btn = ctk.CTkButton(
-                self.scroll_grouped,
-                text="+",
-                width=40,
-                height=28,
-                command=lambda cid=can_id: self._save_function(cid),
-                fg_color=Colors.SUCCESS,
-                hover_color="#059669",
-                corner_radius=6,
-                font=ctk.CTkFont(size=14, weight="bold")
-            )
-            btn.grid(row=row, column=15, padx=4, pady=4)
-
-            widgets = [time_l, id_l, dev_l, func_l, rtr_l, ide_l, dlc_l] + b_labels
-            self.can_rows[can_id] = {
-                'time_lbl': time_l,  # NEW
-                'dev_lbl': dev_l,
-                'func_lbl': func_l,
-                'bytes': b_labels,
-                'last_data': bytes_list.copy(),
-                'widgets': widgets + [btn],
-                'bg': bg,
-                'timestamp': timestamp  # NEW
-            }
-
-    def _rebuild_stream_view(self):
-        """Rebuild stream view with current sort order"""
-        # Store current messages
-        stored_messages = []
-        for widgets in self.all_msgs_widgets:
-            if len(widgets) >= 15:  # Ensure we have all widgets
-                try:
-                    msg_data = {
-                        'id': widgets[0].cget("text"),
-                        'device': widgets[1].cget("text"),
-                        'function': widgets[2].cget("text"),
-                        'rtr': widgets[3].cget("text"),
-                        'ide': widgets[4].cget("text"),
-                        'dlc': widgets[5].cget("text"),
-                        'bytes': [widgets[6 + i].cget("text") for i in range(8)],
-                        'time': widgets[14].cget("text")
-                    }
-                    stored_messages.append(msg_data)
-                except:
-                    pass
+    def _rebuild_grouped_view(self):
+        """Reorder grouped rows by the current sort key without recreating them"""
+        order = [f"{cid:X}" for cid in self.id_states.sorted_ids(self.sort_key, self.sort_newest_first)]
+        order = [cid for cid in order if cid in self.can_rows]
+        # Rows the model no longer knows (e.g. loaded sessions) keep their relative order at the end
+        known = set(order)
+        order += [cid for cid in self.can_rows if cid not in known]
+
+        if self.grouped_table is not None:
+            # Canvas rows are only moved
+            self.grouped_table.reorder(order)
+            return
 
-        # Clear display
-        for row_widgets in self.all_msgs_widgets:
-            for w in row_widgets:
+        for index, can_id in enumerate(order):
+            row = index + 1
+            for widget in self.can_rows[can_id]['widgets']:
                 try:
-                    w.destroy()
+                    if widget.grid_info().get('row') != row:
+                        widget.grid(row=row)
                 except:
                     pass
-        self.all_msgs_widgets.clear()
-
-        # Reverse if newest first
-        if self.sort_newest_first:
-            stored_messages = list(reversed(stored_messages))
-
-        # Rebuild
-        self.row_counter_all = 1
-        for msg in stored_messages:
-            row = self.row_counter_all
-            self.row_counter_all += 1
-            bg = Colors.BG_MEDIUM if row % 2 == 0 else Colors.BG_DARK
-
-            widgets = []
-
-            def add_lbl(txt, col, color=Colors.TEXT_PRIMARY, width=50):
-                l = ctk.CTkLabel(
-                    self.scroll_all,
-                    text=txt,
-                    fg_color=bg,
-                    text_color=color,
-                    width=width,
-                    anchor="w",
-                    font=ctk.CTkFont(size=11)
-                )
-                l.grid(row=row, column=col, padx=4, pady=1, sticky="ew")
-                widgets.append(l)
-
-            add_lbl(msg['id'], 0, Colors.PRIMARY, 80)
-            add_lbl(msg['device'], 1, Colors.SUCCESS if msg['device'] != "Unknown" else Colors.TEXT_MUTED, 120)
-            add_lbl(msg['function'], 2, Colors.WARNING if msg['function'] != "---" else Colors.TEXT_MUTED, 150)
-            add_lbl(msg['rtr'], 3, Colors.TEXT_SECONDARY, 40)
-            add_lbl(msg['ide'], 4, Colors.TEXT_SECONDARY, 40)
-            add_lbl(msg['dlc'], 5, Colors.TEXT_SECONDARY, 40)
-
-            for j in range(8):
-                val = msg['bytes'][j]
-                color = Colors.DANGER if val != "00" else Colors.TEXT_MUTED
-                add_lbl(val, 6 + j, color, 40)
+        self.row_counter_grouped = len(order) + 1
 
-            add_lbl(msg['time'], 14, Colors.TEXT_MUTED, 80)
-
-            # Add save button
-            data_str = " ".join(msg['bytes'])
-            btn = ctk.CTkButton(
-                self.scroll_all,
-                text="+",
-                width=30,
-                height=24,
-                command=lambda cid=msg['id'], ds=data_str: self._save_function_stream(cid, ds),
-                fg_color=Colors.SUCCESS,
-                hover_color="#059669",
-                corner_radius=6,
-                font=ctk.CTkFont(size=12, weight="bold")
-            )
-            btn.grid(row=row, column=15, padx=4, pady=1)
-            widgets.append(btn)
-
-            self.all_msgs_widgets.append(widgets)
+    def _rebuild_stream_view(self):
+        """Reorder stream view with current sort order"""
+        self.stream_table.set_newest_first(self.sort_newest_first)
 
     def _open_advanced_filters(self):
         """Open advanced filtering options"""
         win = ctk.CTkToplevel(self)
         win.title("Advanced Filters")
-        win.geometry("400x500")
+        win.geometry("400x620")
         win.attributes("-topmost", True)
         win.configure(fg_color=Colors.BG_DARK)
 
-        # Initialize filter settings if not exists
-        if not hasattr(self, 'filter_settings'):
-            self.filter_settings = {
-                'hide_periodic': False,
-                'hide_zero_data': False,
-                'show_only_changed': False,
-                'min_dlc': 0,
-                'max_dlc': 8,
-                'id_whitelist': [],
-                'id_blacklist': []
-            }
-
         main_frame = ctk.CTkFrame(win, fg_color=Colors.BG_DARK)
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
@@ -756,6 +3685,15 @@ class ModernCANApp(ctk.CTk):
             hover_color=Colors.SECONDARY
         ).pack(anchor="w", pady=5)
 
+        self.hw_filter_var = ctk.BooleanVar(value=self.filter_settings['hw_filter'])
+        ctk.CTkCheckBox(
+            main_frame,
+            text="Filter whitelist in sniffer hardware",
+            variable=self.hw_filter_var,
+            fg_color=Colors.PRIMARY,
+            hover_color=Colors.SECONDARY
+        ).pack(anchor="w", pady=5)
+
         # DLC Range
         ctk.CTkLabel(main_frame, text="DLC Range:", text_color=Colors.TEXT_SECONDARY).pack(anchor="w", pady=(15, 5))
 
@@ -785,14 +3723,35 @@ class ModernCANApp(ctk.CTk):
         self.blacklist_entry.insert(0, ",".join(self.filter_settings['id_blacklist']))
         self.blacklist_entry.pack(fill="x", pady=5)
 
+        ctk.CTkLabel(main_frame, text="Expression:",
+                     text_color=Colors.TEXT_SECONDARY).pack(anchor="w", pady=(15, 5))
+        self.expression_entry = ctk.CTkEntry(
+            main_frame,
+            placeholder_text="id in 0x100..0x1FF and d[2] & 0x80 and changed(d[4])",
+            fg_color=Colors.BG_MEDIUM
+        )
+        if self.filter_settings['expression']:
+            self.expression_entry.insert(0, self.filter_settings['expression'])
+        self.expression_entry.pack(fill="x", pady=5)
+
         # Buttons
         btn_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
         btn_frame.pack(pady=(20, 0))
 
         def apply_filters():
+            expression = self.expression_entry.get().strip()
+            if expression:
+                try:
+                    FilterExpression(expression)
+                except FilterSyntaxError as e:
+                    self._show_status(f"✗ Filter expression: {e}", 5000, Colors.DANGER)
+                    return
+            self.filter_settings['expression'] = expression
+
             self.filter_settings['hide_periodic'] = self.hide_periodic_var.get()
             self.filter_settings['hide_zero_data'] = self.hide_zero_var.get()
             self.filter_settings['show_only_changed'] = self.show_changed_var.get()
+            self.filter_settings['hw_filter'] = self.hw_filter_var.get()
 
             try:
                 self.filter_settings['min_dlc'] = int(self.min_dlc_entry.get())
@@ -806,20 +3765,16 @@ class ModernCANApp(ctk.CTk):
             blacklist = self.blacklist_entry.get().strip()
             self.filter_settings['id_blacklist'] = [x.strip().upper() for x in blacklist.split(",") if x.strip()]
 
+            self._compile_filters()
             self._show_status("✓ Filters applied", 3000, Colors.SUCCESS)
+            self._push_hw_filters()
             win.destroy()
 
         def reset_filters():
-            self.filter_settings = {
-                'hide_periodic': False,
-                'hide_zero_data': False,
-                'show_only_changed': False,
-                'min_dlc': 0,
-                'max_dlc': 8,
-                'id_whitelist': [],
-                'id_blacklist': []
-            }
+            self.filter_settings = dict(DEFAULT_FILTER_SETTINGS)
+            self._compile_filters()
             self._show_status("✓ Filters reset", 3000, Colors.INFO)
+            self._push_hw_filters()
             win.destroy()
 
         ctk.CTkButton(btn_frame, text="Apply", command=apply_filters,
@@ -829,53 +3784,76 @@ class ModernCANApp(ctk.CTk):
         ctk.CTkButton(btn_frame, text="Cancel", command=win.destroy,
                       fg_color=Colors.BG_LIGHT, width=120).pack(side="left", padx=5)
 
+    def _compile_filters(self):
+        """Rebuild the frame predicate from the quick ID filter and advanced settings"""
+        self.frame_filter = compile_frame_filter(self.filter_settings, self.filter_entry.get(), self.id_states)
+
+    def _push_hw_filters(self):
+        """Load acceptance filters generated from the whitelist into the sniffer firmware"""
+        if not (self.ser and self.ser.is_open):
+            return
+        pairs = []
+        ids = parse_id_list(self.filter_settings['id_whitelist']) if self.filter_settings['hw_filter'] else []
+        if ids:
+            pairs = plan_acceptance_filters(ids)
+        try:
+            self.tx.write_now(encode_filter_commands(pairs))
+        except Exception as e:
+            self._show_status(f"✗ Hardware filter: {e}", 5000, Colors.DANGER)
+            return
+        if pairs:
+            self._show_status(f"✓ {len(pairs)} hardware filter(s) loaded", 3000, Colors.SUCCESS)
+        elif ids:
+            self._show_status("⚠ Whitelist does not fit the hardware filters; accepting all IDs",
+                              5000, Colors.WARNING)
+
+    def _session_filter(self) -> Optional[Callable[[CANFrame], bool]]:
+        """Frame filter for loaded sessions, tracking per-ID state of its own"""
+        states = IDStateTable()
+        frame_filter = compile_frame_filter(self.filter_settings, self.filter_entry.get(), states)
+        if frame_filter is None:
+            return None
+
+        def accept(frame: CANFrame) -> bool:
+            states.update(frame)
+            return frame_filter(frame)
+
+        return accept
+
+    def _serial_write(self, data: bytes):
+        """Write raw bytes to the open port; raises when disconnected"""
+        tx = self.tx
+        if not tx or not self.ser or not self.ser.is_open:
+            raise serial.SerialException("Not connected")
+        tx.write_now(data)
+
+    def _on_tx_error(self, error: Exception):
+        """Called on the TX writer thread when a queued write fails"""
+        self.after(0, lambda: self._show_status(f"✗ Send failed: {error}", 3000, Colors.DANGER))
+
     def send_once(self):
         """Send selected message once"""
         if not self.ser or not self.ser.is_open:
             self._show_status("⚠ No connection!", 3000, Colors.WARNING)
             return
 
-        selection = self.tx_combo.get()
-        if not selection or selection == "No functions saved":
-            return
-
-        target_id = selection.split("]")[0].replace("[", "")
-        data_to_send = None
-
-        if target_id in self.function_labels:
-            mappings = self.function_labels[target_id].get("mappings", {})
-            for d_str, f_name in mappings.items():
-                if f"[{target_id}] {f_name}" in selection:
-                    data_to_send = d_str
-                    break
-
-        if data_to_send:
-            command = f"SEND:{target_id}|{data_to_send}\n"
+        entry = self._selected_tx_entry()
+        if entry:
+            target_id = entry.cid
             try:
-                self.ser.write(command.encode('utf-8'))
+                self.tx.write_now(self.tx.command(target_id, entry.tx_data))
                 self._show_status(f"✓ Sent: {target_id}", 2000, Colors.SUCCESS)
             except Exception as e:
                 self._show_status(f"✗ Send failed: {e}", 3000, Colors.DANGER)
 
     def add_to_queue(self):
         """Add selected message to queue with custom parameters"""
-        selection = self.tx_combo.get()
-        if not selection or selection == "No functions saved":
-            return
-
-        target_id = selection.split("]")[0].replace("[", "")
-        data_to_send = None
-        func_name = ""
+        entry = self._selected_tx_entry()
+        if entry:
+            target_id = entry.cid
+            data_to_send = entry.tx_data
+            func_name = entry.name
 
-        if target_id in self.function_labels:
-            mappings = self.function_labels[target_id].get("mappings", {})
-            for d_str, f_name in mappings.items():
-                if f"[{target_id}] {f_name}" in selection:
-                    data_to_send = d_str
-                    func_name = f_name
-                    break
-
-        if data_to_send:
             # Create dialog for parameters
             dialog = ctk.CTkToplevel(self)
             dialog.title("Add to Queue")
@@ -1097,8 +4075,43 @@ class ModernCANApp(ctk.CTk):
             self.is_queue_running = True
             threading.Thread(target=self._execute_queue, daemon=True).start()
 
+        def run_cyclic():
+            """Send every queued message at once, each every `delay` ms; repeat 0 runs until stopped"""
+            if not self.ser or not self.ser.is_open:
+                self._show_status("⚠ No connection!", 3000, Colors.WARNING)
+                return
+
+            if not self.message_queue:
+                self._show_status("⚠ Queue is empty!", 3000, Colors.WARNING)
+                return
+
+            stop_cyclic()
+            for msg in self.message_queue:
+                self._queue_jobs.append(self.tx_scheduler.add(
+                    msg['id'], self.tx.command(msg['id'], msg['data']),
+                    msg['delay'] / 1000.0, msg['repeat'] or None))
+            show_cyclic_counters()
+
+        def show_cyclic_counters():
+            if not win.winfo_exists():
+                return
+            jobs = [job for job in self._queue_jobs if job.active]
+            sent = sum(job.sent for job in self._queue_jobs)
+            missed = sum(job.missed for job in self._queue_jobs)
+            worst = max((job.worst_late for job in self._queue_jobs), default=0.0)
+            self.queue_status_label.configure(
+                text=f"Cyclic: {len(jobs)} active, {sent} sent, {missed} missed, worst late {worst * 1000:.1f} ms")
+            if jobs:
+                win.after(500, show_cyclic_counters)
+
+        def stop_cyclic():
+            for job in self._queue_jobs:
+                self.tx_scheduler.remove(job.job_id)
+            self._queue_jobs.clear()
+
         def stop_queue():
             self.is_queue_running = False
+            stop_cyclic()
 
         def clear_queue():
             self.message_queue.clear()
@@ -1112,6 +4125,14 @@ class ModernCANApp(ctk.CTk):
             width=120
         ).pack(side="right", padx=5)
 
+        ctk.CTkButton(
+            btn_frame,
+            text="⟳ Run Cyclic",
+            command=run_cyclic,
+            fg_color=Colors.INFO,
+            width=120
+        ).pack(side="right", padx=5)
+
         ctk.CTkButton(
             btn_frame,
             text="⏹ Stop",
@@ -1132,28 +4153,41 @@ class ModernCANApp(ctk.CTk):
         """Execute message queue in background thread"""
         self.after(0, lambda: self._show_status("▶ Queue running...", 0, Colors.INFO))
 
+        tx = self.tx
+        tx.take_error()  # Already reported; start clean
         for msg in self.message_queue:
-            if not self.is_queue_running or not self.is_sniffing:
+            if not self.is_queue_running or not self.is_sniffing or tx.error:
                 break
 
+            command = tx.command(msg['id'], msg['data'])
             for _ in range(msg['repeat']):
-                if not self.is_queue_running or not self.is_sniffing:
-                    break
-
-                command = f"SEND:{msg['id']}|{msg['data']}\n"
-                try:
-                    self.ser.write(command.encode('utf-8'))
-                except:
+                if not self.is_queue_running or not self.is_sniffing or tx.error:
                     break
 
+                tx.submit(command)
                 time.sleep(msg['delay'] / 1000.0)
 
         self.is_queue_running = False
-        self.after(0, lambda: self._show_status("✓ Queue completed", 3000, Colors.SUCCESS))
+        error = tx.take_error()
+        if error:
+            self.after(0, lambda: self._show_status(f"✗ Queue stopped: {error}", 5000, Colors.DANGER))
+        else:
+            self.after(0, lambda: self._show_status("✓ Queue completed", 3000, Colors.SUCCESS))
 
     def _build_content_frames(self):
         """Build content display frames"""
         # Grouped view
+        if self.grouped_renderer == "canvas":
+            self.grouped_table = GroupedCanvasTable(self.main_content, self._open_id_edit, self._save_function)
+            self.scroll_grouped = self.grouped_table.frame
+            self.scroll_grouped.grid(row=1, column=0, sticky="nsew", padx=0, pady=0)
+        else:
+            self._build_grouped_widget_frame()
+
+        self._build_stream_frame()
+
+    def _build_grouped_widget_frame(self):
+        """Build the scrollable frame and header for the widget-based grouped view"""
         self.scroll_grouped = ctk.CTkScrollableFrame(
             self.main_content,
             fg_color=Colors.BG_DARK,
@@ -1203,43 +4237,18 @@ class ModernCANApp(ctk.CTk):
             )
             label.grid(row=0, column=i, padx=4, pady=10, sticky="ew")
 
-        # Stream view (unchanged)
-        self.scroll_all = ctk.CTkScrollableFrame(
+    def _build_stream_frame(self):
+        """Build the virtualized stream view"""
+        # Stream view: virtualized table over a ring of recent frames
+        self.stream_ring = FrameRing(MAX_ALL_ROWS)
+        self.stream_table = StreamTable(
             self.main_content,
-            fg_color=Colors.BG_DARK,
-            corner_radius=0
+            self.stream_ring,
+            self._describe_frame,
+            lambda frame: self._save_function_stream(frame.id_str, frame.data_str)
         )
-
-        headers_stream = ["ID", "Device", "Function", "RTR", "IDE", "DLC", "D0", "D1", "D2", "D3", "D4", "D5", "D6",
-                          "D7", "Time", ""]
-
-        header_frame_stream = ctk.CTkFrame(self.scroll_all, fg_color=Colors.BG_MEDIUM, corner_radius=0)
-        header_frame_stream.grid(row=0, column=0, columnspan=16, sticky="ew", pady=(0, 2))
-
-        for i, h in enumerate(headers_stream):
-            if i == 0:  # ID
-                width = column_widths['id']
-            elif i == 1:  # Device
-                width = column_widths['device']
-            elif i == 2:  # Function
-                width = column_widths['function']
-            elif i in [3, 4, 5]:  # RTR, IDE, DLC
-                width = column_widths['meta']
-            elif i >= 6 and i <= 13:  # D0-D7
-                width = column_widths['byte']
-            elif i == 14:  # Time
-                width = 80
-            else:  # Button column
-                width = column_widths['button']
-
-            label = ctk.CTkLabel(
-                header_frame_stream,
-                text=h,
-                font=ctk.CTkFont(size=11, weight="bold"),
-                text_color=Colors.TEXT_SECONDARY,
-                width=width
-            )
-            label.grid(row=0, column=i, padx=4, pady=10, sticky="ew")
+        self.scroll_all = self.stream_table.frame
+        self._stream_dirty = False
 
     def _darken_color(self, hex_color: str) -> str:
         """Darken a hex color by 20%"""
@@ -1250,6 +4259,7 @@ class ModernCANApp(ctk.CTk):
 
     def toggle_view_mode(self, value: str):
         """Switch between grouped and stream view"""
+        self._stream_active = value == "Stream"
         if value == "Grouped":
             self.scroll_all.grid_forget()
             self.scroll_grouped.grid(row=1, column=0, sticky="nsew")
@@ -1269,18 +4279,25 @@ class ModernCANApp(ctk.CTk):
 
     def _update_tx_list(self):
         """Update transmission function list"""
-        items = []
-        for cid, obj in self.function_labels.items():
-            dev_name = obj.get("device", "Unknown")
-            for data_pattern, func_name in obj.get("mappings", {}).items():
-                items.append(f"[{cid}] {func_name} ({dev_name})")
+        self._tx_entries = {}
+        for entry in self.function_db.entries():
+            label = entry.label
+            if label in self._tx_entries:
+                # Same name saved for several payloads of one ID
+                label = f"{label} #{entry.entry_id}"
+            self._tx_entries[label] = entry.entry_id
+        items = sorted(self._tx_entries)
         if not items:
             items = ["No functions saved"]
-        items.sort()
         self.tx_combo.configure(values=items)
         if items:
             self.tx_combo.set(items[0])
 
+    def _selected_tx_entry(self) -> Optional[FunctionEntry]:
+        """FunctionDB entry selected in the TX combo"""
+        entry_id = self._tx_entries.get(self.tx_combo.get())
+        return self.function_db.entry(entry_id) if entry_id is not None else None
+
     def toggle_connection(self):
         """Toggle serial connection"""
         if not self.is_sniffing:
@@ -1291,6 +4308,7 @@ class ModernCANApp(ctk.CTk):
 
             try:
                 self.ser = serial.Serial(selected_port, BAUD, timeout=0.1)
+                self.tx = SerialTxPath(self.ser, self._on_tx_error)
                 self.is_sniffing = True
                 self.is_paused = False
 
@@ -1298,8 +4316,10 @@ class ModernCANApp(ctk.CTk):
                 self.stats['start_time'] = datetime.now()
                 self.stats['last_update'] = datetime.now()
                 self.session_log.clear()
+                self.can_queue.clear()
+                self.can_queue.reset_counters()
 
-                self.session_start_time = datetime.now()
+                self.session_start_time = self.monitor_origin = time.time()
 
                 self.btn_connect.configure(text="DISCONNECT", fg_color=Colors.DANGER)
                 self.status_lbl.configure(text="● CONNECTED", text_color=Colors.SUCCESS)
@@ -1307,6 +4327,8 @@ class ModernCANApp(ctk.CTk):
                 self.btn_refresh.configure(state="disabled")
                 self.btn_pause.configure(state="normal")
 
+                if self.filter_settings['hw_filter']:
+                    self._push_hw_filters()
                 threading.Thread(target=self._serial_listener, daemon=True).start()
             except Exception as e:
                 messagebox.showerror("Connection Error", f"Failed to connect:\n{str(e)}")
@@ -1328,7 +4350,11 @@ class ModernCANApp(ctk.CTk):
         self.is_sniffing = False
         self.is_sending_active = False
         self.is_paused = False
+        self.tx_scheduler.clear()
 
+        if self.tx:
+            self.tx.close()
+            self.tx = None
         if self.ser:
             try:
                 self.ser.close()
@@ -1345,28 +4371,16 @@ class ModernCANApp(ctk.CTk):
     def _serial_listener(self):
         """Serial port listener thread"""
         print("Serial listener started")
+        reader = SerialFrameReader(self.ser)
+        clock = FrameClock(self.ser.timeout or 0.1)
+        if SERIAL_PROTOCOL == "binary":
+            reader.request_binary(self.tx.write_now)
         while self.is_sniffing:
             try:
                 if self.ser and self.ser.is_open:
-                    if self.ser.in_waiting:
-                        try:
-                            line = self.ser.readline().decode('utf-8', errors='ignore').strip()
-                            if line.startswith("FRAME:"):
-                                parts = line.replace("FRAME:", "").split("|")
-                                if len(parts) >= 5:
-                                    frame_data = {
-                                        'id': parts[0].upper(),
-                                        'rtr': parts[1],
-                                        'ide': parts[2],
-                                        'dlc': parts[3],
-                                        'data': parts[4].split(" "),
-                                        'timestamp': datetime.now()
-                                    }
-                                    self.can_queue.put(frame_data)
-                        except Exception as e:
-                            print(f"Parse error: {e}")
-                    else:
-                        time.sleep(0.005)
+                    raw_frames = reader.read_frames()
+                    if raw_frames:
+                        self._ingest_frames(clock.frames(raw_frames, time.time()))
                 else:
                     break
             except Exception as e:
@@ -1376,239 +4390,160 @@ class ModernCANApp(ctk.CTk):
                 break
         print("Serial listener stopped")
 
+    def _ingest_frames(self, frames: List[CANFrame]):
+        """Record frames and hand them to the GUI queue (runs on the listener thread)"""
+        # Statistics and the capture log see every frame, whatever the queue drops
+        stats = self.stats
+        stats['total_frames'] += len(frames)
+        frames_per_id = stats['frames_per_id']
+        log_append = self.session_log.append
+        for frame in frames:
+            frames_per_id[frame.can_id] = frames_per_id.get(frame.can_id, 0) + 1
+            log_append(frame)
+        self._feed_monitor(frames, self.id_states, self.frame_filter)
+
+    def _feed_monitor(self, frames: List[CANFrame], states: IDStateTable,
+                      frame_filter: Optional[Callable[[CANFrame], bool]]):
+        """Stage frames for the render loop; callable from any thread"""
+        update_state = states.update
+        # Rejected frames never reach the GUI thread
+        kept = []
+        masks = []
+        for frame in frames:
+            state = update_state(frame)
+            if frame_filter is None or frame_filter(frame):
+                kept.append(frame)
+                masks.append(state.change_mask)
+        if not kept:
+            return
+
+        self.grouped_stage.push_many(kept, masks)
+        if self._stream_active:
+            self.can_queue.put_many(kept)
+
     def _process_queue(self):
-        """Process CAN frames from queue"""
-        processed = 0
+        """Drain CAN frames from the queue within an adaptive per-tick time budget"""
+        deadline = time.perf_counter() + self._drain_budget
         try:
-            while processed < 50:
-                frame = self.can_queue.get_nowait()
-
-                # Update statistics
-                self.stats['total_frames'] += 1
-                frame_id = frame['id']
-                if frame_id not in self.stats['frames_per_id']:
-                    self.stats['frames_per_id'][frame_id] = 0
-                self.stats['frames_per_id'][frame_id] += 1
-
-                # Add to session log
-                self.session_log.append({
-                    'timestamp': frame['timestamp'].strftime("%H:%M:%S.%f")[:-3],
-                    'id': frame_id,
-                    'rtr': frame['rtr'],
-                    'ide': frame['ide'],
-                    'dlc': frame['dlc'],
-                    'data': " ".join(frame['data'])
-                })
-
+            if not self._stream_active:
+                # Grouped view: one coalesced entry per changed ID
+                if len(self.can_queue):
+                    self.can_queue.clear()
+                if not self.is_paused:
+                    for frame, change_mask, count, changes in self.grouped_stage.take_dirty():
+                        self.update_monitor(frame, change_mask)
+            while self._stream_active and time.perf_counter() < deadline:
+                batch = self.can_queue.get_batch(64)
+                if not batch:
+                    break
                 # Update monitor if not paused
                 if not self.is_paused:
-                    self.update_monitor(
-                        frame['id'],
-                        frame['rtr'],
-                        frame['ide'],
-                        frame['dlc'],
-                        frame['data'],
-                        frame['timestamp']  # NEW: pass timestamp
-                    )
+                    for frame in batch:
+                        self.update_monitor(frame)
+        except Exception as e:
+            print(f"Queue processing error: {e}")
 
-                processed += 1
-        except queue.Empty:
-            pass
+        # Grow the budget while a backlog remains, relax when idle
+        if len(self.can_queue):
+            self._drain_budget = min(self._drain_budget * 1.5, QUEUE_DRAIN_MAX_BUDGET_MS / 1000.0)
+        else:
+            self._drain_budget = max(self._drain_budget * 0.8, QUEUE_DRAIN_MIN_BUDGET_MS / 1000.0)
+
+    def _render_loop(self):
+        """Repaint the monitor at a fixed rate, independent of frame arrival"""
+        period = 1.0 / RENDER_FPS
+        self._process_queue()
+        try:
+            if self._stream_dirty:
+                self._stream_dirty = False
+                self.stream_table.refresh()
+            self._expire_highlights(time.monotonic())
+        except Exception as e:
+            print(f"Highlight error: {e}")
+
+        # Keep a fixed cadence; skip missed ticks instead of bunching them up
+        now = time.perf_counter()
+        self._next_render = max(self._next_render + period, now)
+        self.after(max(1, int((self._next_render - now) * 1000)), self._render_loop)
+
+    def _expire_highlights(self, now: float):
+        """Reset byte highlights and new-row colors whose time is up"""
+        if self._byte_highlights:
+            expired = [key for key, expiry in self._byte_highlights.items() if expiry <= now]
+            for key in expired:
+                del self._byte_highlights[key]
+                can_id, i = key
+                r = self.can_rows.get(can_id)
+                if r:
+                    value = r['last_data'][i]
+                    r['bytes'][i].configure(
+                        text=HEX_BYTE[value],
+                        text_color=Colors.DANGER if value else Colors.TEXT_MUTED,
+                        font=self._font_byte,
+                        fg_color="transparent"
+                    )
 
-        self.after(10, self._process_queue)
+        if self._row_fades:
+            expired = [can_id for can_id, expiry in self._row_fades.items() if expiry <= now]
+            for can_id in expired:
+                del self._row_fades[can_id]
+                r = self.can_rows.get(can_id)
+                if r:
+                    for w in r['widgets'][:-1]:
+                        w.configure(fg_color=Colors.BG_DARK)
 
     def _update_stats_display(self):
         """Update statistics display"""
         if self.is_sniffing and self.stats['start_time']:
             elapsed = (datetime.now() - self.stats['start_time']).total_seconds()
             fps = self.stats['total_frames'] / elapsed if elapsed > 0 else 0
-            self.stats_lbl.configure(text=f"{self.stats['total_frames']} frames | {fps:.1f} fps")
+            text = f"{self.stats['total_frames']} frames | {fps:.1f} fps"
+            lost = self.can_queue.dropped + self.can_queue.coalesced
+            if len(self.can_queue) or lost:
+                text += f"\nqueue {len(self.can_queue)} | skipped {lost}"
+            if self.tx and self.tx.commands_sent:
+                tx_rate, _ = self.tx.sample()
+                text += f"\ntx {tx_rate:.0f}/s | pending {self.tx.depth}"
+            self.stats_lbl.configure(text=text)
 
         self.after(1000, self._update_stats_display)
 
-    def update_monitor(self, can_id: str, rtr: str, ide: str, dlc: str, bytes_list: List[str], timestamp: datetime = None):
+    def update_monitor(self, frame: CANFrame, change_mask: int = 0):
         """Update monitor display with validation"""
-        try:
-            # Validate DLC
-            dlc_int = int(dlc)
-            if not (0 <= dlc_int <= 8):
-                return
-
-            # Ensure 8 bytes (pad with 00)
-            bytes_list = list(bytes_list)
-            while len(bytes_list) < 8:
-                bytes_list.append("00")
-            bytes_list = bytes_list[:8]
-
-            # Validate hex format
-            for b in bytes_list:
-                int(b, 16)
-        except ValueError:
-            return
+        # Filters already ran in self.frame_filter (or the session filter)
+        can_id = frame.id_str
 
-        # Apply basic ID filter
-        filter_text = self.filter_entry.get().upper()
-        if filter_text and filter_text not in can_id.upper():
+        if self.view_mode.get() == "Stream":
+            self._update_stream_view(frame)
             return
 
-        # Apply advanced filters
-        if hasattr(self, 'filter_settings'):
-            filters = self.filter_settings
-
-            # DLC range filter
-            if not (filters['min_dlc'] <= dlc_int <= filters['max_dlc']):
-                return
-
-            # Whitelist filter
-            if filters['id_whitelist'] and can_id.upper() not in filters['id_whitelist']:
-                return
-
-            # Blacklist filter
-            if can_id.upper() in filters['id_blacklist']:
-                return
-
-            # Hide all-zero data
-            if filters['hide_zero_data'] and all(b == "00" for b in bytes_list):
-                return
-
-            # Hide periodic (if message exists and hasn't changed)
-            if filters['hide_periodic'] and can_id in self.can_rows:
-                if self.can_rows[can_id]['last_data'] == bytes_list:
-                    return
-
-            # Show only changed (only show if message changed in last 2 seconds)
-            if filters['show_only_changed'] and can_id in self.can_rows:
-                if not hasattr(self.can_rows[can_id], 'last_change_time'):
-                    return
-                if (datetime.now() - self.can_rows[can_id].get('last_change_time', datetime.now())).total_seconds() > 2:
-                    return
-
-        data_str = " ".join(bytes_list)
-        current_mode = self.view_mode.get()
-
-        dev_name = self.id_labels.get(can_id, "Unknown")
-        mapping = self.function_labels.get(can_id, {})
-        det_func = mapping.get("mappings", {}).get(data_str, "---")
+        dev_name, det_func = self._describe_frame(frame)
 
         # Calculate relative timestamp (NEW)
-        if timestamp and self.session_start_time:
-            relative_time = (timestamp - self.session_start_time).total_seconds()
+        if self.monitor_origin is not None:
+            relative_time = frame.timestamp - self.monitor_origin
         else:
             relative_time = 0.0
 
-        if current_mode == "Stream":
-            self._update_stream_view(can_id, rtr, ide, dlc, bytes_list, dev_name, det_func)
-        else:
-            self._update_grouped_view(can_id, rtr, ide, dlc, bytes_list, dev_name, det_func, data_str, relative_time)
-
-    def _update_stream_view(self, can_id, rtr, ide, dlc, bytes_list, dev_name, det_func):
-        """Update stream view"""
-        if self.sort_newest_first:
-            # Insert at top, shift everything down
-            if len(self.all_msgs_widgets) >= MAX_ALL_ROWS:
-                # Remove last (oldest)
-                oldest = self.all_msgs_widgets.pop()
-                for w in oldest:
-                    try:
-                        w.destroy()
-                    except:
-                        pass
-
-            # Shift all rows down
-            for row_widgets in self.all_msgs_widgets:
-                for widget in row_widgets:
-                    try:
-                        current_row = widget.grid_info()['row']
-                        widget.grid(row=current_row + 1)
-                    except:
-                        pass
-
-            row = 1  # New message at top
-            self.row_counter_all += 1
-        else:
-            # Default: add at bottom
-            if len(self.all_msgs_widgets) >= MAX_ALL_ROWS:
-                oldest = self.all_msgs_widgets.pop(0)
-                for w in oldest:
-                    try:
-                        w.destroy()
-                    except:
-                        pass
+        self._update_grouped_view(frame, can_id, dev_name, det_func, relative_time, change_mask)
 
-            row = self.row_counter_all
-            self.row_counter_all += 1
-
-        bg = Colors.BG_MEDIUM if row % 2 == 0 else Colors.BG_DARK
-
-        widgets = []
-
-        def add_lbl(txt, col, color=Colors.TEXT_PRIMARY, width=50):
-            # Apply consistent widths
-            if col == 0:  # ID
-                width = 60
-            elif col == 1:  # Device
-                width = 100
-            elif col == 2:  # Function
-                width = 120
-            elif col in [3, 4, 5]:  # RTR, IDE, DLC
-                width = 35
-            elif col >= 6 and col <= 13:  # D0-D7
-                width = 45
-            elif col == 14:  # Time
-                width = 80
-
-            l = ctk.CTkLabel(
-                self.scroll_all,
-                text=txt,
-                fg_color=bg,
-                text_color=color,
-                width=width,
-                anchor="w",
-                font=ctk.CTkFont(size=11)
-            )
-            l.grid(row=row, column=col, padx=4, pady=1, sticky="ew")
-            widgets.append(l)
-
-        add_lbl(can_id, 0, Colors.PRIMARY)
-        add_lbl(dev_name, 1, Colors.SUCCESS if dev_name != "Unknown" else Colors.TEXT_MUTED)
-        add_lbl(det_func, 2, Colors.WARNING if det_func != "---" else Colors.TEXT_MUTED)
-        add_lbl(rtr, 3, Colors.TEXT_SECONDARY)
-        add_lbl(ide, 4, Colors.TEXT_SECONDARY)
-        add_lbl(dlc, 5, Colors.TEXT_SECONDARY)
-
-        for j in range(8):
-            val = bytes_list[j]
-            color = Colors.DANGER if val != "00" else Colors.TEXT_MUTED
-            add_lbl(val, 6 + j, color)
-
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        add_lbl(timestamp, 14, Colors.TEXT_MUTED)
-
-        # ADD SAVE BUTTON
-        data_str = " ".join(bytes_list)
-        btn = ctk.CTkButton(
-            self.scroll_all,
-            text="+",
-            width=40,  # CHANGED
-            height=24,
-            command=lambda: self._save_function_stream(can_id, data_str),
-            fg_color=Colors.SUCCESS,
-            hover_color="#059669",
-            corner_radius=6,
-            font=ctk.CTkFont(size=12, weight="bold")
-        )
-        btn.grid(row=row, column=15, padx=4, pady=1)
-        widgets.append(btn)
+    def _update_stream_view(self, frame: CANFrame):
+        """Append to the stream ring; the render loop repaints the visible rows"""
+        self.stream_ring.append(frame)
+        self._stream_dirty = True
 
-        if self.sort_newest_first:
-            # Insert at beginning for newest first
-            self.all_msgs_widgets.insert(0, widgets)
-        else:
-            # Append at end for oldest first
-            self.all_msgs_widgets.append(widgets)
+    def _describe_frame(self, frame: CANFrame):
+        """Device and function names for a frame"""
+        can_id = frame.id_str
+        dev_name = self.id_labels.get(can_id, "Unknown")
+        entry = self.function_db.lookup(frame.can_id, frame.data)
+        det_func = entry.name if entry else "---"
+        return dev_name, det_func
 
     def _save_function_stream(self, can_id: str, data_str: str):
         """Save function for CAN ID from stream view"""
+        if not self._check_databases():
+            return
         dev_label = self.id_labels.get(can_id, "Unknown")
 
         dialog = ctk.CTkInputDialog(
@@ -1618,17 +4553,21 @@ class ModernCANApp(ctk.CTk):
         val = dialog.get_input()
 
         if val:
-            if can_id not in self.function_labels:
-                self.function_labels[can_id] = {"device": dev_label, "mappings": {}}
-            self.function_labels[can_id]["device"] = dev_label
-            self.function_labels[can_id]["mappings"][data_str] = val
-            self._save_db(DB_FUNCTIONS, self.function_labels)
+            self._commit_db(self.function_store, self.function_db.set(can_id, dev_label, data_str, val))
             self._update_tx_list()
+            self.stream_table.refresh(force=True)
             self._show_status(f"✓ Function saved for ID {can_id}", 3000, Colors.SUCCESS)
 
-    def _update_grouped_view(self, can_id, rtr, ide, dlc, bytes_list, dev_name, det_func, data_str, relative_time=0.0):
+    def _update_grouped_view(self, frame: CANFrame, can_id, dev_name, det_func, relative_time=0.0, change_mask=0):
         """Update grouped view"""
-        if can_id not in self.can_rows:
+        if can_id not in self.can_rows and self.grouped_table is not None:
+            self.can_rows[can_id] = self.grouped_table.add_row(can_id, frame, dev_name, det_func, relative_time,
+                                                               at_top=self.sort_newest_first)
+            self._row_fades[can_id] = time.monotonic() + NEW_ROW_FADE_MS / 1000.0
+            if self.sort_key != "Arrival":
+                self._rebuild_grouped_view()
+
+        elif can_id not in self.can_rows:
             # NEW ROW - insert at correct position based on sort order
             if self.sort_newest_first:
                 # Insert at top (row 1)
@@ -1695,7 +4634,7 @@ class ModernCANApp(ctk.CTk):
 
             rtr_l = ctk.CTkLabel(
                 self.scroll_grouped,
-                text=rtr,
+                text=str(frame.rtr),
                 text_color=Colors.TEXT_SECONDARY,
                 width=35,
                 fg_color=bg,
@@ -1705,7 +4644,7 @@ class ModernCANApp(ctk.CTk):
 
             ide_l = ctk.CTkLabel(
                 self.scroll_grouped,
-                text=ide,
+                text=str(frame.ide),
                 text_color=Colors.TEXT_SECONDARY,
                 width=35,
                 fg_color=bg,
@@ -1715,7 +4654,7 @@ class ModernCANApp(ctk.CTk):
 
             dlc_l = ctk.CTkLabel(
                 self.scroll_grouped,
-                text=dlc,
+                text=str(frame.dlc),
                 text_color=Colors.TEXT_SECONDARY,
                 width=35,
                 fg_color=bg,
@@ -1724,12 +4663,11 @@ class ModernCANApp(ctk.CTk):
             dlc_l.grid(row=row, column=6, padx=4, pady=4, sticky="ew")
 
             b_labels = []
-            for j in range(8):
-                val = bytes_list[j]
-                color = Colors.DANGER if val != "00" else Colors.TEXT_MUTED
+            for j, value in enumerate(frame.data):
+                color = Colors.DANGER if value else Colors.TEXT_MUTED
                 l = ctk.CTkLabel(
                     self.scroll_grouped,
-                    text=val,
+                    text=HEX_BYTE[value],
                     text_color=color,
                     width=45,
                     fg_color=bg,
@@ -1757,22 +4695,16 @@ class ModernCANApp(ctk.CTk):
                 'dev_lbl': dev_l,
                 'func_lbl': func_l,
                 'bytes': b_labels,
-                'last_data': bytes_list.copy(),
+                'last_data': frame.data,
                 'widgets': widgets + [btn],
                 'bg': bg,
                 'timestamp': relative_time  # NEW
             }
 
-            # Highlight animation - fade background to transparent (dark)
-            def fade():
-                try:
-                    for w in widgets:
-                        if w.winfo_exists():
-                            w.configure(fg_color=Colors.BG_DARK)
-                except:
-                    pass
-
-            self.after(2000, fade)
+            # Highlight animation - render loop fades background to dark
+            self._row_fades[can_id] = time.monotonic() + NEW_ROW_FADE_MS / 1000.0
+            if self.sort_key != "Arrival":
+                self._rebuild_grouped_view()
 
         else:
             # Update existing row
@@ -1787,48 +4719,36 @@ class ModernCANApp(ctk.CTk):
                 text_color=Colors.WARNING if det_func != "---" else Colors.TEXT_MUTED
             )
 
-            # Update bytes with MORE VISIBLE change animation
-            for i in range(8):
-                if i < len(bytes_list):
-                    current_val = bytes_list[i]
-
-                    if i < len(r['last_data']) and current_val != r['last_data'][i]:
-                        lbl = r['bytes'][i]
-
-                        # BRIGHT highlight with red background
+            # Update bytes with MORE VISIBLE change animation (mask covers coalesced frames)
+            change_mask |= byte_change_mask(r['last_data'], frame.data)
+            highlight_until = time.monotonic() + HIGHLIGHT_MS / 1000.0
+            for i, current_val in enumerate(frame.data):
+                if change_mask >> i & 1:
+                    lbl = r['bytes'][i]
+
+                    # BRIGHT highlight with red background, reset by the render loop
+                    key = (can_id, i)
+                    if key in self._byte_highlights:
+                        lbl.configure(text=HEX_BYTE[current_val])
+                    else:
                         lbl.configure(
-                            text=current_val,
+                            text=HEX_BYTE[current_val],
                             text_color="#FFFFFF",
-                            font=ctk.CTkFont(weight="bold", size=12),
+                            font=self._font_byte_highlight,
                             fg_color="#DC2626"
                         )
-
-                        # Create closure with current values
-                        def make_reset(label, value):
-                            def reset():
-                                try:
-                                    if label.winfo_exists():
-                                        byte_color = Colors.DANGER if value != "00" else Colors.TEXT_MUTED
-                                        label.configure(
-                                            text=value,
-                                            text_color=byte_color,
-                                            font=ctk.CTkFont(weight="normal", size=11),
-                                            fg_color="transparent"
-                                        )
-                                except:
-                                    pass
-
-                            return reset
-
-                        self.after(350, make_reset(lbl, current_val))
+                    self._byte_highlights[key] = highlight_until
 
             # Update last_data after all changes
-            r['last_data'] = bytes_list[:]
+            r['last_data'] = frame.data
 
     def handle_send_click(self):
         """Handle send button click"""
         if self.is_sending_active:
             self.is_sending_active = False
+            if self._send_job:
+                self.tx_scheduler.remove(self._send_job.job_id)
+                self._send_job = None
             self.btn_send.configure(text="SEND COMMAND", fg_color=Colors.SECONDARY)
             return
 
@@ -1836,8 +4756,8 @@ class ModernCANApp(ctk.CTk):
             messagebox.showwarning("Error", "No connection!")
             return
 
-        selection = self.tx_combo.get()
-        if not selection or selection == "No functions saved":
+        entry = self._selected_tx_entry()
+        if not entry:
             return
 
         try:
@@ -1847,45 +4767,31 @@ class ModernCANApp(ctk.CTk):
             messagebox.showerror("Error", "Invalid count or interval!")
             return
 
-        target_id = selection.split("]")[0].replace("[", "")
-        data_to_send = None
-
-        if target_id in self.function_labels:
-            mappings = self.function_labels[target_id].get("mappings", {})
-            for d_str, f_name in mappings.items():
-                if f"[{target_id}] {f_name} ({self.function_labels[target_id].get('device', '?')})" == selection:
-                    data_to_send = d_str
-                    break
+        target_id = entry.cid
+        data_to_send = entry.tx_data
 
-        if data_to_send:
+        if data_to_send and count > 0:
             self.is_sending_active = True
             self.btn_send.configure(text="⏹ STOP", fg_color=Colors.DANGER)
-            threading.Thread(
-                target=self._sending_loop,
-                args=(target_id, data_to_send, count, interval_ms),
-                daemon=True
-            ).start()
-
-    def _sending_loop(self, target_id: str, data_str: str, count: int, interval_ms: int):
-        """Transmission loop"""
-        command = f"SEND:{target_id}|{data_str}\n"
-        encoded = command.encode('utf-8')
-
-        for i in range(count):
-            if not self.is_sending_active or not self.is_sniffing:
-                break
-            try:
-                self.ser.write(encoded)
-            except:
-                self.is_sending_active = False
-                break
-            time.sleep(interval_ms / 1000.0)
-
-        self.is_sending_active = False
-        self.after(0, lambda: self.btn_send.configure(text="SEND COMMAND", fg_color=Colors.SECONDARY))
+            self._send_job = self.tx_scheduler.add(target_id, self.tx.command(target_id, data_to_send),
+                                                   interval_ms / 1000.0, count, self._send_job_done)
+
+    def _send_job_done(self, job: TxJob, error: Optional[Exception]):
+        """Called on the scheduler thread when the SEND COMMAND job ends"""
+        def finish():
+            if job is not self._send_job:
+                return  # Already stopped, or replaced by a newer job
+            self._send_job = None
+            self.is_sending_active = False
+            self.btn_send.configure(text="SEND COMMAND", fg_color=Colors.SECONDARY)
+            if error:
+                self._show_status(f"✗ Send failed: {error}", 3000, Colors.DANGER)
+        self.after(0, finish)
 
     def win_manage_ids(self):
         """ID management window"""
+        if not self._check_databases():
+            return
         win = ctk.CTkToplevel(self)
         win.title("Manage IDs")
         win.geometry("600x500")
@@ -1923,7 +4829,7 @@ class ModernCANApp(ctk.CTk):
                 cid = str(tree.item(sel[0])['values'][0])
                 if messagebox.askyesno("Delete", f"Delete description for ID {cid}?"):
                     del self.id_labels[cid]
-                    self._save_db(DB_IDS, self.id_labels)
+                    self._commit_db(self.id_store, [("del", [cid])])
                     if cid in self.can_rows:
                         self.can_rows[cid]['dev_lbl'].configure(text="Unknown", text_color=Colors.TEXT_MUTED)
                     reload()
@@ -1941,7 +4847,7 @@ class ModernCANApp(ctk.CTk):
                 new_name = dialog.get_input()
                 if new_name:
                     self.id_labels[cid] = new_name
-                    self._save_db(DB_IDS, self.id_labels)
+                    self._commit_db(self.id_store, [("set", [cid], new_name)])
                     if cid in self.can_rows:
                         self.can_rows[cid]['dev_lbl'].configure(text=new_name, text_color=Colors.SUCCESS)
                     reload()
@@ -1961,6 +4867,8 @@ class ModernCANApp(ctk.CTk):
 
     def win_manage_funcs(self):
         """Function management window"""
+        if not self._check_databases():
+            return
         win = ctk.CTkToplevel(self)
         win.title("Manage Functions")
         win.geometry("900x500")
@@ -1995,42 +4903,34 @@ class ModernCANApp(ctk.CTk):
         def reload():
             for i in tree.get_children():
                 tree.delete(i)
-            for cid in sorted(self.function_labels.keys()):
-                obj = self.function_labels[cid]
-                for d, f in obj.get("mappings", {}).items():
-                    tree.insert('', tk.END, values=(cid, obj.get("device", "---"), d, f))
+            for entry in self.function_db.entries():
+                tree.insert('', tk.END, iid=str(entry.entry_id),
+                            values=(entry.cid, entry.device, entry.pattern, entry.name))
 
         def delete():
             sel = tree.selection()
             if sel:
-                v = tree.item(sel[0])['values']
-                cid, d_str = str(v[0]), str(v[2])
-                if messagebox.askyesno("Delete", "Delete this function?"):
-                    del self.function_labels[cid]["mappings"][d_str]
-                    if not self.function_labels[cid]["mappings"]:
-                        del self.function_labels[cid]
-                    self._save_db(DB_FUNCTIONS, self.function_labels)
+                entry = self.function_db.entry(int(sel[0]))
+                if entry and messagebox.askyesno("Delete", "Delete this function?"):
+                    self._commit_db(self.function_store, self.function_db.remove(entry.cid, entry.pattern))
                     reload()
                     self._update_tx_list()
 
         def edit():
             sel = tree.selection()
-            if sel:
-                v = tree.item(sel[0])['values']
-                cid = str(v[0])
-                d_str = str(v[2])
-                old_func = str(v[3])
+            entry = self.function_db.entry(int(sel[0])) if sel else None
+            if entry:
+                cid = entry.cid
                 dialog = ctk.CTkInputDialog(
-                    text=f"Edit function description for ID {cid}:\n[{d_str}]",
+                    text=f"Edit function description for ID {cid}:\n[{entry.pattern}]",
                     title="Edit Function"
                 )
                 new_func = dialog.get_input()
                 if new_func:
-                    self.function_labels[cid]["mappings"][d_str] = new_func
-                    self._save_db(DB_FUNCTIONS, self.function_labels)
+                    self._commit_db(self.function_store, self.function_db.rename(cid, entry.pattern, new_func))
                     if cid in self.can_rows:
-                        current_data = " ".join(self.can_rows[cid]['last_data'])
-                        if current_data == d_str:
+                        current = self.function_db.lookup(entry.can_id, self.can_rows[cid]['last_data'])
+                        if current and current.entry_id == entry.entry_id:
                             self.can_rows[cid]['func_lbl'].configure(text=new_func, text_color=Colors.WARNING)
                     reload()
                     self._update_tx_list()
@@ -2049,19 +4949,24 @@ class ModernCANApp(ctk.CTk):
 
     def _open_id_edit(self, can_id: str):
         """Open ID edit dialog"""
+        if not self._check_databases():
+            return
         dialog = ctk.CTkInputDialog(text=f"Label for {can_id}:", title="ID Database")
         value = dialog.get_input()
         if value:
             self.id_labels[can_id] = value
-            self._save_db(DB_IDS, self.id_labels)
+            self._commit_db(self.id_store, [("set", [can_id], value)])
             if can_id in self.can_rows:
                 self.can_rows[can_id]['dev_lbl'].configure(text=value, text_color=Colors.SUCCESS)
+            self.stream_table.refresh(force=True)
             self._update_tx_list()
 
     def _save_function(self, can_id: str):
         """Save function for CAN ID"""
+        if not self._check_databases():
+            return
         if can_id in self.can_rows:
-            data_str = " ".join(self.can_rows[can_id]['last_data'])
+            data_str = format_data(self.can_rows[can_id]['last_data'])
         else:
             return
 
@@ -2073,11 +4978,7 @@ class ModernCANApp(ctk.CTk):
         val = dialog.get_input()
 
         if val:
-            if can_id not in self.function_labels:
-                self.function_labels[can_id] = {"device": dev_label, "mappings": {}}
-            self.function_labels[can_id]["device"] = dev_label
-            self.function_labels[can_id]["mappings"][data_str] = val
-            self._save_db(DB_FUNCTIONS, self.function_labels)
+            self._commit_db(self.function_store, self.function_db.set(can_id, dev_label, data_str, val))
             if can_id in self.can_rows:
                 self.can_rows[can_id]['func_lbl'].configure(text=val, text_color=Colors.WARNING)
             self._update_tx_list()
@@ -2171,28 +5072,19 @@ class ModernCANApp(ctk.CTk):
             return
 
         # Clear grouped view
-        for r in self.can_rows.values():
-            for w in r['widgets']:
-                try:
-                    w.destroy()
-                except:
-                    pass
-        self.can_rows.clear()
-        self.row_counter_grouped = 1
+        self.grouped_stage.clear()
+        self._byte_highlights.clear()
+        self._row_fades.clear()
+        self._clear_grouped_rows()
 
         # Clear stream view
-        for row_widgets in self.all_msgs_widgets:
-            for w in row_widgets:
-                try:
-                    w.destroy()
-                except:
-                    pass
-        self.all_msgs_widgets.clear()
-        self.row_counter_all = 1
+        self.stream_table.clear()
 
         # Reset stats if Yes - NO MORE MESSAGEBOX!
         if response["value"]:
             self.session_log.clear()
+            self.id_states.clear()
+            self.can_queue.reset_counters()
             self.stats = {
                 'total_frames': 0,
                 'frames_per_id': {},
@@ -2202,7 +5094,9 @@ class ModernCANApp(ctk.CTk):
         else:
             self._show_status("✓ Display cleared (statistics preserved)", 4000, Colors.INFO)
 
-        self.session_start_time = datetime.now() if self.is_sniffing else None  # Add after stats reset
+        self.session_start_time = time.time() if self.is_sniffing else None  # Add after stats reset
+        if self.is_sniffing:
+            self.monitor_origin = self.session_start_time
 
     def _show_toast(self, message: str, color: str):
         """Show a temporary toast notification"""
@@ -2229,23 +5123,115 @@ class ModernCANApp(ctk.CTk):
         self.after(2000, fade_out)
 
     def export_session_log(self):
-        """Export captured CAN traffic to CSV"""
+        """Export captured CAN traffic on a worker thread"""
         if not self.session_log:
             self._show_status("⚠ No data to export!", 3000, Colors.WARNING)
             return
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"can_log_{timestamp}.csv"
+        win = ctk.CTkToplevel(self)
+        win.title("Export Session")
+        win.geometry("420x400")
+        win.attributes("-topmost", True)
+        win.configure(fg_color=Colors.BG_DARK)
 
-        try:
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=['timestamp', 'id', 'rtr', 'ide', 'dlc', 'data'])
-                writer.writeheader()
-                writer.writerows(self.session_log)
+        main_frame = ctk.CTkFrame(win, fg_color=Colors.BG_DARK)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
 
-            self._show_status(f"✓ Saved {len(self.session_log)} frames to {filename}", 5000, Colors.SUCCESS)
-        except Exception as e:
-            self._show_status(f"✗ Failed to save log: {str(e)}", 5000, Colors.DANGER)
+        ctk.CTkLabel(main_frame, text=f"Export {len(self.session_log)} frames",
+                     font=ctk.CTkFont(size=16, weight="bold"),
+                     text_color=Colors.TEXT_PRIMARY).pack(pady=(0, 15))
+
+        formats = {fmt.name: fmt for fmt in EXPORT_FORMATS}
+        format_frame = ctk.CTkFrame(main_frame, fg_color=Colors.BG_MEDIUM, corner_radius=8)
+        format_frame.pack(fill="x", pady=5)
+        ctk.CTkLabel(format_frame, text="Format:", text_color=Colors.TEXT_SECONDARY).pack(side="left", padx=15,
+                                                                                       pady=10)
+        format_var = ctk.StringVar(value=CsvLogFormat.name)
+
+        comp_frame = ctk.CTkFrame(main_frame, fg_color=Colors.BG_MEDIUM, corner_radius=8)
+        comp_frame.pack(fill="x", pady=5)
+        ctk.CTkLabel(comp_frame, text="Compression:", text_color=Colors.TEXT_SECONDARY).pack(side="left", padx=15,
+                                                                                          pady=10)
+        compression_var = ctk.StringVar(value="None")
+        compression_menu = ctk.CTkOptionMenu(comp_frame, values=list(EXPORT_COMPRESSION), variable=compression_var,
+                                             width=140, fg_color=Colors.BG_LIGHT)
+        compression_menu.pack(side="left", padx=10, pady=10)
+
+        def on_format(name):
+            # Binary captures are memory-mapped when loaded, so they stay uncompressed
+            if formats[name] is BinaryLogFormat:
+                compression_var.set("None")
+                compression_menu.configure(state="disabled")
+            else:
+                compression_menu.configure(state="normal")
+
+        ctk.CTkOptionMenu(format_frame, values=list(formats), variable=format_var, command=on_format, width=140,
+                          fg_color=Colors.BG_LIGHT).pack(side="left", padx=10, pady=10)
+
+        # The capture holds every frame; optionally export only what the expression matches
+        expression = self.filter_settings['expression']
+        matching_var = ctk.BooleanVar(value=False)
+        if expression:
+            ctk.CTkCheckBox(main_frame, text=f"Only frames matching: {expression}", variable=matching_var,
+                            fg_color=Colors.PRIMARY).pack(anchor="w", pady=10)
+
+        progress = ctk.CTkProgressBar(main_frame, fg_color=Colors.BG_MEDIUM, progress_color=Colors.SUCCESS)
+        progress.pack(fill="x", pady=10)
+        progress.set(0)
+        status = ctk.CTkLabel(main_frame, text="Ready to export", font=ctk.CTkFont(size=12),
+                              text_color=Colors.TEXT_SECONDARY)
+        status.pack(pady=5)
+
+        btn_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        btn_frame.pack(pady=(10, 0))
+        job = {"value": None}
+
+        def on_progress(done, total):
+            self.after(0, lambda: (progress.set(done / total if total else 1),
+                                   status.configure(text=f"Exporting: {done}/{total}")))
+
+        def on_done(count, error, cancelled, filename):
+            def finish():
+                job["value"] = None
+                if error:
+                    self._show_status(f"✗ Failed to save log: {error}", 5000, Colors.DANGER)
+                elif cancelled:
+                    self._show_status("Export cancelled", 3000, Colors.WARNING)
+                else:
+                    self._show_status(f"✓ Saved {count} frames to {filename}", 5000, Colors.SUCCESS)
+                try:
+                    win.destroy()
+                except:
+                    pass
+            self.after(0, finish)
+
+        def start():
+            if job["value"]:
+                return
+            log_format = formats[format_var.get()]
+            compression = EXPORT_COMPRESSION[compression_var.get()]
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"can_log_{timestamp}{log_format.extension}"
+            if compression:
+                filename += compression[2]
+            matches = FilterExpression(expression).predicate() if expression and matching_var.get() else None
+            job["value"] = ExportJob(self.session_log, filename, log_format(), compression, matches,
+                                     on_progress=on_progress,
+                                     on_done=lambda c, e, x: on_done(c, e, x, filename))
+            job["value"].start()
+            status.configure(text="Exporting...")
+
+        def cancel():
+            if job["value"]:
+                job["value"].cancel()
+            else:
+                win.destroy()
+
+        ctk.CTkButton(btn_frame, text="Export", command=start, fg_color=Colors.SUCCESS, width=120).pack(side="left",
+                                                                                                     padx=5)
+        ctk.CTkButton(btn_frame, text="Cancel", command=cancel, fg_color=Colors.DANGER, width=120).pack(side="left",
+                                                                                                     padx=5)
+        win.protocol("WM_DELETE_WINDOW", cancel)
 
     def show_statistics(self):
         """Display session statistics"""
@@ -2277,6 +5263,26 @@ class ModernCANApp(ctk.CTk):
         ctk.CTkLabel(info_frame, text=f"Unique IDs: {unique_ids}").pack(pady=4)
         ctk.CTkLabel(info_frame, text=f"Elapsed Time: {elapsed:.1f}s").pack(pady=4)
         ctk.CTkLabel(info_frame, text=f"Average Rate: {fps:.1f} fps").pack(pady=4)
+        ctk.CTkLabel(
+            info_frame,
+            text=f"Display queue: {len(self.can_queue)} pending | {self.can_queue.dropped} dropped | "
+                 f"{self.can_queue.coalesced} coalesced ({self.can_queue.policy})"
+        ).pack(pady=4)
+
+        if self.tx:
+            ctk.CTkLabel(
+                info_frame,
+                text=f"Transmitted: {self.tx.commands_sent} commands, {self.tx.bytes_sent} bytes | "
+                     f"{self.tx.depth} pending | {len(self.tx_scheduler)} cyclic jobs"
+            ).pack(pady=4)
+
+        # Capture buffer (memory + spilled segments)
+        logged = len(self.session_log)
+        ctk.CTkLabel(
+            info_frame,
+            text=f"Captured: {logged} frames over {self.session_log.time_span():.1f}s "
+                 f"({self.session_log.spilled} on disk)"
+        ).pack(pady=4)
 
         # Top IDs
         ctk.CTkLabel(
@@ -2297,12 +5303,13 @@ class ModernCANApp(ctk.CTk):
         tree.column("percent", width=150, anchor="center")
         tree.pack(fill="both", expand=True)
 
-        sorted_ids = sorted(self.stats['frames_per_id'].items(), key=lambda x: x[1], reverse=True)
+        sorted_ids = sorted(list(self.stats['frames_per_id'].items()), key=lambda x: x[1], reverse=True)
 
         for can_id, count in sorted_ids[:20]:
             percent = (count / total * 100) if total > 0 else 0
-            device = self.id_labels.get(can_id, "Unknown")
-            tree.insert('', tk.END, values=(f"{can_id} ({device})", count, f"{percent:.1f}%"))
+            id_str = f"{can_id:X}"
+            device = self.id_labels.get(id_str, "Unknown")
+            tree.insert('', tk.END, values=(f"{id_str} ({device})", count, f"{percent:.1f}%"))
 # ==================== MANUAL FRAME TRANSMISSION ====================
 
     def open_manual_transmit(self):
@@ -2432,7 +5439,8 @@ class ModernCANApp(ctk.CTk):
                     return
 
             data_str = " ".join(data_bytes)
-            frame = {'id': can_id, 'rtr': rtr_var.get(), 'ide': ide_var.get(), 'dlc': str(dlc), 'data': data_str}
+            frame = {'id': can_id, 'rtr': rtr_var.get(), 'ide': ide_var.get(), 'dlc': str(dlc), 'data': data_str,
+                     'command': encode_send_command(can_id, data_str)}
             manual_frames.append(frame)
             tree.insert('', 'end', values=(can_id, rtr_var.get(), ide_var.get(), dlc, data_str))
 
@@ -2468,17 +5476,23 @@ class ModernCANApp(ctk.CTk):
                 delay = 10
 
             def send_thread():
-                for frame in manual_frames:
-                    if not self.is_sniffing:
-                        break
-                    command = f"SEND:{frame['id']}|{frame['data']}\n"
-                    try:
-                        self.ser.write(command.encode('utf-8'))
-                    except Exception as e:
-                        self.after(0, lambda: self._show_status(f"✗ Send error: {e}", 3000, Colors.DANGER))
-                        return
-                    time.sleep(delay / 1000.0)
-                self.after(0, lambda: self._show_status(f"✓ Sent {len(manual_frames)} frames", 3000, Colors.SUCCESS))
+                tx = self.tx
+                tx.take_error()  # Already reported; start clean
+                if not delay:
+                    # No spacing wanted: the writer sends the whole list in one go
+                    tx.submit_many([frame['command'] for frame in manual_frames])
+                else:
+                    for frame in manual_frames:
+                        if not self.is_sniffing or tx.error:
+                            break
+                        tx.submit(frame['command'])
+                        time.sleep(delay / 1000.0)
+                error = tx.take_error()
+                if error:
+                    self.after(0, lambda: self._show_status(f"✗ Send error: {error}", 3000, Colors.DANGER))
+                else:
+                    self.after(0, lambda: self._show_status(f"✓ Sent {len(manual_frames)} frames", 3000,
+                                                            Colors.SUCCESS))
 
             threading.Thread(target=send_thread, daemon=True).start()
 
@@ -2493,9 +5507,8 @@ class ModernCANApp(ctk.CTk):
             idx = tree.index(sel[0])
             if idx < len(manual_frames):
                 frame = manual_frames[idx]
-                command = f"SEND:{frame['id']}|{frame['data']}\n"
                 try:
-                    self.ser.write(command.encode('utf-8'))
+                    self.tx.write_now(frame['command'])
                     self._show_status(f"✓ Sent: {frame['id']}", 2000, Colors.SUCCESS)
                 except Exception as e:
                     self._show_status(f"✗ Send error: {e}", 3000, Colors.DANGER)
@@ -2520,82 +5533,139 @@ class ModernCANApp(ctk.CTk):
 
     # ==================== SESSION LOAD/PLAYBACK ====================
 
-    def load_session_file(self):
-        """Load a previously exported CSV session file"""
+    def load_session_file(self, then: Optional[Callable] = None):
+        """Load a previously exported CSV or binary session file; `then` runs once it is loaded"""
         filepath = filedialog.askopenfilename(title="Load Session File",
-                                              filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+                                              filetypes=[("Session files", "*.csv *.cancap *.log *.asc *.pcap *.gz *.xz"),
+                                                         ("CSV files", "*.csv *.csv.gz *.csv.xz"),
+                                                         ("Binary captures", "*.cancap"),
+                                                         ("candump logs", "*.log"), ("Vector ASC", "*.asc"),
+                                                         ("SocketCAN pcap", "*.pcap"), ("All files", "*.*")])
         if not filepath:
             return
 
-        try:
-            loaded_frames = []
-            with open(filepath, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    loaded_frames.append({
-                        'timestamp': row.get('timestamp', '00:00:00.000'),
-                        'id': row.get('id', '000').upper(),
-                        'rtr': row.get('rtr', '0'),
-                        'ide': row.get('ide', '0'),
-                        'dlc': row.get('dlc', '8'),
-                        'data': row.get('data', '00 00 00 00 00 00 00 00')
-                    })
-
-            if not loaded_frames:
-                self._show_status("⚠ No frames found in file!", 3000, Colors.WARNING)
+        if filepath.lower().endswith(BinaryLogFormat.extension):
+            try:
+                # Memory-mapped: nothing is read until frames are needed
+                capture = CaptureFile(filepath)
+            except Exception as e:
+                self._show_status(f"✗ Failed to load: {e}", 5000, Colors.DANGER)
+                messagebox.showerror("Load Error", f"Failed to load session file:\n{str(e)}")
                 return
+            self._session_loaded(capture, capture.latest_frames(), then, snapshots=capture)
+            return
+
+        win = ctk.CTkToplevel(self)
+        win.title("Loading Session")
+        win.geometry("420x180")
+        win.attributes("-topmost", True)
+        win.configure(fg_color=Colors.BG_DARK)
 
-            self.loaded_session = loaded_frames
-            self._show_status(f"✓ Loaded {len(loaded_frames)} frames from session", 4000, Colors.SUCCESS)
+        main_frame = ctk.CTkFrame(win, fg_color=Colors.BG_DARK)
+        main_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        ctk.CTkLabel(main_frame, text=os.path.basename(filepath), font=ctk.CTkFont(size=13, weight="bold"),
+                     text_color=Colors.TEXT_PRIMARY).pack(pady=(0, 10))
+        progress = ctk.CTkProgressBar(main_frame, fg_color=Colors.BG_MEDIUM, progress_color=Colors.SUCCESS)
+        progress.pack(fill="x", pady=10)
+        progress.set(0)
 
-            if messagebox.askyesno("Session Loaded", f"Loaded {len(loaded_frames)} frames.\n\nDisplay them in the monitor now?"):
-                self._display_loaded_session()
+        def on_progress(fraction):
+            self.after(0, lambda: progress.set(fraction))
 
-        except Exception as e:
-            self._show_status(f"✗ Failed to load: {e}", 5000, Colors.DANGER)
-            messagebox.showerror("Load Error", f"Failed to load session file:\n{str(e)}")
+        def on_done(job, error, cancelled):
+            def finish():
+                try:
+                    win.destroy()
+                except:
+                    pass
+                if error:
+                    self._show_status(f"✗ Failed to load: {error}", 5000, Colors.DANGER)
+                    messagebox.showerror("Load Error", f"Failed to load session file:\n{str(error)}")
+                elif cancelled:
+                    self._show_status("Loading cancelled", 3000, Colors.WARNING)
+                else:
+                    self._session_loaded(job.frames, job.latest, then, snapshots=job.snapshots)
+            self.after(0, finish)
+
+        job = SessionLoadJob(filepath, on_progress, on_done)
+        ctk.CTkButton(main_frame, text="Cancel", command=job.cancel, fg_color=Colors.DANGER,
+                      width=120).pack(pady=(10, 0))
+        win.protocol("WM_DELETE_WINDOW", job.cancel)
+        job.start()
+
+    def _session_loaded(self, loaded_frames, latest: Dict[int, CANFrame], then: Optional[Callable] = None,
+                        snapshots=None):
+        """Install a loaded session and offer to display it"""
+        if not loaded_frames:
+            loaded_frames.close()
+            self._show_status("⚠ No frames found in file!", 3000, Colors.WARNING)
+            return
+
+        self._release_loaded_session()
+        self.loaded_session.close()
+        self.loaded_session = loaded_frames
+        self.loaded_latest = latest
+        self.loaded_snapshots = snapshots
+        self._show_status(f"✓ Loaded {len(loaded_frames)} frames from session", 4000, Colors.SUCCESS)
+
+        if then is not None:
+            then()
+        elif messagebox.askyesno("Session Loaded", f"Loaded {len(loaded_frames)} frames.\n\nDisplay them in the monitor now?"):
+            self._display_loaded_session()
+
+    def _release_loaded_session(self):
+        """Stop the replay and scrub preview reading the loaded session so it can be closed"""
+        engine, self.playback_engine = self.playback_engine, None
+        if engine is not None:
+            engine.stop()
+            engine.join(PLAYBACK_JOIN_TIMEOUT_S)
+        worker, self._scrub_worker = self._scrub_worker, None
+        if worker is not None:
+            worker.join(PLAYBACK_JOIN_TIMEOUT_S)
+        self.is_playing_back = False
 
     def _display_loaded_session(self):
-        """Display loaded session frames in the monitor"""
+        """Show the final state of a loaded session without replaying it through the widgets"""
         if not self.loaded_session:
             return
         self._clear_monitor_silent()
-        for frame in self.loaded_session:
-            data_list = frame['data'].split()
-            while len(data_list) < 8:
-                data_list.append("00")
-            self.update_monitor(frame['id'], frame['rtr'], frame['ide'], frame['dlc'], data_list[:8])
+        self.monitor_origin = self.loaded_session.read_range(0, 1)[0].timestamp
+        frame_filter = self._session_filter()
+        if self.view_mode.get() == "Stream":
+            # Only the tail fits the Stream view ring anyway
+            total = len(self.loaded_session)
+            for chunk in self.loaded_session.iter_chunks(max(0, total - LOADED_STREAM_TAIL), total):
+                for frame in chunk:
+                    if frame_filter is None or frame_filter(frame):
+                        self.update_monitor(frame)
+            return
+        # Stateful filters (hide periodic, changed) only see these frames, not the whole history
+        for frame in sorted(self.loaded_latest.values(), key=lambda fr: fr.timestamp):
+            if frame_filter is None or frame_filter(frame):
+                self.update_monitor(frame)
 
     def _clear_monitor_silent(self):
         """Clear monitor without confirmation dialog"""
-        for r in self.can_rows.values():
-            for w in r['widgets']:
-                try:
-                    w.destroy()
-                except:
-                    pass
-        self.can_rows.clear()
-        self.row_counter_grouped = 1
+        self.grouped_stage.clear()
+        self._byte_highlights.clear()
+        self._row_fades.clear()
+        self._clear_grouped_rows()
 
-        for row_widgets in self.all_msgs_widgets:
-            for w in row_widgets:
-                try:
-                    w.destroy()
-                except:
-                    pass
-        self.all_msgs_widgets.clear()
-        self.row_counter_all = 1
+        self.stream_table.clear()
 
     def open_playback_dialog(self):
         """Open playback configuration dialog"""
         if not self.loaded_session:
-            self.load_session_file()
-            if not self.loaded_session:
-                return
+            self.load_session_file(then=self.open_playback_dialog)
+            return
+
+        session = self.loaded_session
+        session_start = session.read_range(0, 1)[0].timestamp
+        session_span = session.time_span()
 
         win = ctk.CTkToplevel(self)
         win.title("Session Playback")
-        win.geometry("500x500")
+        win.geometry("540x620")
         win.attributes("-topmost", True)
         win.configure(fg_color=Colors.BG_DARK)
 
@@ -2607,7 +5677,7 @@ class ModernCANApp(ctk.CTk):
 
         info_frame = ctk.CTkFrame(main_frame, fg_color=Colors.BG_MEDIUM, corner_radius=8)
         info_frame.pack(fill="x", pady=(0, 20))
-        ctk.CTkLabel(info_frame, text=f"Loaded Session: {len(self.loaded_session)} frames",
+        ctk.CTkLabel(info_frame, text=f"Loaded Session: {len(session)} frames, {session_span:.1f} s",
                      font=ctk.CTkFont(size=13), text_color=Colors.SUCCESS).pack(pady=15)
 
         options_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
@@ -2621,6 +5691,20 @@ class ModernCANApp(ctk.CTk):
         ctk.CTkComboBox(speed_frame, values=["0.25x", "0.5x", "1x", "2x", "4x", "10x", "Max"],
                         variable=speed_var, width=100, fg_color=Colors.BG_LIGHT).pack(side="left", padx=10, pady=15)
 
+        window_frame = ctk.CTkFrame(options_frame, fg_color=Colors.BG_MEDIUM, corner_radius=8)
+        window_frame.pack(fill="x", pady=5)
+        ctk.CTkLabel(window_frame, text="From (s):", text_color=Colors.TEXT_SECONDARY).pack(side="left", padx=(15, 5), pady=15)
+        from_entry = ctk.CTkEntry(window_frame, width=70, fg_color=Colors.BG_LIGHT)
+        from_entry.insert(0, "0")
+        from_entry.pack(side="left", pady=15)
+        ctk.CTkLabel(window_frame, text="To (s):", text_color=Colors.TEXT_SECONDARY).pack(side="left", padx=(10, 5), pady=15)
+        to_entry = ctk.CTkEntry(window_frame, width=70, fg_color=Colors.BG_LIGHT)
+        to_entry.insert(0, f"{session_span:.3f}")
+        to_entry.pack(side="left", pady=15)
+        ctk.CTkLabel(window_frame, text="IDs:", text_color=Colors.TEXT_SECONDARY).pack(side="left", padx=(10, 5), pady=15)
+        ids_entry = ctk.CTkEntry(window_frame, placeholder_text="all (e.g. 1A0, 2B0)", fg_color=Colors.BG_LIGHT)
+        ids_entry.pack(side="left", fill="x", expand=True, padx=(0, 15), pady=15)
+
         transmit_var = ctk.BooleanVar(value=False)
         ctk.CTkCheckBox(options_frame, text="Also transmit frames to CAN bus (requires connection)",
                         variable=transmit_var, fg_color=Colors.PRIMARY).pack(anchor="w", pady=10)
@@ -2629,9 +5713,15 @@ class ModernCANApp(ctk.CTk):
         ctk.CTkCheckBox(options_frame, text="Loop playback continuously",
                         variable=loop_var, fg_color=Colors.PRIMARY).pack(anchor="w", pady=5)
 
-        playback_progress = ctk.CTkProgressBar(main_frame, fg_color=Colors.BG_MEDIUM, progress_color=Colors.SUCCESS)
-        playback_progress.pack(fill="x", pady=10)
-        playback_progress.set(0)
+        # Timeline: shows the position while playing, seeks when dragged
+        position = {"value": None}  # Seconds into the session to start from, set by scrubbing
+        timeline = ctk.CTkSlider(main_frame, from_=0, to=max(session_span, 0.001),
+                                 command=lambda value: seek(float(value)))
+        timeline.pack(fill="x", pady=(10, 0))
+        timeline.set(0)
+        time_label = ctk.CTkLabel(main_frame, text=f"0.0 / {session_span:.1f} s", font=ctk.CTkFont(size=11),
+                                  text_color=Colors.TEXT_MUTED)
+        time_label.pack()
 
         playback_status = ctk.CTkLabel(main_frame, text="Ready to play", font=ctk.CTkFont(size=12),
                                        text_color=Colors.TEXT_SECONDARY)
@@ -2641,86 +5731,198 @@ class ModernCANApp(ctk.CTk):
             speeds = {"0.25x": 4.0, "0.5x": 2.0, "1x": 1.0, "2x": 0.5, "4x": 0.25, "10x": 0.1, "Max": 0.0}
             return speeds.get(speed_var.get(), 1.0)
 
+        engine = {"value": None}
+        # Per-ID state and filter of the replay; a seek resets both
+        replay = {"states": IDStateTable(), "filter": None}
+
+        def show_state(state: Dict[int, CANFrame]):
+            """Rebuild the monitor from the per-ID state at a seek position"""
+            self._clear_monitor_silent()
+            self.monitor_origin = session_start
+            replay["states"].clear()
+            self._feed_monitor(sorted(state.values(), key=lambda fr: fr.timestamp),
+                               replay["states"], replay["filter"])
+
+        def selected_ids() -> set:
+            return parse_id_list(ids_entry.get().replace(",", " ").split())
+
+        # Idle scrubbing: debounced, the state is read on a worker, one worker at a time
+        scrub = {"after": None, "busy": False, "generation": 0}
+
+        def seek(offset: float):
+            time_label.configure(text=f"{offset:.1f} / {session_span:.1f} s")
+            running = engine["value"]
+            if running and running.running:
+                running.seek(session_start + offset)
+                return
+            # Idle: move the start position, preview the state there once dragging pauses
+            position["value"] = offset
+            if self.loaded_snapshots is None or self.is_sniffing:
+                return  # Never wipe a live monitor for a preview
+            if scrub["after"]:
+                win.after_cancel(scrub["after"])
+            scrub["after"] = win.after(SCRUB_DEBOUNCE_MS, preview)
+
+        def preview():
+            scrub["after"] = None
+            scrub["generation"] += 1
+            if self.is_playing_back or self.is_sniffing or session is not self.loaded_session:
+                return
+            if scrub["busy"]:
+                return  # The running worker starts over when it finishes
+            scrub["busy"] = True
+            generation = scrub["generation"]
+            index = session.index_at_time(session_start + position["value"])
+            can_ids = selected_ids()
+            snapshots = self.loaded_snapshots
+            replay["filter"] = compile_frame_filter(self.filter_settings, self.filter_entry.get(),
+                                                    replay["states"])
+
+            def work():
+                try:
+                    state = snapshots.state_at(index)
+                    if can_ids:
+                        state = {can_id: fr for can_id, fr in state.items() if can_id in can_ids}
+                except Exception as e:
+                    print(f"Playback preview error: {e}")
+                    state = None
+                self.after(0, lambda: preview_done(generation, state))
+
+            self._scrub_worker = threading.Thread(target=work, daemon=True)
+            self._scrub_worker.start()
+
+        def preview_done(generation: int, state: Optional[Dict[int, CANFrame]]):
+            scrub["busy"] = False
+            if not win.winfo_exists() or session is not self.loaded_session:
+                return
+            if generation != scrub["generation"]:
+                preview()
+            elif state is not None and not self.is_sniffing and not self.is_playing_back:
+                show_state(state)
+
         def start_playback():
             if self.is_playing_back:
                 return
+            if session is not self.loaded_session:
+                playback_status.configure(text="Another session was loaded; reopen playback")
+                return
+            try:
+                window_from = float(from_entry.get() or 0)
+                window_to = float(to_entry.get() or session_span)
+            except ValueError:
+                playback_status.configure(text="Invalid time window")
+                return
+            start = session.index_at_time(session_start + window_from)
+            stop = session.index_at_time(session_start + window_to)
+            stop = len(session) if window_to >= session_span else stop
+            if start >= stop:
+                playback_status.configure(text="Time window holds no frames")
+                return
+            can_ids = selected_ids()
+            if scrub["after"]:
+                win.after_cancel(scrub["after"])
+                scrub["after"] = None
+
             self.is_playing_back = True
             self._clear_monitor_silent()
-            speed_mult = get_speed_multiplier()
+            self.monitor_origin = session_start
             do_transmit = transmit_var.get()
-            do_loop = loop_var.get()
+            # Replayed frames take the live ingest path, with per-ID state of their own
+            states = replay["states"] = IDStateTable()
+            frame_filter = replay["filter"] = compile_frame_filter(self.filter_settings, self.filter_entry.get(),
+                                                                   states)
+            last_progress = [0.0]
+
+            def on_frames(frames):
+                tx = self.tx
+                if do_transmit and tx and self.ser and self.ser.is_open:
+                    # Blocks while the TX queue is full, holding the replay to the port's pace
+                    frame_command = tx.frame_command
+                    tx.submit_many([frame_command(frame) for frame in frames])
+                self._feed_monitor(frames, states, frame_filter)
+
+            def on_progress(timestamp, fraction):
+                now = time.perf_counter()
+                if fraction < 1.0 and now - last_progress[0] < PLAYBACK_PROGRESS_S:
+                    return
+                last_progress[0] = now
 
-            def playback_thread():
-                while self.is_playing_back:
-                    total = len(self.loaded_session)
-                    prev_time = None
+                def show():
+                    offset = timestamp - session_start
+                    timeline.set(offset)
+                    time_label.configure(text=f"{offset:.1f} / {session_span:.1f} s")
+                    playback_status.configure(text=f"Playing: {fraction * 100:.0f}%")
+                self.after(0, show)
 
-                    for idx, frame in enumerate(self.loaded_session):
-                        if not self.is_playing_back:
-                            break
+            def on_seek(index, state):
+                # Hold the replay until the monitor shows the new position
+                shown = threading.Event()
 
-                        delay = 0.01
-                        if speed_mult > 0:
-                            try:
-                                time_str = frame['timestamp']
-                                parts = time_str.split(':')
-                                if len(parts) == 3:
-                                    h, m, rest = parts
-                                    s_parts = rest.split('.')
-                                    s = float(s_parts[0])
-                                    ms = float(s_parts[1]) / 1000 if len(s_parts) > 1 else 0
-                                    current_time = int(h) * 3600 + int(m) * 60 + s + ms
-                                    if prev_time is not None:
-                                        delay = (current_time - prev_time) * speed_mult
-                                        delay = max(0, min(delay, 5.0))
-                                    prev_time = current_time
-                            except:
-                                delay = 0.01 * speed_mult
-
-                        progress = (idx + 1) / total
-                        self.after(0, lambda p=progress: playback_progress.set(p))
-                        self.after(0, lambda i=idx, t=total: playback_status.configure(text=f"Playing: {i + 1}/{t}"))
-
-                        data_list = frame['data'].split()
-                        while len(data_list) < 8:
-                            data_list.append("00")
-
-                        self.after(0, lambda f=frame, d=data_list: self.update_monitor(
-                            f['id'], f['rtr'], f['ide'], f['dlc'], d[:8]))
-
-                        if do_transmit and self.ser and self.ser.is_open:
-                            command = f"SEND:{frame['id']}|{frame['data']}\n"
-                            try:
-                                self.ser.write(command.encode('utf-8'))
-                            except:
-                                pass
-
-                        if delay > 0:
-                            time.sleep(delay)
-
-                    if not do_loop:
-                        break
+                def apply():
+                    try:
+                        show_state(state)
+                    finally:
+                        shown.set()
+                self.after(0, apply)
+                shown.wait(1.0)
 
+            def on_done(stats, stopped):
                 self.is_playing_back = False
-                self.after(0, lambda: playback_status.configure(text="Playback complete"))
-                self.after(0, lambda: self._show_status("✓ Playback complete", 3000, Colors.SUCCESS))
-
-            threading.Thread(target=playback_thread, daemon=True).start()
+                report = stats.summary() if stats.count else ""
+                if stopped:
+                    self.after(0, lambda: playback_status.configure(text=f"Stopped\n{report}"))
+                else:
+                    self.after(0, lambda: playback_status.configure(text=f"Playback complete\n{report}"))
+                    self.after(0, lambda: self._show_status("✓ Playback complete", 3000, Colors.SUCCESS))
+                if report:
+                    print(f"Playback {report}")
+
+            engine["value"] = self.playback_engine = PlaybackEngine(
+                session, get_speed_multiplier(), loop_var.get(), on_frames, on_progress, on_done,
+                start=start, stop=stop, can_ids=can_ids, snapshots=self.loaded_snapshots, on_seek=on_seek)
+            if position["value"] is not None and position["value"] > window_from:
+                engine["value"].seek(session_start + position["value"])
+            position["value"] = None
+            pause_btn.configure(text="⏸ Pause")
+            engine["value"].start()
+
+        def toggle_pause():
+            running = engine["value"]
+            if not running or not running.running:
+                return
+            if running.paused:
+                running.resume()
+                pause_btn.configure(text="⏸ Pause")
+                playback_status.configure(text="Playing")
+            else:
+                running.pause()
+                pause_btn.configure(text="▶ Resume")
+                playback_status.configure(text="Paused")
 
         def stop_playback():
+            if engine["value"]:
+                engine["value"].stop()
             self.is_playing_back = False
+            pause_btn.configure(text="⏸ Pause")
             playback_status.configure(text="Stopped")
 
         btn_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
         btn_frame.pack(pady=20)
 
         ctk.CTkButton(btn_frame, text="▶ Play", command=start_playback, fg_color=Colors.SUCCESS,
-                      hover_color="#059669", width=120, height=40).pack(side="left", padx=10)
+                      hover_color="#059669", width=100, height=40).pack(side="left", padx=8)
+        pause_btn = ctk.CTkButton(btn_frame, text="⏸ Pause", command=toggle_pause, fg_color=Colors.WARNING,
+                                  width=100, height=40)
+        pause_btn.pack(side="left", padx=8)
         ctk.CTkButton(btn_frame, text="⏹ Stop", command=stop_playback, fg_color=Colors.DANGER,
-                      hover_color="#DC2626", width=120, height=40).pack(side="left", padx=10)
+                      hover_color="#DC2626", width=100, height=40).pack(side="left", padx=8)
         ctk.CTkButton(btn_frame, text="Close", command=lambda: [stop_playback(), win.destroy()],
-                      fg_color=Colors.BG_LIGHT, width=100, height=40).pack(side="left", padx=10)
+                      fg_color=Colors.BG_LIGHT, width=90, height=40).pack(side="left", padx=8)
 
 if __name__ == "__main__":
-    app = ModernCANApp()
+    parser = argparse.ArgumentParser(description="CAN Sniffer")
+    parser.add_argument("--grouped-renderer", choices=["widgets", "canvas"], default=GROUPED_RENDERER,
+                        help="Grouped view renderer")
+    args = parser.parse_args()
+    app = ModernCANApp(grouped_renderer=args.grouped_renderer)
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src"))
+
+
+class FakeTime:
+    """Stands in for the time module inside canSniffer; sleeping advances the clock"""
+
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def perf_counter(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 1e-5)
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    cs = pytest.importorskip("canSniffer")
+    clock = FakeTime()
+    monkeypatch.setattr(cs, "time", clock)
+    return clock
@@ -0,0 +1,118 @@
+import struct
+
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+STRIDE = 16
+
+
+def make_frames(count):
+    ids = (0x100, 0x200, 0x18FF0001)
+    frames = []
+    for k in range(count):
+        # 0x300 only shows up in the first block
+        can_id = 0x300 if k == 3 else ids[k % 3]
+        frames.append(cs.CANFrame(500.0 + k * 0.01, can_id, 0, 8, bytes((k + j) & 0xFF for j in range(8))))
+    return frames
+
+
+def write_capture(path, frames, stride=STRIDE):
+    fmt = cs.BinaryLogFormat(stride=stride)
+    with open(path, 'wb') as f:
+        f.write(fmt.header())
+        f.write(fmt.encode(frames[:len(frames) // 2]))
+        f.write(fmt.encode(frames[len(frames) // 2:]))
+        f.write(fmt.footer())
+    return fmt
+
+
+def key(fr):
+    return fr.timestamp, fr.can_id, fr.flags, fr.dlc, fr.data
+
+
+@pytest.fixture
+def capture(tmp_path):
+    frames = make_frames(100)
+    path = str(tmp_path / "log.cancap")
+    write_capture(path, frames)
+    cap = cs.CaptureFile(path)
+    yield cap, frames
+    cap.close()
+
+
+def test_round_trip_of_records_and_index(capture):
+    cap, frames = capture
+    assert len(cap) == 100 and cap.stride == STRIDE
+    assert [key(fr) for fr in cap] == [key(fr) for fr in frames]
+    assert list(cap.block_times) == [frames[k].timestamp for k in range(0, 100, STRIDE)]
+    assert cap.id_counts == {0x100: 33, 0x200: 33, 0x18FF0001: 33, 0x300: 1}
+    assert list(cap.id_blocks[0x300]) == [0]
+    assert list(cap.id_blocks[0x100]) == list(range(7))
+    assert cap.time_span() == pytest.approx(0.99)
+
+
+def test_index_at_time(capture):
+    cap, frames = capture
+    assert cap.index_at_time(0.0) == 0
+    assert cap.index_at_time(frames[37].timestamp) == 37
+    assert cap.index_at_time(frames[37].timestamp + 0.005) == 38
+    assert cap.index_at_time(frames[-1].timestamp + 1) == 100
+
+
+def test_iter_ids_reads_only_matching_frames(capture):
+    cap, frames = capture
+    got = [key(fr) for chunk in cap.iter_ids([0x200, 0x300]) for fr in chunk]
+    assert got == [key(fr) for fr in frames if fr.can_id in (0x200, 0x300)]
+    got = [key(fr) for chunk in cap.iter_ids([0x100], start=20, stop=50) for fr in chunk]
+    assert got == [key(fr) for fr in frames[20:50] if fr.can_id == 0x100]
+
+
+@pytest.mark.parametrize("index", [0, 1, 4, STRIDE, STRIDE + 1, 50, 99, 100])
+def test_state_at_matches_a_linear_scan(capture, index):
+    cap, frames = capture
+    expected = {}
+    for fr in frames[:index]:
+        expected[fr.can_id] = fr
+    assert {i: key(fr) for i, fr in cap.state_at(index).items()} == {i: key(fr) for i, fr in expected.items()}
+    if index == 100:
+        assert cap.latest_frames().keys() == expected.keys()
+
+
+def test_truncated_file_is_rejected(tmp_path):
+    path = str(tmp_path / "log.cancap")
+    write_capture(path, make_frames(100))
+    with open(path, 'rb') as f:
+        blob = f.read()
+    for size in (0, 10, cs.CAPFILE_HEADER.size, len(blob) // 2, len(blob) - 1):
+        with open(path, 'wb') as f:
+            f.write(blob[:size])
+        with pytest.raises(ValueError):
+            cs.CaptureFile(path)
+
+
+def test_corrupt_index_is_rejected(tmp_path):
+    path = str(tmp_path / "log.cancap")
+    write_capture(path, make_frames(100))
+    with open(path, 'rb') as f:
+        blob = bytearray(f.read())
+    trailer = len(blob) - cs.CAPFILE_TRAILER.size
+    index_offset, count, magic = cs.CAPFILE_TRAILER.unpack_from(blob, trailer)
+
+    bad_count = bytearray(blob)
+    cs.CAPFILE_TRAILER.pack_into(bad_count, trailer, index_offset, count + 1, magic)
+    bad_ids = bytearray(blob)
+    struct.pack_into("<I", bad_ids, index_offset + 4 + 8 * 7, 1000)  # ID table length
+    for corrupt in (bad_count, bad_ids):
+        with open(path, 'wb') as f:
+            f.write(corrupt)
+        with pytest.raises(ValueError, match="corrupt"):
+            cs.CaptureFile(path)
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = str(tmp_path / "log.cancap")
+    with open(path, 'wb') as f:
+        f.write(b"Timestamp,ID,DLC,Data\n" * 20)
+    with pytest.raises(ValueError, match="Not a capture file"):
+        cs.CaptureFile(path)
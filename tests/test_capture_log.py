@@ -0,0 +1,19 @@
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+
+def test_spilled_frames_read_back_identically():
+    log = cs.CaptureLog(max_memory_frames=100)
+    frames = [cs.CANFrame(1000.0 + k * 0.001, (k * 7919) & 0x1FFFFFFF, k % 4, k % 9,
+                          bytes((k + j) & 0xFF for j in range(8))) for k in range(250)]
+    try:
+        for fr in frames:
+            log.append(fr)
+        assert log.spilled == 200
+        got = log.read_range(0, len(log))
+        assert [(fr.timestamp, fr.can_id, fr.flags, fr.dlc, fr.data) for fr in got] == \
+               [(fr.timestamp, fr.can_id, fr.flags, fr.dlc, fr.data) for fr in frames]
+        assert log.index_at_time(1000.1205) == 121
+    finally:
+        log.close()
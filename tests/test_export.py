@@ -0,0 +1,84 @@
+import csv
+import gzip
+import io
+import os
+
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+
+def make_log(count=5):
+    log = cs.CaptureLog()
+    for k in range(count):
+        log.append(cs.CANFrame(1700000000.0 + k * 0.5, 0x100 + k, k & 3, k % 9, bytes(range(k, k + 8))))
+    return log
+
+
+def run_export(log, path, **kwargs):
+    results = []
+    job = cs.ExportJob(log, str(path), on_done=lambda count, error, cancelled: results.append(
+        (count, error, cancelled)), **kwargs)
+    job._run()
+    return job, results[0]
+
+
+def reference_csv(frames):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(['timestamp', 'id', 'rtr', 'ide', 'dlc', 'data'])
+    writer.writerows((cs.format_clock_time(fr.timestamp), fr.id_str, fr.rtr, fr.ide, fr.dlc, cs.format_data(fr.payload))
+                     for fr in frames)
+    return out.getvalue().encode('ascii')
+
+
+def test_csv_export_matches_csv_writer_and_renames_into_place(tmp_path):
+    log = make_log()
+    path = tmp_path / "out.csv"
+    _, (count, error, cancelled) = run_export(log, path)
+    assert (count, error, cancelled) == (5, None, False)
+    assert path.read_bytes() == reference_csv(log.read_range(0, len(log)))
+    assert os.listdir(tmp_path) == ["out.csv"]
+
+
+def test_export_filter_and_compression(tmp_path):
+    log = make_log()
+    path = tmp_path / "out.csv.gz"
+    _, (count, error, _) = run_export(log, path, compression=cs.EXPORT_COMPRESSION["gzip (fast)"],
+                                      matches=lambda fr: fr.can_id % 2 == 0)
+    assert (count, error) == (3, None)
+    kept = [fr for fr in log.read_range(0, len(log)) if fr.can_id % 2 == 0]
+    assert gzip.decompress(path.read_bytes()) == reference_csv(kept)
+
+
+def test_cancelled_export_removes_part_and_keeps_old_file(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_bytes(b"old")
+    job = cs.ExportJob(make_log(), str(path))
+    results = []
+    job.on_progress = lambda done, total: job.cancel()
+    job.on_done = lambda count, error, cancelled: results.append((error, cancelled))
+    job._run()
+    assert results == [(None, True)]
+    assert path.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["out.csv"]
+
+
+def test_failed_export_removes_part_and_reports(tmp_path):
+    path = tmp_path / "out.csv"
+
+    def explode(frame):
+        raise RuntimeError("bad filter")
+
+    _, (count, error, cancelled) = run_export(make_log(), path, matches=explode)
+    assert isinstance(error, RuntimeError) and not cancelled
+    assert os.listdir(tmp_path) == []
+
+
+def test_export_excludes_frames_added_after_start(tmp_path):
+    log = make_log(3)
+    job = cs.ExportJob(log, str(tmp_path / "out.csv"))
+    log.append(cs.CANFrame(1700000009.0, 0x7FF, 0, 0, b""))
+    job.on_done = lambda count, error, cancelled: None
+    job._run()
+    assert (tmp_path / "out.csv").read_bytes().count(b"\r\n") == 4
@@ -0,0 +1,59 @@
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+
+def frame(can_id=0x123, data=b"", flags=0):
+    return cs.CANFrame(0.0, can_id, flags, len(data), data.ljust(8, b"\0"))
+
+
+def matches(text, fr):
+    return cs.FilterExpression(text).predicate()(fr)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("d[0] << 1 >> 2 == 0x8", True),
+    ("d[0] >> 2 << 1 == 0x8", True),
+    ("d[0] >> 1 >> 1 == 4", True),
+    ("d[0] | 1 ^ 1 == 0x10", True),        # | binds looser than ^
+    ("d[0] & 0x30 << 1 == 0", True),       # << binds tighter than &
+    ("d[0] + 1 << 1 == 0x22", True),       # + binds tighter than <<
+    ("~d[0] & 0xFF == 0xEF", True),
+    ("-1 + d[0] == 15", True),
+])
+def test_operator_precedence(text, expected):
+    assert matches(text, frame(data=b"\x10")) is expected
+
+
+def test_fields_and_logic():
+    fr = frame(0x1ABCDEF0, b"\x01\x80", cs.CANFrame.FLAG_IDE)
+    assert matches("ide and id > 0x7FF and dlc == 2", fr)
+    assert matches("data[1] & 0x80 and not rtr", fr)
+    assert not matches("id == 1 or d[0] == 2", fr)
+    assert matches("not (id == 1 or d[0] == 2)", fr)
+
+
+def test_membership():
+    fr = frame(0x150, b"\x05")
+    assert matches("id in 0x100..0x1FF", fr)
+    assert matches("id in [0x10, 0x140..0x15F]", fr)
+    assert matches("d[0] in [1, 5, 9]", fr)
+    assert matches("id not in [0x100, 0x200]", fr)
+    assert not matches("id not in 0x100..0x1FF", fr)
+
+
+def test_changed_tracks_previous_frame_per_id():
+    accept = cs.FilterExpression("changed(d[0])").predicate()
+    assert not accept(frame(0x100, b"\x01"))
+    assert not accept(frame(0x100, b"\x01"))
+    assert accept(frame(0x100, b"\x02"))
+    assert not accept(frame(0x200, b"\x02"))
+
+
+@pytest.mark.parametrize("text", [
+    "", "id ==", "id == 1)", "(id == 1", "foo == 1", "d[8] == 0",
+    "id in 1", "id in [d[0]]", "id $ 1",
+])
+def test_syntax_errors(text):
+    with pytest.raises(cs.FilterSyntaxError):
+        cs.FilterExpression(text)
@@ -0,0 +1,68 @@
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+
+def settings(**overrides):
+    values = dict(cs.DEFAULT_FILTER_SETTINGS)
+    values.update(overrides)
+    return values
+
+
+def frame(can_id, dlc=8, data=b"\x01" * 8, ts=0.0):
+    return cs.CANFrame(ts, can_id, 0, dlc, data)
+
+
+def accepted(accept, frames):
+    return [fr.can_id for fr in frames if accept(fr)]
+
+
+def closure(func, name):
+    return dict(zip(func.__code__.co_freevars, (cell.cell_contents for cell in func.__closure__)))[name]
+
+
+def test_defaults_accept_everything():
+    assert cs.compile_frame_filter(settings()) is None
+    # Stateful filters need a state table to do anything
+    assert cs.compile_frame_filter(settings(hide_periodic=True)) is None
+
+
+def test_whitelist_and_blacklist():
+    frames = [frame(0x100), frame(0x1A0), frame(0x200), frame(0x18FF0001)]
+    accept = cs.compile_frame_filter(settings(id_whitelist=["100", "0x1A0", "18FF0001", "junk"]))
+    assert accepted(accept, frames) == [0x100, 0x1A0, 0x18FF0001]
+    accept = cs.compile_frame_filter(settings(id_blacklist=["1A0"]))
+    assert accepted(accept, frames) == [0x100, 0x200, 0x18FF0001]
+    accept = cs.compile_frame_filter(settings(id_whitelist=["100", "1A0"], id_blacklist=["1A0"]))
+    assert accepted(accept, frames) == [0x100]
+
+
+def test_quick_id_filter_matches_substrings():
+    accept = cs.compile_frame_filter(settings(), id_text=" 1a ")
+    assert accepted(accept, [frame(0x1A0), frame(0x21A), frame(0x100)]) == [0x1A0, 0x21A]
+
+
+def test_dlc_bounds_are_inclusive():
+    accept = cs.compile_frame_filter(settings(min_dlc=2, max_dlc=4))
+    assert [dlc for dlc in range(9) if accept(frame(0x100, dlc=dlc))] == [2, 3, 4]
+
+
+def test_hide_zero_data():
+    accept = cs.compile_frame_filter(settings(hide_zero_data=True))
+    assert not accept(frame(0x100, data=bytes(8)))
+    assert accept(frame(0x100, data=b"\x00" * 7 + b"\x01"))
+
+
+def test_id_verdicts_are_cached_per_id():
+    accept = cs.compile_frame_filter(settings(id_blacklist=["200"]))
+    for _ in range(3):
+        accepted(accept, [frame(0x100), frame(0x200)])
+    assert closure(accept, "verdicts") == {0x100: True, 0x200: False}
+    # The DLC check still runs for every frame of a cached ID
+    accept = cs.compile_frame_filter(settings(id_whitelist=["100"], max_dlc=4))
+    assert accept(frame(0x100, dlc=4)) and not accept(frame(0x100, dlc=5))
+
+
+def test_expression_runs_after_the_fixed_filters():
+    accept = cs.compile_frame_filter(settings(id_whitelist=["100", "200"], expression="d[0] == 1"))
+    assert accepted(accept, [frame(0x100), frame(0x200, data=b"\x02" * 8), frame(0x300)]) == [0x100]
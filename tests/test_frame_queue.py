@@ -0,0 +1,56 @@
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+
+def frame(can_id, value):
+    return cs.CANFrame(0.0, can_id, 0, 1, bytes([value]))
+
+
+def drain(queue):
+    return [(fr.can_id, fr.data[0]) for fr in queue.get_batch(100)]
+
+
+def test_drop_oldest_keeps_the_newest_frames():
+    queue = cs.FrameQueue(maxsize=3, policy="drop_oldest")
+    queue.put_many([frame(1, 1), frame(2, 1), frame(1, 2), frame(3, 1), frame(1, 3)])
+    assert len(queue) == 3
+    assert drain(queue) == [(1, 2), (3, 1), (1, 3)]
+    assert (queue.dropped, queue.coalesced) == (2, 0)
+
+
+def test_coalesce_replaces_a_queued_id_at_the_tail():
+    queue = cs.FrameQueue(maxsize=3, policy="coalesce")
+    queue.put_many([frame(1, 1), frame(2, 1), frame(3, 1)])
+    queue.put(frame(1, 2))  # Full: ID 1's older frame leaves, the new one queues last
+    assert drain(queue) == [(2, 1), (3, 1), (1, 2)]
+    assert (queue.dropped, queue.coalesced) == (0, 1)
+
+
+def test_coalesce_keeps_arrival_order_across_ids():
+    queue = cs.FrameQueue(maxsize=3, policy="coalesce")
+    queue.put_many([frame(1, 1), frame(2, 1), frame(3, 1), frame(2, 2), frame(1, 2)])
+    assert drain(queue) == [(3, 1), (2, 2), (1, 2)]
+    assert queue.coalesced == 2
+
+
+def test_coalesce_drops_oldest_for_new_ids():
+    queue = cs.FrameQueue(maxsize=2, policy="coalesce")
+    queue.put_many([frame(1, 1), frame(2, 1), frame(3, 1), frame(1, 2)])
+    assert drain(queue) == [(3, 1), (1, 2)]
+    assert (queue.dropped, queue.coalesced) == (2, 0)
+
+
+def test_coalesce_index_follows_get_batch_and_clear():
+    queue = cs.FrameQueue(maxsize=2, policy="coalesce")
+    queue.put_many([frame(1, 1), frame(2, 1)])
+    assert drain(queue) == [(1, 1), (2, 1)]
+    queue.put_many([frame(1, 2), frame(2, 2), frame(1, 3)])
+    assert drain(queue) == [(2, 2), (1, 3)]
+    queue.put_many([frame(1, 4), frame(2, 4)])
+    queue.clear()
+    queue.put_many([frame(1, 5), frame(2, 5), frame(3, 5)])
+    assert drain(queue) == [(2, 5), (3, 5)]
+    assert (queue.dropped, queue.coalesced) == (1, 1)
+    queue.reset_counters()
+    assert (queue.dropped, queue.coalesced) == (0, 0)
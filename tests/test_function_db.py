@@ -0,0 +1,72 @@
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+PAYLOAD = bytes.fromhex("0102030405060708")
+
+
+def make_db():
+    return cs.FunctionDB({
+        "123": {"device": "ECU", "mappings": {
+            "01 02 03 04 05 06 07 08": "exact",
+            "01 ?? 03 04 05 06 07 08": "one wildcard",
+            "?? ?? ?? ?? ?? ?? ?? ??": "any",
+        }},
+    })
+
+
+def test_exact_pattern_beats_wildcards():
+    db = make_db()
+    assert db.lookup(0x123, PAYLOAD).name == "exact"
+    assert db.lookup(0x123, bytes.fromhex("01FF030405060708")).name == "one wildcard"
+    assert db.lookup(0x123, bytes(8)).name == "any"
+    assert db.lookup(0x124, PAYLOAD) is None
+
+
+def test_short_patterns_only_match_their_own_length():
+    db = cs.FunctionDB({"100": {"device": "ECU", "mappings": {"01 ??": "short", "01 02 03": "three"}}})
+    assert cs.parse_pattern("01 ??") == (1, None)
+    assert db.lookup(0x100, bytes.fromhex("0102")).name == "short"
+    assert db.lookup(0x100, bytes.fromhex("010203")).name == "three"
+    assert db.lookup(0x100, bytes.fromhex("0102000000000000")) is None
+    assert db.lookup(0x100, bytes.fromhex("01")) is None
+
+
+def test_malformed_patterns_are_skipped():
+    assert cs.parse_pattern("01 GG") is None
+    assert cs.parse_pattern("00 " * 9) is None
+    db = cs.FunctionDB({"100": {"device": "ECU", "mappings": {"01 GG": "bad"}}})
+    assert db.entries() == []
+
+
+def test_set_and_remove_keep_indexes_consistent():
+    db = make_db()
+    wildcard = db.lookup(0x123, bytes.fromhex("01FF030405060708"))
+
+    ops = db.rename("123", "01 ?? 03 04 05 06 07 08", "renamed")
+    assert ops == [("set", ["123", "mappings", "01 ?? 03 04 05 06 07 08"], "renamed")]
+    renamed = db.lookup(0x123, bytes.fromhex("01FF030405060708"))
+    assert renamed.name == "renamed" and renamed.entry_id == wildcard.entry_id
+    assert db.find_by_name("one wildcard") == []
+    assert db.find_by_name("renamed") == [renamed]
+
+    assert db.remove("123", "01 ?? 03 04 05 06 07 08") == [("del", ["123", "mappings", "01 ?? 03 04 05 06 07 08"])]
+    assert db.lookup(0x123, bytes.fromhex("01FF030405060708")).name == "any"
+    assert db.entry(wildcard.entry_id) is None
+
+    db.remove("123", "?? ?? ?? ?? ?? ?? ?? ??")
+    assert db.lookup(0x123, bytes(8)) is None
+    assert (0x123, 8) not in db._tries
+
+    assert db.remove("123", "01 02 03 04 05 06 07 08") == [("del", ["123"])]
+    assert db.lookup(0x123, PAYLOAD) is None
+    assert db.raw == {} and db.entries() == [] and db._exact == {} and db._by_name == {}
+
+
+def test_set_new_id_and_device_change():
+    db = cs.FunctionDB()
+    assert db.set("7E0", "ECU", "02 01 0C", "rpm") == [("set", ["7E0"], {"device": "ECU", "mappings": {"02 01 0C": "rpm"}})]
+    ops = db.set("7E0", "Engine", "02 01 0D", "speed")
+    assert ops == [("set", ["7E0", "device"], "Engine"), ("set", ["7E0", "mappings", "02 01 0D"], "speed")]
+    assert [e.device for e in db.entries()] == ["Engine", "Engine"]
+    assert db.lookup(0x7E0, bytes.fromhex("02010C")).name == "rpm"
@@ -0,0 +1,102 @@
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+
+def frame(can_id, data, ts):
+    return cs.CANFrame(ts, can_id, 0, len(data), data)
+
+
+def test_change_and_byte_masks_accumulate():
+    states = cs.IDStateTable()
+    first = states.update(frame(0x100, b"\x00\x00\x00", 1.0))
+    assert (first.count, first.changes, first.change_mask, first.byte_mask) == (1, 0, 0, 0)
+
+    state = states.update(frame(0x100, b"\x01\x00\x00", 1.1))
+    assert (state.change_mask, state.byte_mask, state.changes) == (0b001, 0b001, 1)
+    state = states.update(frame(0x100, b"\x01\x00\x05", 1.2))
+    assert (state.change_mask, state.byte_mask, state.changes) == (0b100, 0b101, 2)
+    state = states.update(frame(0x100, b"\x01\x00\x05", 1.3))
+    assert (state.change_mask, state.byte_mask, state.changes) == (0, 0b101, 2)
+    assert state.count == 4
+    assert state.last_change == 1.2 and state.last_seen == 1.3
+    assert state.period == pytest.approx(0.1)
+    assert states.get(0x200) is None and len(states) == 1
+
+
+def test_frames_sharing_a_timestamp_leave_the_period_alone():
+    states = cs.IDStateTable()
+    states.update(frame(0x100, b"\x01", 1.0))
+    states.update(frame(0x100, b"\x01", 1.5))
+    state = states.update(frame(0x100, b"\x01", 1.5))
+    assert state.period == pytest.approx(0.5)
+
+
+def test_sorted_ids():
+    states = cs.IDStateTable()
+    for can_id, ts in ((0x300, 1.0), (0x100, 2.0), (0x200, 3.0), (0x100, 4.0)):
+        states.update(frame(can_id, b"\x01", ts))
+    assert states.sorted_ids("Arrival") == [0x300, 0x100, 0x200]
+    assert states.sorted_ids("ID") == [0x100, 0x200, 0x300]
+    assert states.sorted_ids("Count", reverse=True)[0] == 0x100
+    states.clear()
+    assert states.sorted_ids("ID") == []
+
+
+def run_filter(settings, frames):
+    states = cs.IDStateTable()
+    values = dict(cs.DEFAULT_FILTER_SETTINGS)
+    values.update(settings)
+    accept = cs.compile_frame_filter(values, states=states)
+    shown = []
+    for fr in frames:
+        states.update(fr)
+        if accept(fr):
+            shown.append((fr.can_id, fr.timestamp))
+    return shown
+
+
+def test_hide_periodic_drops_unchanged_repeats():
+    frames = [frame(0x100, b"\x01", 0.0), frame(0x100, b"\x01", 0.1), frame(0x100, b"\x02", 0.2),
+              frame(0x100, b"\x02", 0.3), frame(0x200, b"\x01", 0.3), frame(0x100, b"\x01", 0.4)]
+    assert run_filter({'hide_periodic': True}, frames) == [(0x100, 0.0), (0x100, 0.2), (0x200, 0.3), (0x100, 0.4)]
+
+
+def test_show_only_changed_keeps_recently_changing_ids():
+    late = cs.RECENT_CHANGE_S + 1.0
+    frames = [frame(0x100, b"\x01", 0.0), frame(0x100, b"\x02", 0.1), frame(0x100, b"\x02", 0.2),
+              frame(0x200, b"\x01", 0.2), frame(0x200, b"\x01", 0.3), frame(0x100, b"\x02", late)]
+    assert run_filter({'show_only_changed': True}, frames) == [(0x100, 0.1), (0x100, 0.2)]
+
+
+def push(stage, states, frames):
+    stage.push_many(frames, [states.update(fr).change_mask for fr in frames])
+
+
+def test_coalescer_keeps_bytes_that_changed_back():
+    states = cs.IDStateTable()
+    stage = cs.GroupedCoalescer()
+    push(stage, states, [frame(0x100, b"\x00\x00", 0.0)])
+    stage.take_dirty()
+
+    # Byte 1 flips and flips back before the next paint
+    push(stage, states, [frame(0x100, b"\x00\x01", 0.1), frame(0x100, b"\x00\x00", 0.2)])
+    (latest, change_mask, count, changes), = stage.take_dirty()
+    assert latest.payload == b"\x00\x00"
+    assert (change_mask, count, changes) == (0b10, 2, 2)
+
+
+def test_coalescer_takes_each_dirty_id_once_and_resets():
+    states = cs.IDStateTable()
+    stage = cs.GroupedCoalescer()
+    push(stage, states, [frame(0x100, b"\x01", 0.0), frame(0x200, b"\x01", 0.0), frame(0x100, b"\x01", 0.1)])
+    taken = stage.take_dirty()
+    assert [(fr.can_id, mask, count, changes) for fr, mask, count, changes in taken] == [
+        (0x100, 0, 2, 0), (0x200, 0, 1, 0)]
+    assert stage.take_dirty() == []
+
+    push(stage, states, [frame(0x200, b"\x03", 0.2)])
+    assert [(fr.can_id, mask, count, changes) for fr, mask, count, changes in stage.take_dirty()] == [
+        (0x200, 0b1, 1, 1)]
+    stage.clear()
+    assert stage.take_dirty() == []
@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def test_journal_is_replayed_over_the_json_file(tmp_path):
+    path = str(tmp_path / "ids.json")
+    write_json(path, {"100": "Engine", "200": "Brakes"})
+    store = cs.JsonStore(path, compact_after=100)
+    store.data["300"] = "Doors"
+    store.commit([("set", ["300"], "Doors")])
+    del store.data["200"]
+    store.commit([("del", ["200"])])
+    store.commit([("set", ["400", "mappings", "01"], "nested")])
+
+    reloaded = cs.JsonStore(path)
+    assert reloaded.data == {"100": "Engine", "300": "Doors", "400": {"mappings": {"01": "nested"}}}
+    assert reloaded._pending == 3
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {"100": "Engine", "200": "Brakes"}
+
+
+def test_torn_last_journal_line_is_dropped(tmp_path):
+    path = str(tmp_path / "ids.json")
+    store = cs.JsonStore(path, compact_after=100)
+    store.commit([("set", ["100"], "Engine")])
+    with open(store.journal_path, 'ab') as f:
+        f.write(b'[["set", ["200"], "Bra')
+    good_size = os.path.getsize(store.journal_path) - len(b'[["set", ["200"], "Bra')
+
+    reloaded = cs.JsonStore(path, compact_after=100)
+    assert reloaded.data == {"100": "Engine"}
+    assert os.path.getsize(reloaded.journal_path) == good_size
+    reloaded.commit([("set", ["300"], "Doors")])
+    assert cs.JsonStore(path).data == {"100": "Engine", "300": "Doors"}
+
+
+def test_compact_rewrites_file_and_empties_journal(tmp_path, monkeypatch):
+    path = str(tmp_path / "ids.json")
+    write_json(path, {"100": "Engine"})
+    store = cs.JsonStore(path, compact_after=100)
+    store.data["200"] = "Brakes"
+    store.commit([("set", ["200"], "Brakes")])
+
+    replaced = []
+    real_replace = os.replace
+    monkeypatch.setattr(cs.os, "replace", lambda src, dst: (replaced.append((src, dst)), real_replace(src, dst)))
+    store.compact()
+
+    assert len(replaced) == 1
+    tmp, dst = replaced[0]
+    assert dst == path and os.path.dirname(tmp) == str(tmp_path) and not os.path.exists(tmp)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {"100": "Engine", "200": "Brakes"}
+    assert os.path.getsize(store.journal_path) == 0
+    assert store._pending == 0
+    assert sorted(os.listdir(tmp_path)) == ["ids.json", "ids.json.journal"]
+
+
+def test_failed_compaction_keeps_journal_and_removes_temp_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "ids.json")
+    store = cs.JsonStore(path, compact_after=100)
+    store.data["100"] = "Engine"
+    store.commit([("set", ["100"], "Engine")])
+
+    def fail(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(cs.os, "replace", fail)
+    with pytest.raises(OSError):
+        store.compact()
+
+    assert sorted(os.listdir(tmp_path)) == ["ids.json.journal"]
+    monkeypatch.undo()
+    assert cs.JsonStore(path).data == {"100": "Engine"}
+
+
+def test_compaction_triggers_after_commit_count(tmp_path):
+    path = str(tmp_path / "ids.json")
+    store = cs.JsonStore(path, compact_after=3)
+    for k in range(2):
+        store.data[str(k)] = k
+        store.commit([("set", [str(k)], k)])
+    assert not os.path.exists(path)
+    assert store._pending == 2
+
+    store.data["2"] = 2
+    store.commit([("set", ["2"], 2)])
+    assert store._pending == 0
+    assert os.path.getsize(store.journal_path) == 0
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {"0": 0, "1": 1, "2": 2}
+
+    store.commit([])
+    assert store._pending == 0
@@ -0,0 +1,203 @@
+import gzip
+import io
+import lzma
+import struct
+from datetime import datetime
+
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+
+def read_candump(text: str):
+    return [fr for chunk in cs.iter_candump_chunks(io.BytesIO(text.encode())) for fr in chunk]
+
+
+def test_candump_classic_frames():
+    frames = read_candump("(1.500000) can0 123#DEADBEEF\n"
+                          "(2.000000) can0 1ABCDEF0#01\n"
+                          "(3.000000) can0 7FF#R2\n"
+                          "(4.000000) can0 100#\n")
+    assert [(fr.timestamp, fr.can_id, fr.dlc) for fr in frames] == [
+        (1.5, 0x123, 4), (2.0, 0x1ABCDEF0, 1), (3.0, 0x7FF, 2), (4.0, 0x100, 0)]
+    assert frames[0].payload == bytes.fromhex("DEADBEEF")
+    assert frames[1].flags & cs.CANFrame.FLAG_IDE
+    assert frames[2].flags & cs.CANFrame.FLAG_RTR
+
+
+def test_candump_skips_can_fd_lines():
+    frames = read_candump("(1.0) can0 123##1112233\n"
+                          "(1.1) can0 124##0\n"
+                          "(2.0) can0 125#11\n")
+    assert [fr.can_id for fr in frames] == [0x125]
+
+
+def test_csv_clock_rolls_over_midnight():
+    text = ("timestamp,id,rtr,ide,dlc,data\n"
+            "23:59:59.500,100,0,0,1,01\n"
+            "00:00:00.250,100,0,0,1,02\n"
+            "00:00:01.000,100,0,0,1,03\n")
+    frames = [fr for chunk in cs.iter_csv_chunks(io.StringIO(text), 1000.0) for fr in chunk]
+    assert [fr.timestamp for fr in frames] == [1000.0 + 86399.5, 1000.0 + 86400.25, 1000.0 + 86401.0]
+
+
+CSV_TEXT = ("timestamp,id,rtr,ide,dlc,data\n"
+            "10:00:00.000,100,0,0,2,0102\n"
+            "10:00:00.500,18FF0001,0,1,1,03\n"
+            "10:00:01.000,100,0,0,2,0405\n")
+
+
+def run_load(path, **kwargs):
+    results = []
+    job = cs.SessionLoadJob(str(path), on_done=lambda job, error, cancelled: results.append((error, cancelled)),
+                            **kwargs)
+    job._run()
+    return job, results[0]
+
+
+@pytest.mark.parametrize("compress", [None, gzip.compress, lzma.compress])
+def test_session_load_sniffs_compression(tmp_path, compress):
+    blob = CSV_TEXT.encode()
+    path = tmp_path / "session.csv"  # Sniffed from the content, whatever the suffix says
+    path.write_bytes(compress(blob) if compress else blob)
+    job, (error, cancelled) = run_load(path)
+    assert error is None and not cancelled
+    frames = job.frames.read_range(0, len(job.frames))
+    assert [(fr.can_id, fr.payload) for fr in frames] == [
+        (0x100, b"\x01\x02"), (0x18FF0001, b"\x03"), (0x100, b"\x04\x05")]
+    assert [fr.timestamp - frames[0].timestamp for fr in frames] == [0.0, 0.5, 1.0]
+    assert {i: fr.payload for i, fr in job.latest.items()} == {0x100: b"\x04\x05", 0x18FF0001: b"\x03"}
+    assert {i: fr.timestamp for i, fr in job.snapshots.state_at(2).items()} == \
+           {0x100: frames[0].timestamp, 0x18FF0001: frames[1].timestamp}
+    job.frames.close()
+
+
+def test_session_load_reads_compressed_candump(tmp_path):
+    path = tmp_path / "trace.log.gz"
+    path.write_bytes(gzip.compress(b"(1.000000) can0 123#11\n(2.000000) can0 124#2233\n"))
+    job, (error, cancelled) = run_load(path)
+    assert error is None
+    assert [(fr.timestamp, fr.can_id) for fr in job.frames.read_range(0, 2)] == [(1.0, 0x123), (2.0, 0x124)]
+    job.frames.close()
+
+
+def test_session_load_cancel_stops_and_reports(tmp_path):
+    path = tmp_path / "trace.log"
+    lines = [f"({k / 1000:.6f}) can0 {k % 0x7FF:03X}#{k & 0xFF:02X}\n" for k in range(cs.SESSION_LOG_READ_CHUNK + 10)]
+    path.write_text("".join(lines))
+    progress = []
+
+    def on_progress(fraction):
+        progress.append(fraction)
+        job.cancel()
+
+    job = cs.SessionLoadJob(str(path), on_progress=on_progress,
+                            on_done=lambda job, error, cancelled: progress.append((error, cancelled)))
+    job._run()
+    # Stopped after the first chunk
+    assert len(progress) == 2
+    assert progress[1] == (None, True)
+
+
+def test_session_load_reports_bad_files(tmp_path):
+    path = tmp_path / "notes.csv"
+    path.write_text("hello,world\n1,2\n")
+    job, (error, cancelled) = run_load(path)
+    assert isinstance(error, ValueError) and not cancelled
+
+
+def sample_frames():
+    return [
+        cs.CANFrame(1700000000.125, 0x123, 0, 3, bytes.fromhex("A1B2C3")),
+        cs.CANFrame(1700000000.250001, 0x18FF0001, cs.CANFrame.FLAG_IDE, 8, bytes(range(8))),
+        cs.CANFrame(1700000001.5, 0x7FF, cs.CANFrame.FLAG_RTR, 2, b""),
+        cs.CANFrame(1700000002.0, 0x100, 0, 0, b""),
+    ]
+
+
+def frame_key(fr):
+    return round(fr.timestamp, 6), fr.can_id, fr.flags, fr.dlc, fr.payload if not fr.flags & cs.CANFrame.FLAG_RTR else b""
+
+
+def write_format(fmt, frames):
+    return fmt.header() + fmt.encode(frames[:2]) + fmt.encode(frames[2:]) + fmt.footer()
+
+
+def test_asc_round_trip():
+    frames = sample_frames()
+    blob = write_format(cs.VectorAscFormat(), frames)
+    text = blob.decode()
+    assert text.startswith("date ") and "base hex" in text and text.endswith("End TriggerBlock\n")
+    got = [fr for chunk in cs.iter_asc_chunks(io.BytesIO(blob)) for fr in chunk]
+    assert [frame_key(fr) for fr in got] == [frame_key(fr) for fr in frames]
+
+
+def test_asc_date_header_and_decimal_ids():
+    text = ("date Mon Mar 4 01:02:03.456 pm 2024\n"
+            "base dec  timestamps absolute\n"
+            "Begin Triggerblock Mon Mar 4 01:02:03.456 pm 2024\n"
+            "   0.000000 Start of measurement\n"
+            "   0.500000 1  291             Rx   d 2 01 02\n"
+            "   0.750000 1  419364865x      Rx   d 1 FF\n"
+            "   0.800000 1  ErrorFrame\n"
+            "   0.900000 CANFD   1 Rx        123  1 0 8  8 11 22 33 44 55 66 77 88  0  0 1000  0 0 0 0 0\n"
+            "   1.000000 1  256             Tx   r 4\n"
+            "End TriggerBlock\n")
+    start = datetime(2024, 3, 4, 13, 2, 3, 456000).timestamp()
+    got = [fr for chunk in cs.iter_asc_chunks(io.BytesIO(text.encode()), base=0.0) for fr in chunk]
+    assert [frame_key(fr) for fr in got] == [
+        (round(start + 0.5, 6), 0x123, 0, 2, b"\x01\x02"),
+        (round(start + 0.75, 6), 0x18FF0001, cs.CANFrame.FLAG_IDE, 1, b"\xff"),
+        (round(start + 1.0, 6), 0x100, cs.CANFrame.FLAG_RTR, 4, b""),
+    ]
+
+
+def test_asc_without_date_uses_base():
+    text = "   1.250000 1  123             Rx   d 1 01\n"
+    got = [fr for chunk in cs.iter_asc_chunks(io.BytesIO(text.encode()), base=500.0) for fr in chunk]
+    assert [fr.timestamp for fr in got] == [501.25]
+
+
+def test_pcap_round_trip():
+    frames = sample_frames()
+    got = [fr for chunk in cs.iter_pcap_chunks(io.BytesIO(write_format(cs.PcapLogFormat(), frames))) for fr in chunk]
+    assert [frame_key(fr) for fr in got] == [frame_key(fr) for fr in frames]
+
+
+def pcap(endian, magic, packets):
+    out = [struct.pack(endian + "IHHiIII", magic, 2, 4, 0, 0, 65535, cs.PCAP_LINKTYPE_CAN)]
+    for sec, frac, packet in packets:
+        out.append(struct.pack(endian + "IIII", sec, frac, len(packet), len(packet)))
+        out.append(packet)
+    return b"".join(out)
+
+
+def can_packet(word, data, fd=False):
+    # struct can_frame / canfd_frame: ID word in network order, length, flags, 2 reserved, payload
+    size = 64 if fd else 8
+    return struct.pack(">IBBxx", word, len(data), 0x04 if fd else 0) + data.ljust(size, b"\x00")
+
+
+@pytest.mark.parametrize("endian", ["<", ">"])
+@pytest.mark.parametrize("magic, frac, expected", [(cs.PCAP_MAGIC_US, 250000, 0.25),
+                                                   (cs.PCAP_MAGIC_NS, 250000001, 0.250000001)])
+def test_pcap_byte_orders_and_resolutions(endian, magic, frac, expected):
+    blob = pcap(endian, magic, [
+        (100, frac, can_packet(0x123, b"\x01\x02")),
+        (101, 0, can_packet(0x124, bytes(range(12)), fd=True)),
+        (101, 1, can_packet(0x125, b"\x01", fd=True)),
+        (102, 0, can_packet(0x20000000 | 0x004, bytes(8))),  # Error frame
+        (103, 0, can_packet(cs.CAN_EFF_FLAG | 0x18FF0001, b"\xaa")),
+    ])
+    got = [fr for chunk in cs.iter_pcap_chunks(io.BytesIO(blob)) for fr in chunk]
+    assert [(fr.can_id, fr.flags, fr.payload) for fr in got] == [
+        (0x123, 0, b"\x01\x02"), (0x18FF0001, cs.CANFrame.FLAG_IDE, b"\xaa")]
+    assert got[0].timestamp == pytest.approx(100 + expected, abs=1e-9)
+    assert got[1].timestamp == 103.0
+
+
+def test_pcap_rejects_other_files():
+    with pytest.raises(ValueError):
+        list(cs.iter_pcap_chunks(io.BytesIO(b"\x0a\x0d\x0d\x0a" + bytes(28))))
+    with pytest.raises(ValueError):
+        list(cs.iter_pcap_chunks(io.BytesIO(struct.pack("<IHHiIII", cs.PCAP_MAGIC_US, 2, 4, 0, 0, 65535, 1))))
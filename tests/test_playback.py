@@ -0,0 +1,146 @@
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+
+class ClockEvent:
+    """threading.Event stand-in whose timed waits advance the fake clock"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.flag = False
+        self.on_wait = None  # Called after each timed wait, e.g. to resume a pause
+
+    def wait(self, timeout=None):
+        if not self.flag and timeout:
+            self.clock.advance(timeout)
+            if self.on_wait:
+                self.on_wait()
+        return self.flag
+
+    def set(self):
+        self.flag = True
+
+    def clear(self):
+        self.flag = False
+
+
+def make_session(timestamps, can_id=0x100):
+    log = cs.CaptureLog()
+    for k, ts in enumerate(timestamps):
+        log.append(cs.CANFrame(ts, can_id + k % 2, 0, 1, bytes([k & 0xFF]) + bytes(7)))
+    return log
+
+
+def make_engine(fake_time, session, **kwargs):
+    deliveries = []
+    engine = cs.PlaybackEngine(session, on_frames=lambda frames: deliveries.append(
+        (fake_time.now, [fr.timestamp for fr in frames])), **kwargs)
+    engine._wake = ClockEvent(fake_time)
+    return engine, deliveries
+
+
+def test_frames_are_due_at_absolute_deadlines(fake_time):
+    timestamps = [1000.0 + k * 0.01 for k in range(50)]
+    engine, deliveries = make_engine(fake_time, make_session(timestamps))
+    engine.on_frames = lambda frames: (deliveries.append((fake_time.now, frames[0].timestamp)),
+                                       fake_time.advance(0.001))  # Consumer overhead below the spin window
+    started = fake_time.now
+    engine._run()
+
+    assert len(deliveries) == 50
+    for (at, ts) in deliveries:
+        assert at - started == pytest.approx(ts - timestamps[0], abs=1e-4)
+    assert engine.stats.count == 50
+    assert engine.stats.worst < 1e-4
+
+
+def test_long_waits_are_capped_after_scaling(fake_time):
+    # 1 s gap at 10x slow motion would wait 10 s; capped to PLAYBACK_MAX_GAP_S
+    engine, deliveries = make_engine(fake_time, make_session([0.0, 1.0]), scale=10.0)
+    started = fake_time.now
+    engine._run()
+    assert deliveries[1][0] - started == pytest.approx(cs.PLAYBACK_MAX_GAP_S, abs=1e-4)
+
+
+def test_long_gaps_within_the_cap_are_kept_when_scaled_down(fake_time):
+    # 20 s gap at 10x speed waits 2 s, below the cap
+    engine, deliveries = make_engine(fake_time, make_session([0.0, 20.0, 20.5]), scale=0.1)
+    started = fake_time.now
+    engine._run()
+    assert [round(at - started, 3) for at, _ in deliveries] == [0.0, 2.0, 2.05]
+
+
+def test_stalled_consumer_keeps_later_spacing(fake_time):
+    engine, deliveries = make_engine(fake_time, make_session([0.0, 0.1, 0.2]))
+    stall = [0.5]
+    engine.on_frames = lambda frames: (deliveries.append(fake_time.now), fake_time.advance(stall.pop() if stall else 0))
+    started = fake_time.now
+    engine._run()
+    assert [round(at - started, 3) for at in deliveries] == [0.0, 0.6, 0.7]
+
+
+def test_flat_out_replay_batches_frames(fake_time):
+    engine, deliveries = make_engine(fake_time, make_session([k * 1.0 for k in range(10)]), scale=0)
+    engine._run()
+    assert [ts for _, batch in deliveries for ts in batch] == [k * 1.0 for k in range(10)]
+
+
+def test_pause_moves_the_schedule_on(fake_time):
+    engine, deliveries = make_engine(fake_time, make_session([0.0, 0.1, 0.2, 0.3]))
+    started = fake_time.now
+    engine.on_frames = lambda frames: (deliveries.append(fake_time.now),
+                                       engine.pause() if len(deliveries) == 2 else None)
+    # Resume three seconds after pausing
+    engine._wake.on_wait = lambda: engine.resume() if fake_time.now - started >= 3.1 else None
+    engine._run()
+    assert [round(at - started, 2) for at in deliveries] == [0.0, 0.1, 3.2, 3.3]
+    assert not engine.paused
+
+
+def test_seek_jumps_and_publishes_snapshot_state(fake_time):
+    timestamps = [k * 0.01 for k in range(40)]
+    session = make_session(timestamps)
+    snapshots = cs.StateSnapshots(session, stride=8)
+    latest = {}
+    for k, fr in enumerate(session.read_range(0, len(session))):
+        snapshots.record(k, latest)
+        latest[fr.can_id] = fr
+    seeks = []
+    engine, deliveries = make_engine(fake_time, session, snapshots=snapshots,
+                                     on_seek=lambda index, state: seeks.append((index, state)))
+    engine.on_frames = lambda frames: (deliveries.append(frames[0].timestamp),
+                                       engine.seek(0.25) if len(deliveries) == 3 else None)
+    engine._run()
+
+    assert len(snapshots.positions) > 2
+    assert deliveries == timestamps[:3] + timestamps[25:]
+    index, state = seeks[0]
+    assert index == 25
+    frames = session.read_range(0, 25)
+    assert {i: fr.timestamp for i, fr in state.items()} == {0x100: frames[24].timestamp, 0x101: frames[23].timestamp}
+
+
+def test_seek_honours_the_id_selection_and_window(fake_time):
+    session = make_session([k * 0.01 for k in range(40)])
+    snapshots = cs.StateSnapshots(session, stride=8)
+    seeks = []
+    engine, deliveries = make_engine(fake_time, session, start=10, stop=30, can_ids=[0x101], snapshots=snapshots,
+                                     on_seek=lambda index, state: seeks.append((index, state)))
+    engine.on_frames = lambda frames: (deliveries.append(frames[0].timestamp),
+                                       engine.seek(0.0) if len(deliveries) == 1 else None)
+    engine._run()
+    index, state = seeks[0]
+    assert index == 10
+    assert list(state) == [0x101]
+    assert deliveries == [0.11, 0.11] + [k * 0.01 for k in range(13, 30, 2)]
+
+
+def test_stop_ends_the_replay(fake_time):
+    done = []
+    engine, deliveries = make_engine(fake_time, make_session([0.0, 0.1, 0.2]), loop=True,
+                                     on_done=lambda stats, stopped: done.append(stopped))
+    engine.on_frames = lambda frames: (deliveries.append(fake_time.now), engine.stop())
+    engine._run()
+    assert len(deliveries) == 1
+    assert done == [True]
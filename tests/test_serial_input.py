@@ -0,0 +1,214 @@
+import time
+
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+
+def raw(device_ts, can_id=0x100):
+    return can_id, 0, 0, 1, b"\x01", device_ts
+
+
+def test_device_timestamps_keep_spacing_and_anchor_on_last_frame():
+    clock = cs.FrameClock()
+    frames = clock.frames([raw(1_000_000), raw(1_002_500), raw(1_010_000)], now=500.0)
+    assert [round(fr.timestamp, 6) for fr in frames] == [499.99, 499.9925, 500.0]
+    # Next read continues on the device clock, not the host read time
+    frames = clock.frames([raw(1_020_000)], now=500.015)
+    assert frames[0].timestamp == pytest.approx(500.01)
+
+
+def test_device_timestamp_wrap():
+    clock = cs.FrameClock()
+    wrap = cs.FrameClock.WRAP
+    frames = clock.frames([raw(wrap - 1000), raw(500)], now=100.0)
+    assert frames[1].timestamp - frames[0].timestamp == pytest.approx(0.0015)
+    assert frames[1].timestamp == pytest.approx(100.0)
+
+
+def test_device_clock_reanchors_when_ahead_or_far_behind():
+    clock = cs.FrameClock()
+    clock.frames([raw(5_000_000)], now=10.0)
+    # Firmware restarted: the counter jumps back, which looks like a wrap far in the future
+    assert clock.frames([raw(100)], now=11.0)[0].timestamp == pytest.approx(11.0)
+    # Device clock stalled: anchor again once it falls behind the resync limit
+    later = 11.0 + cs.DEVICE_CLOCK_RESYNC_S + 1
+    assert clock.frames([raw(101)], now=later)[0].timestamp == pytest.approx(later)
+
+
+def test_text_frames_spread_over_read_interval():
+    clock = cs.FrameClock(max_spread=0.1)
+    first = clock.frames([raw(None)] * 2, now=10.0)
+    assert [fr.timestamp for fr in first] == [10.0, 10.0]
+    frames = clock.frames([raw(None)] * 4, now=10.04)
+    assert [round(fr.timestamp, 6) for fr in frames] == [10.01, 10.02, 10.03, 10.04]
+    # An idle gap longer than the port timeout only spreads over max_spread
+    frames = clock.frames([raw(None)] * 2, now=20.0)
+    assert [round(fr.timestamp, 6) for fr in frames] == [19.95, 20.0]
+
+
+def passes(pairs, can_id, ide):
+    return any(pair_ide == ide and (can_id & mask) == (value & mask) for pair_ide, value, mask in pairs)
+
+
+def test_acceptance_filters_pass_low_ids_in_both_formats():
+    pairs = cs.plan_acceptance_filters([0x100, 0x18FF0001], banks=6)
+    assert sorted(pairs) == [(0, 0x100, 0x7FF), (1, 0x100, 0x1FFFFFFF), (1, 0x18FF0001, 0x1FFFFFFF)]
+    assert passes(pairs, 0x100, 0) and passes(pairs, 0x100, 1)
+    assert not passes(pairs, 0x18FF0001, 0)
+
+
+def test_acceptance_filters_merge_into_available_banks():
+    ids = [0x100, 0x101, 0x102, 0x103, 0x200, 0x18FF0001, 0x18FF0002]
+    pairs = cs.plan_acceptance_filters(ids, banks=4)
+    assert len(pairs) <= 4
+    for can_id in ids:
+        assert passes(pairs, can_id, 1)
+        if can_id <= cs.STD_ID_MASK:
+            assert passes(pairs, can_id, 0)
+    assert cs.encode_filter_commands(pairs).startswith(cs.FILTER_CLEAR_COMMAND)
+
+
+def test_acceptance_filters_merge_neighbours_exactly():
+    assert sorted(cs.plan_acceptance_filters([0x100, 0x101, 0x102, 0x103], banks=2)) == \
+           [(0, 0x100, 0x7FC), (1, 0x100, 0x1FFFFFFC)]
+
+
+def test_acceptance_filters_fall_back_to_accept_all():
+    assert cs.plan_acceptance_filters([0x100, 0x18FF0001], banks=1) == []
+
+
+def test_acceptance_filters_plan_large_whitelists_quickly():
+    ids = list(range(0, 0x800, 4))
+    started = time.perf_counter()
+    pairs = cs.plan_acceptance_filters(ids)
+    assert time.perf_counter() - started < 0.5
+    assert len(pairs) <= cs.HW_FILTER_BANKS
+    assert all(passes(pairs, can_id, 0) and passes(pairs, can_id, 1) for can_id in ids)
+
+
+class FakePort:
+    """Serial stand-in serving fixed reads"""
+
+    timeout = 0.1
+
+    def __init__(self, reads=(), lines=()):
+        self.reads = list(reads)
+        self.lines = list(lines)
+        self.written = []
+
+    @property
+    def in_waiting(self):
+        return len(self.reads[0]) if self.reads else 0
+
+    def readinto(self, view):
+        if not self.reads:
+            return 0
+        data = self.reads.pop(0)
+        view[:len(data)] = data
+        return len(data)
+
+    def readline(self):
+        return self.lines.pop(0) if self.lines else b""
+
+    def write(self, data):
+        self.written.append(data)
+
+
+def binary_reader():
+    return cs.SerialFrameReader(FakePort(), mode="bulk", protocol="binary")
+
+
+@pytest.mark.parametrize("dlc", range(9))
+def test_binary_round_trip(dlc):
+    data = bytes(range(0x10, 0x10 + dlc))
+    raw = cs.encode_binary_frame(0x1ABCDEF0, 0, 1, data, device_ts=123456)
+    frame, end = cs.decode_binary_frame(raw, 0)
+    assert end == len(raw) == cs.BIN_MIN_LEN + dlc
+    assert frame == (0x1ABCDEF0, 0, 1, dlc, data, 123456)
+    assert binary_reader().feed(raw) == [frame]
+
+
+def test_binary_rtr_and_timestamp_wrap_bits():
+    raw = cs.encode_binary_frame(0x7FF, 1, 0, b"", device_ts=(1 << 32) + 5)
+    assert cs.decode_binary_frame(raw, 0)[0] == (0x7FF, 1, 0, 0, b"", 5)
+
+
+def test_binary_corrupted_crc_is_skipped_and_stream_resyncs():
+    bad = bytearray(cs.encode_binary_frame(0x100, 0, 0, b"\x01\x02", 1))
+    bad[-1] ^= 0xFF
+    good = cs.encode_binary_frame(0x200, 0, 0, b"\x03", 2)
+    reader = binary_reader()
+    frames = reader.feed(bytes(bad) + b"\x00\x11" + good)
+    assert [f[0] for f in frames] == [0x200]
+    assert reader.crc_errors == 1
+
+
+def test_binary_frame_split_across_feeds():
+    raw = cs.encode_binary_frame(0x123, 0, 0, b"\xDE\xAD\xBE\xEF", 42)
+    reader = binary_reader()
+    assert reader.feed(raw[:7]) == []
+    assert reader.feed(raw[7:] + raw[:3]) == [(0x123, 0, 0, 4, b"\xDE\xAD\xBE\xEF", 42)]
+    assert reader.feed(raw[3:]) == [(0x123, 0, 0, 4, b"\xDE\xAD\xBE\xEF", 42)]
+
+
+def test_auto_mode_locks_onto_binary():
+    reader = cs.SerialFrameReader(FakePort(), mode="bulk", protocol="auto")
+    raw = cs.encode_binary_frame(0x321, 0, 0, b"\x09", 7)
+    assert reader.feed(b"\x00\xA5\xFF noise" + raw) == [(0x321, 0, 0, 1, b"\x09", 7)]
+    assert reader.protocol == "binary"
+
+
+def test_auto_mode_locks_onto_text():
+    reader = cs.SerialFrameReader(FakePort(), mode="bulk", protocol="auto")
+    assert reader.feed(b"boot ok\r\nFRAME:1A0|0|0|2|01 FF\r\n") == [(0x1A0, 0, 0, 2, b"\x01\xFF", None)]
+    assert reader.protocol == "text"
+
+
+def test_request_binary_writes_mode_command():
+    port = FakePort()
+    reader = cs.SerialFrameReader(port, mode="bulk", protocol="text")
+    reader.request_binary()
+    assert port.written == [cs.BIN_MODE_COMMAND]
+    assert reader.protocol == "auto"
+
+
+def text_reader():
+    return cs.SerialFrameReader(FakePort(), mode="bulk", protocol="text")
+
+
+def test_text_line_split_mid_token():
+    reader = text_reader()
+    assert reader.feed(b"FRAME:1A0|0|0|3|01 0") == []
+    assert reader.feed(b"2 03\nFRAME:7") == [(0x1A0, 0, 0, 3, b"\x01\x02\x03", None)]
+    assert reader.feed(b"FF|0|0|0|\n") == [(0x7FF, 0, 0, 0, b"", None)]
+
+
+def test_text_line_split_mid_crlf():
+    reader = text_reader()
+    assert reader.feed(b"FRAME:100|0|0|1|AB\r") == []
+    assert reader.feed(b"\nFRAME:101|0|0|1|CD\r\n") == [(0x100, 0, 0, 1, b"\xAB", None),
+                                                       (0x101, 0, 0, 1, b"\xCD", None)]
+
+
+def test_text_garbage_before_first_line():
+    reader = text_reader()
+    frames = reader.feed(b"\x00\xFFgarbage|0|0|8|01\r\nstatus: ok\nFRAME:1A0|0|1|1|7F\n")
+    assert frames == [(0x1A0, 0, 1, 1, b"\x7F", None)]
+
+
+def test_bulk_reads_carry_partial_lines():
+    port = FakePort(reads=[b"FRAME:100|0|0|1|0", b"1\nFRAME:200|0|0|1|02\n"])
+    reader = cs.SerialFrameReader(port, mode="bulk", protocol="text")
+    assert reader.read_frames() == []
+    assert reader.read_frames() == [(0x100, 0, 0, 1, b"\x01", None), (0x200, 0, 0, 1, b"\x02", None)]
+    assert reader.read_frames() == []
+
+
+def test_line_mode_fallback():
+    port = FakePort(lines=[b"FRAME:1A0|0|0|2|01 02\r\n", b"debug text\n", b"FRAME:bad\n"])
+    reader = cs.SerialFrameReader(port, mode="line")
+    assert reader.protocol == "text"
+    assert reader.read_frames() == [(0x1A0, 0, 0, 2, b"\x01\x02", None)]
+    assert reader.read_frames() == []
+    assert reader.read_frames() == []
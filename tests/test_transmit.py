@@ -0,0 +1,223 @@
+import threading
+import time
+
+import pytest
+
+cs = pytest.importorskip("canSniffer")
+
+
+class Writer:
+    """Records each write the scheduler makes"""
+
+    def __init__(self):
+        self.writes = []
+        self.error = None
+
+    def __call__(self, data):
+        if self.error:
+            raise self.error
+        self.writes.append(data)
+
+
+@pytest.fixture
+def scheduler(fake_time):
+    sched = cs.TxScheduler(Writer())
+    # No writer thread: the tests call _send_due() at chosen times
+    sched._thread = object()
+    return sched
+
+
+def test_deadlines_advance_by_whole_periods(scheduler, fake_time):
+    job = scheduler.add("a", b"A\n", 0.25)
+    start = job.deadline
+    scheduler._send_due()
+    assert job.deadline == start + 0.25
+
+    fake_time.advance(0.375)  # 0.125 s late
+    scheduler._send_due()
+    assert job.deadline == start + 0.5
+    assert job.worst_late == pytest.approx(0.125)
+    assert job.missed == 0
+
+    fake_time.advance(0.75)  # Two whole periods behind
+    scheduler._send_due()
+    assert job.deadline == start + 1.25
+    assert job.missed == 2
+    assert job.sent == 3
+    assert scheduler.write.writes == [b"A\n"] * 3
+
+
+def test_commands_due_together_share_one_write(scheduler, fake_time):
+    base = fake_time.now
+    scheduler.add("a", b"A\n", 0.25)
+    fake_time.now = base + cs.TX_COALESCE_S / 2
+    scheduler.add("b", b"B\n", 0.25)
+    fake_time.now = base + cs.TX_COALESCE_S * 4
+    scheduler.add("c", b"C\n", 0.25)
+
+    fake_time.now = base
+    scheduler._send_due()
+    assert scheduler.write.writes == [b"A\nB\n"]
+    fake_time.now = base + cs.TX_COALESCE_S * 4
+    scheduler._send_due()
+    assert scheduler.write.writes == [b"A\nB\n", b"C\n"]
+
+
+def test_count_limited_job_reports_done_once(scheduler, fake_time):
+    done = []
+    job = scheduler.add("a", b"A\n", 0.25, count=2, on_done=lambda j, e: done.append((j, e)))
+    scheduler._send_due()
+    assert done == [] and len(scheduler) == 1
+    fake_time.advance(0.25)
+    scheduler._send_due()
+    assert done == [(job, None)]
+    assert len(scheduler) == 0 and not job.active
+    fake_time.advance(0.25)
+    scheduler._send_due()
+    assert scheduler.write.writes == [b"A\n", b"A\n"]
+    assert done == [(job, None)]
+
+
+def test_clear_reports_every_job_done(scheduler):
+    done = []
+    jobs = [scheduler.add(label, b"X\n", 0.25, on_done=lambda j, e: done.append((j, e))) for label in "ab"]
+    scheduler.clear()
+    assert sorted(done, key=lambda d: d[0].job_id) == [(job, None) for job in jobs]
+    assert len(scheduler) == 0 and scheduler.jobs() == []
+    assert scheduler._next_deadline() is None
+
+
+def test_write_error_ends_every_job(scheduler, fake_time):
+    done = []
+    error = OSError("port gone")
+    scheduler.write.error = error
+    scheduler.add("a", b"A\n", 0.25, on_done=lambda j, e: done.append(e))
+    scheduler.add("b", b"B\n", 10.0, on_done=lambda j, e: done.append(e))
+    scheduler._send_due()
+    assert done == [error, error]
+    assert len(scheduler) == 0
+
+
+def test_removed_job_is_not_sent(scheduler):
+    job = scheduler.add("a", b"A\n", 0.25)
+    scheduler.remove(job.job_id)
+    scheduler._send_due()
+    assert scheduler.write.writes == []
+
+
+@pytest.mark.parametrize("period", [0, -1, cs.TX_MIN_PERIOD_S / 10])
+def test_short_periods_are_clamped(scheduler, period):
+    assert scheduler.add("a", b"A\n", period).period == cs.TX_MIN_PERIOD_S
+
+
+class GatedPort:
+    """Serial stand-in whose writes can be held back or made to fail once"""
+
+    def __init__(self):
+        self.writes = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+        self.fail = None
+        self.closed = False
+
+    def write(self, data):
+        self.entered.set()
+        self.gate.wait(5)
+        if self.fail:
+            error, self.fail = self.fail, None
+            raise error
+        self.writes.append(bytes(data))
+        return len(data)
+
+    def close(self):
+        self.closed = True
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def fill_queue(tx, port):
+    """Hold the writer inside a write and queue TX_MAX_PENDING commands behind it"""
+    port.gate.clear()
+    tx.submit(b"FIRST\n")
+    assert port.entered.wait(5)
+    tx.submit_many([b"Q\n"] * cs.TX_MAX_PENDING)
+    assert tx.depth == cs.TX_MAX_PENDING
+
+
+def blocked_submitter(tx):
+    thread = threading.Thread(target=tx.submit, args=(b"LATE\n",), daemon=True)
+    thread.start()
+    thread.join(0.1)
+    assert thread.is_alive()
+    return thread
+
+
+def test_concurrent_submits_never_interleave():
+    port = GatedPort()
+    tx = cs.SerialTxPath(port)
+    per_thread = 300
+
+    def produce(t):
+        for k in range(0, per_thread, 3):
+            tx.submit_many([f"SEND:{t}|{n:04d}\n".encode() for n in range(k, k + 3)])
+
+    threads = [threading.Thread(target=produce, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    wait_for(lambda: tx.commands_sent == 8 * per_thread)
+    tx.close()
+
+    assert all(len(data) <= cs.TX_MAX_WRITE + 16 for data in port.writes)
+    assert all(data.endswith(b"\n") for data in port.writes)
+    lines = b"".join(port.writes).decode().splitlines()
+    for t in range(8):
+        assert [line for line in lines if line.startswith(f"SEND:{t}|")] == \
+               [f"SEND:{t}|{n:04d}" for n in range(per_thread)]
+    assert len(lines) == 8 * per_thread
+    assert tx.take_error() is None
+
+
+def test_close_wakes_blocked_submitters():
+    port = GatedPort()
+    tx = cs.SerialTxPath(port)
+    fill_queue(tx, port)
+    submitter = blocked_submitter(tx)
+
+    closer = threading.Thread(target=tx.close, daemon=True)
+    closer.start()
+    submitter.join(5)
+    assert not submitter.is_alive()
+    port.gate.set()
+    closer.join(5)
+    assert port.closed
+    assert b"LATE\n" not in b"".join(port.writes)
+
+
+def test_write_error_wakes_submitters_and_is_taken_once():
+    port = GatedPort()
+    errors = []
+    tx = cs.SerialTxPath(port, on_error=errors.append)
+    fill_queue(tx, port)
+    submitter = blocked_submitter(tx)
+
+    error = port.fail = OSError("port gone")
+    port.gate.set()
+    submitter.join(5)
+    assert not submitter.is_alive()
+    wait_for(lambda: errors)
+    assert errors == [error]
+    assert tx.take_error() is error
+    assert tx.take_error() is None
+
+    tx.submit(b"AGAIN\n")
+    wait_for(lambda: port.writes and port.writes[-1].endswith(b"AGAIN\n"))
+    assert tx.take_error() is None
+    tx.close()